@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class ClubsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'clubs'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from clubs import signals  # noqa: F401
+        from clubs.sqlite import configure_connection
+        connection_created.connect(configure_connection)
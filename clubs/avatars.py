@@ -0,0 +1,96 @@
+"""Locally generated avatars, stored in an on-disk cache keyed by email hash and size."""
+
+import os
+import struct
+import tempfile
+import zlib
+from pathlib import Path
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+GRID_SIZE = 5
+BACKGROUND = (240, 240, 240)
+# The only sizes rendered by the templates, and so the only ones served.
+AVATAR_SIZES = (60, 120)
+
+def avatar_path(email_hash, size):
+    """Return where the avatar of the given email hash and size is cached on disk."""
+    return Path(settings.AVATAR_CACHE_DIR) / email_hash[:2] / f'{email_hash}-{size}.png'
+
+
+def get_avatar(email_hash, size):
+    """Return the PNG avatar of the given email hash and size, creating and caching it if needed."""
+    path = avatar_path(email_hash, size)
+    try:
+        return path.read_bytes()
+    except FileNotFoundError:
+        pass
+    image = fetch_upstream(email_hash, size) or identicon_png(email_hash, size)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    file_descriptor, temporary_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    with os.fdopen(file_descriptor, 'wb') as temporary_file:
+        temporary_file.write(image)
+    os.replace(temporary_path, path)
+    return image
+
+
+def cull_cache():
+    """Delete the least recently written third of the cached avatars when there are more than allowed.
+
+    This walks the whole cache, so it is run by the cull_avatars command rather than by requests.
+    Return the number of avatars deleted.
+    """
+    paths = list(Path(settings.AVATAR_CACHE_DIR).glob('*/*.png'))
+    if len(paths) <= settings.AVATAR_CACHE_MAX_FILES:
+        return 0
+    modified = {}
+    for path in paths:
+        try:
+            modified[path] = path.stat().st_mtime
+        except FileNotFoundError:
+            pass
+    oldest = sorted(modified, key=modified.get)[:len(paths) // 3 or 1]
+    for path in oldest:
+        path.unlink(missing_ok=True)
+    return len(oldest)
+
+
+def fetch_upstream(email_hash, size):
+    """Return the avatar from the configured upstream fetcher, or None if there is none."""
+    if not settings.AVATAR_UPSTREAM_FETCHER:
+        return None
+    return import_string(settings.AVATAR_UPSTREAM_FETCHER)(email_hash, size)
+
+
+def identicon_png(email_hash, size):
+    """Return a symmetric 5x5 identicon PNG of the given size derived from an email hash."""
+    digest = bytes.fromhex(email_hash)
+    colour = bytes(digest[-3:])
+    half = (GRID_SIZE + 1) // 2
+    cells = [
+        [bool(digest[row * half + min(column, GRID_SIZE - 1 - column)] & 1) for column in range(GRID_SIZE)]
+        for row in range(GRID_SIZE)
+    ]
+    background = bytes(BACKGROUND)
+    columns = [column * GRID_SIZE // size for column in range(size)]
+    rows = []
+    for row in range(size):
+        cell_row = cells[row * GRID_SIZE // size]
+        pixels = b''.join(colour if cell_row[column] else background for column in columns)
+        rows.append(b'\x00' + pixels)
+    return _png(size, size, b''.join(rows))
+
+
+def _png(width, height, raw_rows):
+    """Return an 8-bit RGB PNG made of unfiltered scanlines."""
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+    header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    return b''.join([
+        b'\x89PNG\r\n\x1a\n',
+        chunk(b'IHDR', header),
+        chunk(b'IDAT', zlib.compress(raw_rows, 9)),
+        chunk(b'IEND', b''),
+    ])
@@ -0,0 +1,175 @@
+"""Cached data shared by every page of the site, and by every worker process.
+
+Cached values depend on entities, such as ('user', 3) or ('club', 7), each with a version
+counter in the cache. Saving or deleting an entity bumps its version, which at once makes
+every cached value computed from an earlier version stale: invalidating is one increment,
+however many values depend on the entity. Memberships and roles belong to the version of
+their user, and a club's version only changes with the club row itself.
+"""
+
+import random
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from clubs import metrics
+
+USER_CLUB_IDS_KEY = 'user_club_ids:{user_id}'
+USER_CLUBS_KEY = 'user_clubs:{user_id}'
+VERSION_KEY = 'version:{kind}:{id}'
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def _version_key(entity):
+    kind, entity_id = entity
+    return VERSION_KEY.format(kind=kind, id=entity_id)
+
+
+def _new_version():
+    # A counter dropped from the cache restarts far from where it was, so that values
+    # cached against its old versions cannot become valid again.
+    return random.getrandbits(48)
+
+
+def _bump(version_keys):
+    for key in version_keys:
+        try:
+            cache.incr(key)
+        except ValueError:
+            if not cache.add(key, _new_version(), None):
+                cache.incr(key)
+
+
+def bump_versions(*entities, using=DEFAULT_DB_ALIAS):
+    """Make the values cached for the given (kind, id) entities stale.
+
+    Within a transaction of the `using` database, the versions are bumped again when it
+    commits, as values computed in the meantime from the rows it had not yet committed
+    are stale too.
+    """
+    version_keys = [_version_key(entity) for entity in entities]
+    _bump(version_keys)
+    if version_keys and transaction.get_connection(using).in_atomic_block:
+        transaction.on_commit(lambda: _bump(version_keys), using=using)
+
+
+def _current_versions(version_keys, found):
+    """Return the versions of the given keys from the values found in the cache, starting missing ones."""
+    versions = []
+    for key in version_keys:
+        version = found.get(key)
+        if version is None:
+            cache.add(key, _new_version(), None)
+            version = cache.get(key)
+        versions.append(version)
+    return tuple(versions)
+
+
+def current_version(entity):
+    """Return the version of a (kind, id) entity, which changes whenever it is bumped."""
+    key = _version_key(entity)
+    return _current_versions([key], cache.get_many([key]))[0]
+
+
+def _record(name, hit):
+    result = 'hit' if hit else 'miss'
+    with _stats_lock:
+        _stats[name, result] += 1
+    metrics.inc('clubs_cache_requests_total', cache=name, result=result)
+
+
+def cached(name, key, compute, dependencies=(), timeout=None, single_flight=False):
+    """Return the value cached under key, calling compute() to cache it when missing or stale.
+
+    The value is stale once the version of any of the (kind, id) dependencies has been
+    bumped since it was computed. timeout is in seconds, None caching the value until it
+    is stale. With single_flight, only one process at a time computes a missing value
+    while the others wait up to settings.CACHE_LOCK_TIMEOUT seconds for it, so that an
+    expensive value expiring does not make every request compute it at once. name is
+    the name of the cache in the statistics.
+    """
+    version_keys = [_version_key(entity) for entity in dependencies]
+    found = cache.get_many([key, *version_keys])
+    versions = _current_versions(version_keys, found)
+    entry = found.get(key)
+    fresh = entry is not None and entry[0] == versions
+    _record(name, fresh)
+    if fresh:
+        return entry[1]
+
+    lock_key = f'{key}:lock'
+    holds_lock = single_flight and cache.add(lock_key, True, settings.CACHE_LOCK_TIMEOUT)
+    if single_flight and not holds_lock:
+        deadline = time.monotonic() + settings.CACHE_LOCK_TIMEOUT
+        while time.monotonic() < deadline:
+            time.sleep(settings.CACHE_LOCK_POLL_INTERVAL)
+            found = cache.get_many([key, lock_key])
+            entry = found.get(key)
+            if entry is not None and entry[0] == versions:
+                return entry[1]
+            if lock_key not in found:
+                break
+    try:
+        value = compute()
+        cache.set(key, (versions, value), timeout)
+    finally:
+        if holds_lock:
+            cache.delete(lock_key)
+    return value
+
+
+def cache_stats():
+    """Return the hits, misses and hit rate of each cache in this process since it started.
+
+    The clubs_cache_requests_total metric counts the same lookups across worker processes.
+    """
+    stats = {}
+    with _stats_lock:
+        names = sorted({name for name, _ in _stats})
+        for name in names:
+            hits, misses = _stats[name, 'hit'], _stats[name, 'miss']
+            stats[name] = {'hits': hits, 'misses': misses, 'hit_rate': hits / (hits + misses)}
+    return stats
+
+
+def reset_cache_stats():
+    """Forget the hits and misses counted so far in this process."""
+    with _stats_lock:
+        _stats.clear()
+
+
+def get_user_clubs(user):
+    """Return the id and name of every club the user belongs to, cached until their memberships change.
+
+    The names also depend on the versions of the clubs, so that renaming a club bumps its
+    version alone instead of those of all its associates.
+    """
+    from clubs.models import Club
+    from clubs.shards import memberships_of_user
+
+    memberships = None
+
+    def compute_club_ids():
+        nonlocal memberships
+        memberships = memberships_of_user(user)
+        return [membership.club_id for membership in memberships]
+
+    def compute_clubs():
+        if memberships is not None:
+            return [{'id': membership.club_id, 'name': membership.club.name} for membership in memberships]
+        return list(Club.objects.filter(id__in=club_ids).order_by('id').values('id', 'name'))
+
+    club_ids = cached(
+        'user_club_ids', USER_CLUB_IDS_KEY.format(user_id=user.id), compute_club_ids,
+        dependencies=[('user', user.id)],
+    )
+    return cached(
+        'user_clubs', USER_CLUBS_KEY.format(user_id=user.id), compute_clubs,
+        dependencies=[('user', user.id), *[('club', club_id) for club_id in club_ids]],
+    )
@@ -0,0 +1,174 @@
+"""A cache backend keeping its entries in a SQLite file shared by every worker process of a host."""
+
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+# Count the entries against MAX_ENTRIES once every this many writes of a process.
+CULL_CHECK_INTERVAL = 100
+
+
+class SQLiteCache(BaseCache):
+    """Cache entries in a SQLite database file.
+
+    Unlike the local memory cache, every process opening the file sees the same entries,
+    and unlike the file based cache, add() and incr() are atomic across processes, which
+    version counters and locks rely on.
+    """
+
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        self._path = location
+        self._local = threading.local()
+        self._writes = 0
+
+    def _connection(self):
+        """Return the connection of this thread, opening a new one after a fork."""
+        if getattr(self._local, 'pid', None) != os.getpid():
+            os.makedirs(os.path.dirname(self._path) or '.', exist_ok=True)
+            connection = sqlite3.connect(self._path, timeout=30, isolation_level=None)
+            connection.execute('PRAGMA journal_mode = wal')
+            connection.execute('PRAGMA synchronous = normal')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS cache_entry (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL)'
+            )
+            connection.execute('CREATE INDEX IF NOT EXISTS cache_entry_expires ON cache_entry (expires)')
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return self._local.connection
+
+    @contextmanager
+    def _write_transaction(self):
+        """Run the statements of the block atomically, holding the write lock from the start."""
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            yield connection
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+
+    def _encode(self, value):
+        return pickle.dumps(value, self.pickle_protocol)
+
+    def _decode(self, value):
+        return pickle.loads(value)
+
+    def _key(self, key, version):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    def get(self, key, default=None, version=None):
+        row = self._connection().execute(
+            'SELECT value FROM cache_entry WHERE key = ? AND (expires IS NULL OR expires > ?)',
+            (self._key(key, version), time.time()),
+        ).fetchone()
+        return default if row is None else self._decode(row[0])
+
+    def get_many(self, keys, version=None):
+        keys = {self._key(key, version): key for key in keys}
+        if not keys:
+            return {}
+        rows = self._connection().execute(
+            f'SELECT key, value FROM cache_entry WHERE key IN ({", ".join("?" * len(keys))}) '
+            'AND (expires IS NULL OR expires > ?)',
+            (*keys, time.time()),
+        )
+        return {keys[key]: self._decode(value) for key, value in rows}
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self._connection().execute(
+            'INSERT OR REPLACE INTO cache_entry (key, value, expires) VALUES (?, ?, ?)',
+            (self._key(key, version), self._encode(value), self.get_backend_timeout(timeout)),
+        )
+        self._wrote(1)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        expires = self.get_backend_timeout(timeout)
+        rows = [(self._key(key, version), self._encode(value), expires) for key, value in data.items()]
+        with self._write_transaction() as connection:
+            connection.executemany('INSERT OR REPLACE INTO cache_entry (key, value, expires) VALUES (?, ?, ?)', rows)
+        self._wrote(len(rows))
+        return []
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        with self._write_transaction() as connection:
+            connection.execute('DELETE FROM cache_entry WHERE key = ? AND expires <= ?', (key, time.time()))
+            added = connection.execute(
+                'INSERT OR IGNORE INTO cache_entry (key, value, expires) VALUES (?, ?, ?)',
+                (key, self._encode(value), self.get_backend_timeout(timeout)),
+            ).rowcount
+        self._wrote(added)
+        return bool(added)
+
+    def incr(self, key, delta=1, version=None):
+        key = self._key(key, version)
+        now = time.time()
+        with self._write_transaction() as connection:
+            row = connection.execute(
+                'SELECT value FROM cache_entry WHERE key = ? AND (expires IS NULL OR expires > ?)', (key, now)
+            ).fetchone()
+            if row is None:
+                raise ValueError(f"Key '{key}' not found")
+            value = self._decode(row[0]) + delta
+            connection.execute('UPDATE cache_entry SET value = ? WHERE key = ?', (self._encode(value), key))
+        return value
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return bool(self._connection().execute(
+            'UPDATE cache_entry SET expires = ? WHERE key = ? AND (expires IS NULL OR expires > ?)',
+            (self.get_backend_timeout(timeout), self._key(key, version), time.time()),
+        ).rowcount)
+
+    def has_key(self, key, version=None):
+        return self._connection().execute(
+            'SELECT 1 FROM cache_entry WHERE key = ? AND (expires IS NULL OR expires > ?)',
+            (self._key(key, version), time.time()),
+        ).fetchone() is not None
+
+    def delete(self, key, version=None):
+        return bool(self._connection().execute(
+            'DELETE FROM cache_entry WHERE key = ?', (self._key(key, version),)
+        ).rowcount)
+
+    def delete_many(self, keys, version=None):
+        keys = [self._key(key, version) for key in keys]
+        if keys:
+            self._connection().execute(f'DELETE FROM cache_entry WHERE key IN ({", ".join("?" * len(keys))})', keys)
+
+    def clear(self):
+        self._connection().execute('DELETE FROM cache_entry')
+
+    def _wrote(self, count):
+        """Cull the cache once in a while as entries are written."""
+        self._writes += count
+        if self._writes >= CULL_CHECK_INTERVAL:
+            self._writes = 0
+            self._cull()
+
+    def _cull(self):
+        """Drop expired entries and, past MAX_ENTRIES, the 1 / CULL_FREQUENCY soonest to expire."""
+        with self._write_transaction() as connection:
+            connection.execute('DELETE FROM cache_entry WHERE expires <= ?', (time.time(),))
+            count = connection.execute('SELECT COUNT(*) FROM cache_entry').fetchone()[0]
+            if count <= self._max_entries:
+                return
+            if self._cull_frequency == 0:
+                connection.execute('DELETE FROM cache_entry')
+                return
+            # Entries that never expire, such as version counters, go last.
+            connection.execute(
+                'DELETE FROM cache_entry WHERE key IN '
+                '(SELECT key FROM cache_entry ORDER BY expires IS NULL, expires LIMIT ?)',
+                (count // self._cull_frequency,),
+            )
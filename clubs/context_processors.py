@@ -1,15 +1,16 @@
-from .models import Club
+from .cache import get_user_clubs
 
 
 def get_clubs_user_belongs_to(request):
     user = request.user
     if user.is_authenticated:
-        clubs = Club.objects.filter(membership__user=user)
-        if user.current_club_not_none:
-            clubs = clubs.exclude(id=user.current_club.id)
+        clubs = get_user_clubs(user)
+        current_club = next((club for club in clubs if club['id'] == user.current_club_id), None)
 
         return {
-            'clubs_user_belongs_to': clubs
+            'clubs_user_belongs_to': [club for club in clubs if club is not current_club],
+            'user_club_count': len(clubs),
+            'current_club_name': current_club['name'] if current_club else None,
         }
 
     return {}
@@ -114,6 +114,22 @@ class SignUpForm(NewPasswordMixin, forms.ModelForm):
         return user
 
 
+class ImportUserForm(forms.ModelForm):
+    """Form validating a user imported in bulk with the same rules as SignUpForm.
+
+    The password is optional, and email uniqueness is left to the importer, which
+    checks it against an in-memory index instead of one query per row.
+    """
+
+    class Meta(SignUpForm.Meta):
+        pass
+
+    password = forms.CharField(required=False, validators=SignUpForm.base_fields['new_password'].validators)
+
+    def validate_unique(self):
+        pass
+
+
 class UserForm(forms.ModelForm):
     """Form to update user profiles."""
 
@@ -1,6 +1,8 @@
 from django.conf import settings
 from django.shortcuts import redirect
 
+from clubs.replicas import primary_reads
+
 
 def login_prohibited(view_function):
     def modified_view_function(request):
@@ -15,12 +17,14 @@ def login_prohibited(view_function):
 def required_role(role):
     def actual_decorator(view_function):
         def modified_view_function(request, *args, **kwargs):
-            user = request.user
-            if user.is_anonymous:
-                return redirect('log_in')
-            if not user.current_club_not_none:
-                return redirect('start')
-            if user.current_club_role < role:
+            with primary_reads():
+                user = request.user
+                if user.is_anonymous:
+                    return redirect('log_in')
+                if not user.current_club_not_none:
+                    return redirect('start')
+                current_role = request.membership.role
+            if current_role is None or current_role < role:
                 return redirect('start')
             else:
                 return view_function(request, *args, **kwargs)
@@ -33,13 +37,14 @@ def required_role(role):
 def prohibited_role(role):
     def actual_decorator(view_function):
         def modified_view_function(request, *args, **kwargs):
-            user = request.user
-            if user.is_anonymous:
-                return redirect('log_in')
-            club = user.current_club
-            if not user.current_club_not_none:
-                return redirect('start')
-            elif club.is_of_role(user, role):
+            with primary_reads():
+                user = request.user
+                if user.is_anonymous:
+                    return redirect('log_in')
+                if not user.current_club_not_none:
+                    return redirect('start')
+                current_role = request.membership.role
+            if current_role is None or current_role == role:
                 return redirect('start')
             else:
                 return view_function(request, *args, **kwargs)
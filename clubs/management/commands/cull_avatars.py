@@ -0,0 +1,24 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from clubs.avatars import cull_cache
+
+
+class Command(BaseCommand):
+    help = ('Deletes the least recently written cached avatars past AVATAR_CACHE_MAX_FILES, '
+            'once or every --interval seconds')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, help='Seconds between two culls; cull once when omitted')
+
+    def handle(self, *args, **options):
+        while True:
+            start = time.perf_counter()
+            deleted = cull_cache()
+            elapsed = time.perf_counter() - start
+            self.stdout.write(f"Deleted {deleted} cached avatars from {settings.AVATAR_CACHE_DIR} in {elapsed:.2f}s.")
+            if options['interval'] is None:
+                return
+            time.sleep(max(0.0, options['interval'] - elapsed))
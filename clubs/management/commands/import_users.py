@@ -0,0 +1,154 @@
+import csv
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, router, transaction
+
+from clubs.forms import ImportUserForm
+from clubs.models import User, Club, Membership
+
+
+def hash_chunk(passwords):
+    """Return the hashes of a chunk of passwords, computed in a worker process."""
+    return [make_password(password) for password in passwords]
+
+
+class Command(BaseCommand):
+    help = ('Imports users from a CSV file with the columns first_name, last_name, email, bio, '
+            'experience_level, personal_statement and optionally password and role. Users without '
+            'a password get an unusable one and must reset it.')
+
+    MAX_REPORTED_ERRORS = 20
+    # Passwords hashed by each task of the process pool.
+    HASH_CHUNK_SIZE = 50
+    ROLES = [role for role, _ in Membership.ROLE_CHOICES if role != Membership.OWNER]
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_path', help='CSV file to import')
+        parser.add_argument('--club', help='Name of a club every imported user joins')
+        parser.add_argument('--role', type=int, default=Membership.MEMBER,
+                            choices=self.ROLES,
+                            help='Role of imported users without a role column (default: member)')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Number of rows written per transaction')
+        parser.add_argument('--checkpoint', help='Checkpoint file (default: <csv_path>.checkpoint)')
+        parser.add_argument('--workers', type=int, default=None, help='Number of processes hashing passwords')
+
+    def handle(self, *args, **options):
+        self.club = self.get_club(options['club'])
+        self.default_role = options['role']
+        self.checkpoint_path = options['checkpoint'] or f"{options['csv_path']}.checkpoint"
+        self.batch_size = options['batch_size']
+        self.emails = {email.lower() for email in User.objects.values_list('email', flat=True).iterator()}
+        self.imported = self.duplicates = self.invalid = 0
+        # Users without a password share one unusable password instead of each generating their own.
+        self.unusable_password = make_password(None)
+
+        rows_done = self.read_checkpoint()
+        if rows_done:
+            self.stdout.write(f"Resuming after row {rows_done}.")
+        with open(options['csv_path'], newline='', encoding='utf-8') as csv_file, \
+                ProcessPoolExecutor(max_workers=options['workers']) as self.hashers:
+            batch = []
+            row_number = rows_done
+            for row_number, row in enumerate(csv.DictReader(csv_file), start=1):
+                if row_number <= rows_done:
+                    continue
+                user, role, password = self.build_user(row_number, row)
+                if user is not None:
+                    batch.append((user, role, password))
+                if row_number - rows_done >= self.batch_size:
+                    self.write_batch(batch, row_number)
+                    rows_done, batch = row_number, []
+            self.write_batch(batch, row_number)
+
+        os.remove(self.checkpoint_path)
+        self.stdout.write(
+            f"Imported {self.imported} users, skipped {self.duplicates} duplicates and {self.invalid} invalid rows."
+        )
+
+    def get_club(self, name):
+        if name is None:
+            return None
+        try:
+            return Club.objects.get(name=name)
+        except Club.DoesNotExist:
+            raise CommandError(f"Club '{name}' does not exist.")
+
+    def build_user(self, row_number, row):
+        """Return an unsaved user, their role and their password for a valid, new row, or (None, None, None).
+
+        The password is left to be hashed along with the rest of the batch.
+        """
+        form = ImportUserForm(row)
+        role = self.parse_role(row.get('role'))
+        if not form.is_valid() or role is None:
+            self.invalid += 1
+            if self.invalid <= self.MAX_REPORTED_ERRORS:
+                errors = form.errors.as_json() if form.errors else '{"role": "Invalid role."}'
+                self.stderr.write(f"Row {row_number} is invalid: {errors}")
+            return None, None, None
+
+        email = User.objects.normalize_email(form.cleaned_data['email'])
+        if email.lower() in self.emails:
+            self.duplicates += 1
+            return None, None, None
+        self.emails.add(email.lower())
+
+        user = form.save(commit=False)
+        user.email = email
+        user.password = self.unusable_password
+        return user, role, form.cleaned_data['password']
+
+    def hash_passwords(self, batch):
+        """Hash the passwords given to the users of a batch, in chunks spread over the process pool."""
+        users = [user for user, _, password in batch if password]
+        passwords = [password for _, _, password in batch if password]
+        chunks = [passwords[start:start + self.HASH_CHUNK_SIZE]
+                  for start in range(0, len(passwords), self.HASH_CHUNK_SIZE)]
+        hashes = (password for chunk in self.hashers.map(hash_chunk, chunks) for password in chunk)
+        for user, password in zip(users, hashes):
+            user.password = password
+
+    def parse_role(self, value):
+        if not value:
+            return self.default_role
+        try:
+            role = int(value)
+        except ValueError:
+            return None
+        if role not in self.ROLES:
+            return None
+        return role
+
+    def write_batch(self, batch, row_number):
+        """Insert a batch of users and their memberships, then record the last row handled."""
+        self.hash_passwords(batch)
+        membership_database = router.db_for_write(Membership, instance=self.club) if self.club is not None else DEFAULT_DB_ALIAS
+        with transaction.atomic(), transaction.atomic(using=membership_database):
+            User.objects.bulk_create([user for user, _, _ in batch])
+            if self.club is not None and batch:
+                roles = {user.email: role for user, role, _ in batch}
+                user_ids = User.objects.filter(email__in=roles).values_list('email', 'id')
+                memberships = [Membership(user_id=user_id, club=self.club, role=roles[email]) for email, user_id in user_ids]
+                Membership.objects.bulk_create(memberships)
+                for role in set(roles.values()):
+                    count = sum(1 for membership in memberships if membership.role == role)
+                    Club.objects.adjust_counts(self.club.id, new_role=role, count=count)
+        self.imported += len(batch)
+        self.write_checkpoint(row_number)
+        self.stdout.write(f"Imported {self.imported} users up to row {row_number}.", ending='\r')
+
+    def read_checkpoint(self):
+        if not os.path.exists(self.checkpoint_path):
+            return 0
+        with open(self.checkpoint_path) as checkpoint_file:
+            return json.load(checkpoint_file)['rows_done']
+
+    def write_checkpoint(self, rows_done):
+        temporary_path = f'{self.checkpoint_path}.tmp'
+        with open(temporary_path, 'w') as checkpoint_file:
+            json.dump({'rows_done': rows_done}, checkpoint_file)
+        os.replace(temporary_path, self.checkpoint_path)
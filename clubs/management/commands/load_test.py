@@ -0,0 +1,238 @@
+import json
+import random
+import subprocess
+import threading
+import time
+from collections import defaultdict
+from http.cookiejar import CookieJar
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import HTTPCookieProcessor, HTTPRedirectHandler, Request, build_opener
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, router
+from django.urls import reverse
+
+from clubs.management.commands.seed import Command as SeedCommand
+from clubs.models import User, Club, Membership
+from clubs.shards import fan_out
+from clubs.profiling import percentile
+
+
+class NoRedirectHandler(HTTPRedirectHandler):
+    """Report redirects as responses, so every step of a journey is timed on its own."""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+class Results:
+    """Latencies and failures of every step, shared by all virtual users."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, step, duration, ok):
+        with self.lock:
+            self.latencies[step].append(duration)
+            if not ok:
+                self.errors[step] += 1
+
+    def report(self, duration):
+        steps = {}
+        for step, latencies in sorted(self.latencies.items()):
+            steps[step] = {
+                'requests': len(latencies),
+                'errors': self.errors[step],
+                'error_rate': self.errors[step] / len(latencies),
+                'p50_ms': percentile(latencies, 0.5) * 1000,
+                'p90_ms': percentile(latencies, 0.9) * 1000,
+                'p99_ms': percentile(latencies, 0.99) * 1000,
+                'max_ms': max(latencies) * 1000,
+            }
+        requests = sum(step['requests'] for step in steps.values())
+        errors = sum(step['errors'] for step in steps.values())
+        all_latencies = [latency for latencies in self.latencies.values() for latency in latencies]
+        return {
+            'duration_seconds': duration,
+            'requests': requests,
+            'errors': errors,
+            'error_rate': errors / requests if requests else 0,
+            'throughput_rps': requests / duration if duration else 0,
+            'p50_ms': percentile(all_latencies, 0.5) * 1000 if all_latencies else None,
+            'p95_ms': percentile(all_latencies, 0.95) * 1000 if all_latencies else None,
+            'steps': steps,
+        }
+
+
+class VirtualUser:
+    """One browser session replaying the journey of a club associate against a running server."""
+
+    def __init__(self, base_url, email, password, club_id, results, applicants, timeout):
+        self.base_url = base_url.rstrip('/')
+        self.email = email
+        self.password = password
+        self.club_id = club_id
+        self.results = results
+        self.applicants = applicants
+        self.timeout = timeout
+        self.cookies = CookieJar()
+        self.opener = build_opener(HTTPCookieProcessor(self.cookies), NoRedirectHandler)
+
+    def run_journey(self):
+        self.cookies.clear()
+        self.request('log_in_form', reverse('log_in'))
+        if not self.request('log_in', reverse('log_in'), data={
+            'email': self.email, 'password': self.password, 'next': '',
+        }, expected_status=302):
+            return
+        self.request('start', reverse('start'))
+        self.request('my_clubs', reverse('my_clubs'))
+        self.request('select_club', reverse('select_club', args=[self.club_id]), expected_status=302)
+        self.request('user_list', reverse('user_list'))
+        if self.applicants is not None:
+            applicant_id = self.applicants.take(self.club_id)
+            if applicant_id is not None:
+                self.request('approve_applicant', reverse('approve_applicant', args=[applicant_id]), expected_status=302)
+        self.request('log_out', reverse('log_out'), expected_status=302)
+
+    def request(self, step, path, data=None, expected_status=200):
+        """Send one request, record its latency and return whether it had the expected status."""
+        body = None
+        if data is not None:
+            data = {**data, 'csrfmiddlewaretoken': self.csrf_token()}
+            body = urlencode(data).encode()
+        request = Request(self.base_url + path, data=body, headers={'Referer': self.base_url + path})
+        start = time.perf_counter()
+        try:
+            with self.opener.open(request, timeout=self.timeout) as response:
+                response.read()
+                status = response.status
+        except HTTPError as error:
+            error.read()
+            status = error.code
+        except (URLError, OSError):
+            status = None
+        self.results.record(step, time.perf_counter() - start, status == expected_status)
+        return status == expected_status
+
+    def csrf_token(self):
+        return next((cookie.value for cookie in self.cookies if cookie.name == 'csrftoken'), '')
+
+
+class ApplicantPool:
+    """Applicants of each club that are still waiting for approval, handed out once each."""
+
+    def __init__(self, applicant_ids_by_club):
+        self.lock = threading.Lock()
+        self.applicant_ids_by_club = applicant_ids_by_club
+
+    def take(self, club_id):
+        with self.lock:
+            applicant_ids = self.applicant_ids_by_club.get(club_id)
+            return applicant_ids.pop() if applicant_ids else None
+
+
+class Command(BaseCommand):
+    help = ('Replays user journeys (log in, start, my_clubs, select_club, user_list and, for officers, '
+            'approve_applicant) against a running server, using users of this database such as the '
+            'bulk seed data, and reports throughput, latency percentiles and error rates.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000', help='Server to load')
+        parser.add_argument('--concurrency', type=int, default=8, help='Number of simultaneous virtual users')
+        parser.add_argument('--journeys', type=int, default=10, help='Journeys replayed by each virtual user')
+        parser.add_argument('--password', default=SeedCommand.DEFAULT_PASSWORD, help='Password of the users')
+        parser.add_argument('--timeout', type=float, default=30, help='Seconds to wait for each response')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed used to pick users')
+        parser.add_argument('--output', help='Write the results as JSON to this file')
+
+    def handle(self, *args, **options):
+        concurrency = options['concurrency']
+        memberships = self.pick_memberships(concurrency, options['seed'])
+        if not memberships:
+            raise CommandError('No club members to log in as; seed the database first.')
+
+        results = Results()
+        applicants = ApplicantPool(self.applicant_ids_by_club(memberships))
+        virtual_users = [
+            VirtualUser(options['base_url'], email, options['password'], club_id, results,
+                        applicants if role >= Membership.OFFICER else None, options['timeout'])
+            for email, club_id, role in memberships
+        ]
+
+        def replay(virtual_user):
+            for _ in range(options['journeys']):
+                virtual_user.run_journey()
+
+        self.stdout.write(f"Replaying {options['journeys']} journeys with {len(virtual_users)} virtual users...")
+        start = time.perf_counter()
+        threads = [threading.Thread(target=replay, args=[virtual_user]) for virtual_user in virtual_users]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        report = results.report(time.perf_counter() - start)
+        report['config'] = {
+            'base_url': options['base_url'],
+            'concurrency': len(virtual_users),
+            'journeys': options['journeys'],
+            'commit': self.current_commit(),
+        }
+
+        self.stdout.write(
+            f"{report['requests']} requests in {report['duration_seconds']:.1f}s "
+            f"({report['throughput_rps']:.1f} req/s), {report['error_rate']:.1%} errors"
+        )
+        for step, stats in report['steps'].items():
+            self.stdout.write(
+                f"  {step:<18} p50 {stats['p50_ms']:8.1f}ms  p90 {stats['p90_ms']:8.1f}ms  "
+                f"p99 {stats['p99_ms']:8.1f}ms  errors {stats['errors']}"
+            )
+        if options['output']:
+            with open(options['output'], 'w') as output_file:
+                json.dump(report, output_file, indent=2)
+
+    def pick_memberships(self, count, seed):
+        """Return (email, club id, role) of members to log in as, about a fifth officers of clubs with applicants.
+
+        With sharding, the memberships are read from every shard, and the emails and the
+        applicant counts of the clubs from the primary.
+        """
+        def read(alias):
+            memberships = Membership.objects.using(alias).order_by('id').values_list('user_id', 'club_id', 'role')
+            return (list(memberships.filter(role__gte=Membership.OFFICER)[:count * 10]),
+                    list(memberships.filter(role=Membership.MEMBER)[:count * 10]))
+
+        rows = fan_out(read) if settings.DATABASE_SHARDS else [read(DEFAULT_DB_ALIAS)]
+        officers = [officer for database_officers, _ in rows for officer in database_officers]
+        members = [member for _, database_members in rows for member in database_members]
+        clubs_with_applicants = set(Club.objects.filter(
+            id__in={club_id for _, club_id, _ in officers}, applicant_count__gt=0
+        ).values_list('id', flat=True))
+        officers = [officer for officer in officers if officer[1] in clubs_with_applicants][:max(1, count // 5)]
+        random.Random(seed).shuffle(members)
+        picked = (officers + members)[:count]
+        emails = dict(User.objects.filter(id__in={user_id for user_id, _, _ in picked}).values_list('id', 'email'))
+        return [(emails[user_id], club_id, role) for user_id, club_id, role in picked if user_id in emails]
+
+    def applicant_ids_by_club(self, memberships):
+        club_ids_by_database = defaultdict(list)
+        for _, club_id, role in memberships:
+            if role >= Membership.OFFICER:
+                club_ids_by_database[router.db_for_read(Membership, club_id=club_id)].append(club_id)
+        applicant_ids = defaultdict(list)
+        for database, club_ids in club_ids_by_database.items():
+            for user_id, club_id in Membership.objects.using(database).filter(
+                    club_id__in=club_ids, role=Membership.APPLICANT).values_list('user_id', 'club_id'):
+                applicant_ids[club_id].append(user_id)
+        return applicant_ids
+
+    def current_commit(self):
+        try:
+            return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from clubs.models import Club
+from clubs.shards import move_club, shard_for_club
+
+
+class Command(BaseCommand):
+    help = 'Moves the memberships of a club to another shard while the club stays in use'
+
+    def add_arguments(self, parser):
+        parser.add_argument('club_id', type=int)
+        parser.add_argument('shard', help='Alias of the shard to move the club to')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Number of memberships copied per query')
+
+    def handle(self, *args, **options):
+        if options['shard'] not in settings.DATABASE_SHARDS:
+            raise CommandError(f"Unknown shard {options['shard']!r}; the shards are: {settings.DATABASE_SHARDS}.")
+        try:
+            club = Club.objects.get(id=options['club_id'])
+        except Club.DoesNotExist:
+            raise CommandError(f"There is no club with id {options['club_id']}.")
+        source = shard_for_club(club.id)
+        moved = move_club(club.id, options['shard'], batch_size=options['batch_size'])
+        self.stdout.write(f"Moved {moved} memberships of {club.name} from {source} to {options['shard']}.")
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from clubs.models import Club
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the applicant, member, officer and associate counters of every club'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Number of clubs updated per query')
+
+    def handle(self, *args, **options):
+        club_count = Club.objects.all().recount_members(batch_size=options['batch_size'])
+        self.stdout.write(f"Recounted the members of {club_count} clubs.")
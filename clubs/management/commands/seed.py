@@ -1,9 +1,37 @@
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth.hashers import make_password
 from django.core.management.base import BaseCommand
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
 from faker import Faker
 
 from clubs.models import User, Club, Membership
 
+TEXT_POOL_SIZE = 100
+
+
+def generate_user_rows(first_index, count):
+    """Return the fields of `count` fake users, numbered from first_index so their emails are unique."""
+    faker = Faker('en_GB')
+    faker.seed_instance(first_index)
+    # Generating paragraphs dominates the cost, so every batch draws from a small pool of them.
+    texts = [faker.text(max_nb_chars=520) for _ in range(min(count, TEXT_POOL_SIZE))]
+    rows = []
+    for index in range(first_index, first_index + count):
+        first_name = faker.first_name()
+        last_name = faker.last_name()
+        rows.append((
+            first_name,
+            last_name,
+            f'{first_name.lower()}.{last_name.lower()}.{index}@example.org',
+            faker.random.choice(texts),
+            faker.random.choice(texts),
+            faker.random.choice(texts),
+        ))
+    return rows
+
 
 class Command(BaseCommand):
     USER_COUNT = 100
@@ -15,7 +43,17 @@ class Command(BaseCommand):
         super().__init__()
         self.faker = Faker('en_GB')
 
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, help='Bulk seed this many users instead of the sample data')
+        parser.add_argument('--clubs', type=int, default=0, help='Number of clubs to bulk seed')
+        parser.add_argument('--memberships-per-club', type=int, default=0, help='Number of members of each club')
+        parser.add_argument('--batch-size', type=int, default=10000, help='Number of rows written per transaction')
+        parser.add_argument('--workers', type=int, default=None, help='Number of processes generating fake data')
+
     def handle(self, *args, **options):
+        if options.get('users') is not None:
+            self.bulk_seed(options)
+            return
         example_clubs = self.create_clubs()
         example_users = self.create_users()
         self.add_default_users_to_example_clubs(example_clubs)
@@ -176,3 +214,108 @@ class Command(BaseCommand):
         self.add_user_to_club_as_role(user1, default_club, Membership.MEMBER)
         self.add_user_to_club_as_role(user2, default_club, Membership.MEMBER)
         self.add_user_to_club_as_role(user3, default_club, Membership.MEMBER)
+
+    def bulk_seed(self, options):
+        """Seed large numbers of users, clubs and memberships with batched bulk inserts."""
+        batch_size = options['batch_size']
+        last_user_id = User.objects.order_by('id').values_list('id', flat=True).last() or 0
+        last_club_id = Club.objects.order_by('id').values_list('id', flat=True).last() or 0
+
+        self.bulk_create_users(options['users'], batch_size, options['workers'], last_user_id)
+        self.bulk_create_clubs(options['clubs'], batch_size, last_club_id)
+        user_ids = list(User.objects.filter(id__gt=last_user_id).values_list('id', flat=True))
+        club_ids = list(Club.objects.filter(id__gt=last_club_id).values_list('id', flat=True))
+        self.bulk_create_memberships(club_ids, user_ids, options['memberships_per_club'], batch_size)
+        Club.objects.filter(id__gt=last_club_id).recount_members(batch_size=batch_size)
+
+    def bulk_create_users(self, user_count, batch_size, workers, last_user_id):
+        """Create users from fake data generated in a process pool, hashing the password only once.
+
+        Users are numbered after the existing users, so that seeding again adds new emails.
+        """
+        password = make_password(self.DEFAULT_PASSWORD)
+        first_indexes = range(last_user_id, last_user_id + user_count, batch_size)
+        counts = [min(batch_size, last_user_id + user_count - first_index) for first_index in first_indexes]
+        progress = Progress('users', user_count)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for rows in executor.map(generate_user_rows, first_indexes, counts):
+                users = [
+                    User(
+                        first_name=first_name,
+                        last_name=last_name,
+                        email=email,
+                        password=password,
+                        bio=bio,
+                        experience_level=experience_level,
+                        personal_statement=personal_statement
+                    )
+                    for first_name, last_name, email, bio, experience_level, personal_statement in rows
+                ]
+                with transaction.atomic():
+                    User.objects.bulk_create(users)
+                progress.advance(len(users))
+        progress.finish()
+
+    def bulk_create_clubs(self, club_count, batch_size, last_club_id):
+        """Create clubs with unique names, numbered after the existing clubs."""
+        progress = Progress('clubs', club_count)
+        for first_index in range(0, club_count, batch_size):
+            clubs = [
+                Club(
+                    name=f"{self.faker.word().capitalize()} Chess Club {last_club_id + index + 1}",
+                    location=self.faker.city(),
+                    mission_statement=self.faker.text(max_nb_chars=520)
+                )
+                for index in range(first_index, min(first_index + batch_size, club_count))
+            ]
+            with transaction.atomic():
+                Club.objects.bulk_create(clubs)
+            progress.advance(len(clubs))
+        progress.finish()
+
+    def bulk_create_memberships(self, club_ids, user_ids, memberships_per_club, batch_size):
+        """Give every club one owner and a random mix of officers, members and applicants."""
+        memberships_per_club = min(memberships_per_club, len(user_ids))
+        progress = Progress('memberships', len(club_ids) * memberships_per_club)
+        memberships = []
+        for club_id in club_ids:
+            for position, user_id in enumerate(random.sample(user_ids, memberships_per_club)):
+                memberships.append(Membership(user_id=user_id, club_id=club_id, role=self.bulk_role(position)))
+            if len(memberships) >= batch_size:
+                with transaction.atomic():
+                    Membership.objects.bulk_create(memberships)
+                progress.advance(len(memberships))
+                memberships = []
+        with transaction.atomic():
+            Membership.objects.bulk_create(memberships)
+        progress.advance(len(memberships))
+        progress.finish()
+
+    def bulk_role(self, position):
+        if position == 0:
+            return Membership.OWNER
+        return random.choices(
+            [Membership.OFFICER, Membership.MEMBER, Membership.APPLICANT],
+            weights=[1, 6, 3]
+        )[0]
+
+
+class Progress:
+    """Prints how many rows have been seeded and how fast."""
+
+    def __init__(self, name, total):
+        self.name = name
+        self.total = total
+        self.done = 0
+        self.started = time.perf_counter()
+
+    def advance(self, count):
+        self.done += count
+        print(f"Seeding {self.name} {self.done}/{self.total} ({self.rate():,.0f} rows/s)", end='\r')
+
+    def finish(self):
+        print(f"Seeded {self.done} {self.name} in {time.perf_counter() - self.started:.1f}s "
+              f"({self.rate():,.0f} rows/s).      ")
+
+    def rate(self):
+        return self.done / max(time.perf_counter() - self.started, 1e-9)
@@ -0,0 +1,25 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from clubs.replicas import sync_replicas
+
+
+class Command(BaseCommand):
+    help = 'Copies the primary SQLite database onto every read replica, once or every --interval seconds'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, help='Seconds between two syncs; sync once when omitted')
+
+    def handle(self, *args, **options):
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError('No read replicas are configured (set CLUBS_SQLITE_REPLICAS).')
+        while True:
+            start = time.perf_counter()
+            sync_replicas()
+            elapsed = time.perf_counter() - start
+            self.stdout.write(f"Synced {len(settings.DATABASE_REPLICAS)} replicas in {elapsed:.2f}s.")
+            if options['interval'] is None:
+                return
+            time.sleep(max(0.0, options['interval'] - elapsed))
@@ -0,0 +1,167 @@
+"""Prometheus metrics, aggregated across worker processes through per-process mmap files.
+
+Every process writes its own values to an append-only file of (sample, value) slots in
+METRICS_DIR, which it alone updates in place. The metrics view sums the samples of every
+file, so counters and histogram buckets add up across gunicorn workers without a server.
+"""
+
+import mmap
+import os
+import struct
+import threading
+from pathlib import Path
+
+from django.conf import settings
+
+HEADER = struct.Struct('<Q')
+KEY_LENGTH = struct.Struct('<I')
+VALUE = struct.Struct('<d')
+INITIAL_FILE_SIZE = 64 * 1024
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+METRICS = {
+    'clubs_http_requests_total': ('counter', 'Requests handled, by URL name, method and status.'),
+    'clubs_http_request_duration_seconds': ('histogram', 'Time spent handling requests, by URL name.'),
+    'clubs_db_queries_total': ('counter', 'Database queries run while handling requests, by URL name.'),
+    'clubs_db_query_duration_seconds_total': ('counter', 'Time spent in database queries, by URL name.'),
+    'clubs_cache_requests_total': ('counter', 'Cache lookups, by cache and result (hit or miss).'),
+    'clubs_logins_total': ('counter', 'Log in attempts, by result (success or failure).'),
+    'clubs_role_transitions_total': ('counter', 'Committed membership role changes, by old and new role.'),
+}
+
+
+class MmapValues:
+    """Float values stored by sample name in a memory mapped file owned by one process."""
+
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self._file = open(path, 'a+b')
+        if os.fstat(self._file.fileno()).st_size == 0:
+            self._file.truncate(INITIAL_FILE_SIZE)
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        self._used = HEADER.unpack_from(self._map, 0)[0] or HEADER.size
+        self._positions = {key: position for key, _, position in read_entries(self._map, self._used)}
+
+    def inc(self, key, amount=1.0):
+        with self._lock:
+            position = self._positions.get(key)
+            if position is None:
+                position = self._add(key)
+            VALUE.pack_into(self._map, position, VALUE.unpack_from(self._map, position)[0] + amount)
+
+    def _add(self, key):
+        encoded = key.encode()
+        padding = -(KEY_LENGTH.size + len(encoded)) % 8
+        entry_size = KEY_LENGTH.size + len(encoded) + padding + VALUE.size
+        if self._used + entry_size > len(self._map):
+            self._grow(self._used + entry_size)
+        KEY_LENGTH.pack_into(self._map, self._used, len(encoded))
+        self._map[self._used + KEY_LENGTH.size:self._used + KEY_LENGTH.size + len(encoded)] = encoded
+        position = self._used + entry_size - VALUE.size
+        VALUE.pack_into(self._map, position, 0.0)
+        self._used += entry_size
+        # The header is updated last, so readers never see a half written entry.
+        HEADER.pack_into(self._map, 0, self._used)
+        self._positions[key] = position
+        return position
+
+    def _grow(self, needed):
+        size = len(self._map)
+        while size < needed:
+            size *= 2
+        self._map.close()
+        self._file.truncate(size)
+        self._map = mmap.mmap(self._file.fileno(), 0)
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+
+def read_entries(data, used):
+    """Yield the (key, value, value position) of every entry in the first `used` bytes of a metrics file."""
+    position = HEADER.size
+    while position < used:
+        length = KEY_LENGTH.unpack_from(data, position)[0]
+        key_start = position + KEY_LENGTH.size
+        value_position = key_start + length + (-(KEY_LENGTH.size + length) % 8)
+        yield bytes(data[key_start:key_start + length]).decode(), VALUE.unpack_from(data, value_position)[0], value_position
+        position = value_position + VALUE.size
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def _values():
+    """Return the values of this process, in a new file after a fork or a change of METRICS_DIR."""
+    key = (str(settings.METRICS_DIR), os.getpid())
+    store = _stores.get(key)
+    if store is None:
+        with _stores_lock:
+            store = _stores.get(key)
+            if store is None:
+                Path(settings.METRICS_DIR).mkdir(parents=True, exist_ok=True)
+                store = MmapValues(Path(settings.METRICS_DIR) / f'metrics_{os.getpid()}.db')
+                _stores[key] = store
+    return store
+
+
+def sample_key(name, **labels):
+    """Return the Prometheus sample line name of a metric and its labels."""
+    if not labels:
+        return name
+    escaped = (str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+               for value in labels.values())
+    return name + '{' + ','.join(f'{label}="{value}"' for label, value in zip(labels, escaped)) + '}'
+
+
+def inc(name, amount=1.0, **labels):
+    """Add to a counter; does nothing unless settings.METRICS is enabled."""
+    if settings.METRICS:
+        _values().inc(sample_key(name, **labels), amount)
+
+
+def observe(name, value, buckets=LATENCY_BUCKETS, **labels):
+    """Record a value in a histogram; does nothing unless settings.METRICS is enabled."""
+    if not settings.METRICS:
+        return
+    values = _values()
+    for bucket in buckets:
+        if value <= bucket:
+            values.inc(sample_key(f'{name}_bucket', **labels, le=bucket))
+    values.inc(sample_key(f'{name}_bucket', **labels, le='+Inf'))
+    values.inc(sample_key(f'{name}_sum', **labels), value)
+    values.inc(sample_key(f'{name}_count', **labels))
+
+
+def collect():
+    """Return the sum of every sample over the metrics files of all processes."""
+    totals = {}
+    for path in sorted(Path(settings.METRICS_DIR).glob('metrics_*.db')):
+        with open(path, 'rb') as metrics_file:
+            data = metrics_file.read()
+        if len(data) < HEADER.size:
+            continue
+        for key, value, _ in read_entries(data, HEADER.unpack_from(data, 0)[0]):
+            totals[key] = totals.get(key, 0.0) + value
+    return totals
+
+
+def render():
+    """Return every metric in the Prometheus text exposition format."""
+    samples_by_metric = {}
+    for key, value in collect().items():
+        sample_name = key.split('{', 1)[0]
+        metric = next((name for name in METRICS if sample_name in (
+            name, f'{name}_bucket', f'{name}_sum', f'{name}_count')), sample_name)
+        samples_by_metric.setdefault(metric, []).append((key, value))
+
+    lines = []
+    for metric, (metric_type, help_text) in METRICS.items():
+        lines.append(f'# HELP {metric} {help_text}')
+        lines.append(f'# TYPE {metric} {metric_type}')
+        for key, value in samples_by_metric.get(metric, []):
+            lines.append(f'{key} {int(value) if value.is_integer() else repr(value)}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,164 @@
+"""Middleware of the clubs app."""
+
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import HttpResponse
+from django.utils.functional import cached_property
+
+from clubs import metrics
+from clubs.models import Membership
+from clubs.profiling import QueryRecorder, record_profile
+from clubs.replicas import primary_reads, replica_routing
+from clubs.write_queue import WriteTimeout
+
+
+class CurrentMembership:
+    """The request user's membership of their current club, loaded at most once per request."""
+
+    def __init__(self, request):
+        self.request = request
+
+    @cached_property
+    def membership(self):
+        """Return the membership of the user's current club, or None if there is none.
+
+        It is read from the primary even in views reading from a replica, as it decides
+        what the user may do.
+        """
+        with primary_reads():
+            user = self.request.user
+            if not user.is_authenticated or user.current_club_id is None:
+                return None
+            memberships = Membership.objects.filter(user=user, club_id=user.current_club_id)
+            if not settings.DATABASE_SHARDS:
+                # On a shard the club is out of reach of a join, so it is loaded on its own.
+                memberships = memberships.select_related('club')
+            membership = memberships.first()
+            if membership is not None:
+                user.current_club = membership.club
+            return membership
+
+    @property
+    def role(self):
+        """Return the user's role in their current club, or None if they have no current club."""
+        if self.membership is None:
+            return None
+        return self.membership.role
+
+
+class CurrentMembershipMiddleware:
+    """Attach a lazily loaded CurrentMembership to every request as request.membership."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.membership = CurrentMembership(request)
+        return self.get_response(request)
+
+
+class SQLProfilingMiddleware:
+    """Record the queries of every request into the SQL profile of its URL name.
+
+    Only installed when settings.SQL_PROFILING is enabled.
+    """
+
+    def __init__(self, get_response):
+        if not settings.SQL_PROFILING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        duration = time.perf_counter() - start
+        url_name = getattr(request.resolver_match, 'url_name', None) or 'unresolved'
+        record_profile(url_name, recorder.summary(duration))
+        return response
+
+
+class MetricsMiddleware:
+    """Count requests, their latency and their database queries per URL name.
+
+    Only installed when settings.METRICS is enabled.
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        duration = time.perf_counter() - start
+        url_name = getattr(request.resolver_match, 'url_name', None) or 'unresolved'
+        metrics.inc('clubs_http_requests_total', url_name=url_name, method=request.method, status=response.status_code)
+        metrics.observe('clubs_http_request_duration_seconds', duration, url_name=url_name)
+        metrics.inc('clubs_db_queries_total', len(recorder.queries), url_name=url_name)
+        metrics.inc('clubs_db_query_duration_seconds_total',
+                    sum(query_time for _, query_time in recorder.queries), url_name=url_name)
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """Read from a replica in views marked with read_from_replica, unless the user wrote recently.
+
+    A request that writes sets a cookie that keeps the user's reads on the primary for
+    settings.REPLICA_STICKINESS seconds, so that they see their own writes. Only installed
+    when settings.DATABASE_REPLICAS lists any replica.
+    """
+
+    COOKIE_NAME = 'read_primary'
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with replica_routing() as request.replica_routing:
+            response = self.get_response(request)
+        if request.replica_routing.wrote:
+            response.set_cookie(self.COOKIE_NAME, '1', max_age=settings.REPLICA_STICKINESS,
+                                httponly=True, samesite='Lax')
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view = getattr(view_func, 'view_class', view_func)
+        if getattr(view, 'read_from_replica', False) and self.COOKIE_NAME not in request.COOKIES:
+            request.replica_routing.use_replica()
+
+
+class WriteQueueMiddleware:
+    """Answer requests whose write timed out in the write queue with 503 Service Unavailable.
+
+    Only installed when settings.WRITE_QUEUE is enabled.
+    """
+
+    def __init__(self, get_response):
+        if not settings.WRITE_QUEUE:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_exception(self, request, exception):
+        if isinstance(exception, WriteTimeout):
+            response = HttpResponse('The site is busy, please try again.', status=503, content_type='text/plain')
+            response['Retry-After'] = '5'
+            return response
+        return None
@@ -0,0 +1,50 @@
+# Generated by Django 3.2.5 on 2026-10-18 03:30
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def count_memberships(apps, schema_editor):
+    Club = apps.get_model('clubs', 'Club')
+    clubs = Club.objects.annotate(
+        actual_associate_count=Count('membership'),
+        actual_applicant_count=Count('membership', filter=Q(membership__role=0)),
+        actual_member_count=Count('membership', filter=Q(membership__role=1)),
+        actual_officer_count=Count('membership', filter=Q(membership__role=2)),
+    )
+    fields = ['associate_count', 'applicant_count', 'member_count', 'officer_count']
+    for club in clubs:
+        for field in fields:
+            setattr(club, field, getattr(club, f'actual_{field}'))
+    Club.objects.bulk_update(clubs, fields, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clubs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='club',
+            name='applicant_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='club',
+            name='associate_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='club',
+            name='member_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='club',
+            name='officer_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_memberships, migrations.RunPython.noop),
+    ]
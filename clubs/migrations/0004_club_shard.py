@@ -0,0 +1,24 @@
+# Generated by Django 3.2.5 on 2026-10-18 04:48
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clubs', '0003_membership_and_user_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClubShard',
+            fields=[
+                ('club', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, serialize=False, to='clubs.club')),
+                ('database', models.CharField(max_length=100)),
+            ],
+            options={
+                'db_table': 'club_shard',
+            },
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 3.2.5 on 2026-10-18 05:27
+
+from django.db import migrations, models
+
+
+MOVED_CLUB_TRIGGER = """
+CREATE TRIGGER membership_{name}_moved_club BEFORE {event} ON membership
+WHEN EXISTS (SELECT 1 FROM moved_club WHERE club_id = NEW.club_id)
+BEGIN
+    SELECT RAISE(ABORT, 'The club was moved to another shard');
+END
+"""
+
+
+def create_moved_club_triggers(apps, schema_editor):
+    # Shards are SQLite files; other databases get the table but never a moved club.
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for event in ('INSERT', 'UPDATE'):
+        schema_editor.execute(MOVED_CLUB_TRIGGER.format(name=event.lower(), event=event))
+
+
+def drop_moved_club_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for event in ('INSERT', 'UPDATE'):
+        schema_editor.execute(f'DROP TRIGGER IF EXISTS membership_{event.lower()}_moved_club')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clubs', '0004_club_shard'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MovedClub',
+            fields=[
+                ('club_id', models.PositiveIntegerField(primary_key=True, serialize=False)),
+            ],
+            options={
+                'db_table': 'moved_club',
+            },
+        ),
+        migrations.RunPython(create_moved_club_triggers, drop_moved_club_triggers),
+    ]
@@ -1,10 +1,18 @@
+from functools import lru_cache
+
 from django.conf import settings
 from django.contrib.auth.base_user import BaseUserManager
 from django.contrib.auth.models import AbstractUser
 from django.core.exceptions import ObjectDoesNotExist
-from django.db import models
-from django.db.models import Q
-from libgravatar import Gravatar
+from django.db import DEFAULT_DB_ALIAS, connections, models, router, transaction
+from django.db.models import Count, F, Q
+from django.urls import reverse
+from libgravatar import Gravatar, md5_hash, sanitize_email
+
+from clubs import metrics
+from clubs.avatars import AVATAR_SIZES
+from clubs.cache import bump_versions
+from clubs.sqlite import retry_on_locked
 
 
 class UserManager(BaseUserManager):
@@ -41,6 +49,15 @@ class UserManager(BaseUserManager):
         return self._create_user(email, password, **extra_fields)
 
 
+GRAVATAR_URL = 'https://www.gravatar.com/avatar/'
+
+
+@lru_cache(maxsize=65536)
+def gravatar_hash(email):
+    """Return the gravatar hash of an email, remembered across requests as it never changes."""
+    return md5_hash(sanitize_email(email))
+
+
 class User(AbstractUser):
     """User model used for authentication and clubs authoring."""
 
@@ -54,13 +71,14 @@ class User(AbstractUser):
 
     current_club = models.ForeignKey('Club', null=True, on_delete=models.SET_NULL)
 
+    @retry_on_locked
     def select_club(self, club):
         self.current_club = club
         self.save()
 
     @property
     def current_club_not_none(self):
-        return self.current_club is not None
+        return self.current_club_id is not None
 
     @property
     def current_club_role(self):
@@ -70,35 +88,120 @@ class User(AbstractUser):
         """Model options."""
 
         ordering = ['last_name', 'first_name']
+        indexes = [
+            models.Index(name='user_name_order_idx', fields=['last_name', 'first_name', 'id']),
+        ]
 
     @property
     def full_name(self):
         return f'{self.first_name} {self.last_name}'
 
     def gravatar(self, size=120):
-        """Return a URL to the user's gravatar."""
-        gravatar_object = Gravatar(self.email)
-        gravatar_url = gravatar_object.get_image(size=size, default='identicon')
-        return gravatar_url
+        """Return a URL to the user's gravatar, formatted the same way as libgravatar."""
+        if settings.LOCAL_AVATARS:
+            if size not in AVATAR_SIZES:
+                raise ValueError("Invalid image size.")
+            return reverse('avatar', args=[gravatar_hash(self.email), size])
+        if size == Gravatar.DEFAULT_IMAGE_SIZE:
+            return f'{GRAVATAR_URL}{gravatar_hash(self.email)}?default=identicon'
+        if not 0 < size < 2048:
+            raise ValueError("Invalid image size.")
+        return f'{GRAVATAR_URL}{gravatar_hash(self.email)}?size={size}&default=identicon'
 
     def mini_gravatar(self):
         """Return a URL to a miniature version of the user's gravatar."""
         return self.gravatar(size=60)
 
+    # Columns rendered by user lists; the long profile text is left to detail pages.
+    LIST_FIELDS = ('id', 'email', 'first_name', 'last_name')
+
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = []
 
     objects = UserManager()
 
 
+class ClubQuerySet(models.QuerySet):
+    """Queries over clubs, including upkeep of their membership counters."""
+
+    def adjust_counts(self, club_id, old_role=None, new_role=None, count=1):
+        """Move `count` memberships of a club from old_role to new_role in its counters.
+
+        A role of None stands for no membership at all, so (None, role) records new
+        memberships and (role, None) records deleted ones. When the memberships are on a
+        shard, inside a transaction of it, the counters only change once it commits.
+        """
+        if old_role == new_role:
+            return
+        deltas = {}
+        if old_role is None:
+            deltas['associate_count'] = count
+        if new_role is None:
+            deltas['associate_count'] = -count
+        old_field = Club.ROLE_COUNTERS.get(old_role)
+        if old_field is not None:
+            deltas[old_field] = -count
+        new_field = Club.ROLE_COUNTERS.get(new_role)
+        if new_field is not None:
+            deltas[new_field] = count
+        update = self.filter(pk=club_id).update
+        values = {field: F(field) + delta for field, delta in deltas.items()}
+        using = router.db_for_write(Membership, club_id=club_id)
+        if using != DEFAULT_DB_ALIAS and connections[using].in_atomic_block:
+            transaction.on_commit(lambda: update(**values), using=using)
+        else:
+            update(**values)
+
+    def recount_members(self, batch_size=1000):
+        """Recompute the membership counters of every club in the queryset from its memberships.
+
+        The memberships of a batch of clubs are counted on the primary, or with sharding
+        with one query per shard the clubs are on.
+        """
+        fields = ['associate_count', *Club.ROLE_COUNTERS.values()]
+        club_ids = list(self.order_by('pk').values_list('pk', flat=True))
+        for start in range(0, len(club_ids), batch_size):
+            batch = club_ids[start:start + batch_size]
+            club_ids_by_database = {}
+            for club_id in batch:
+                club_ids_by_database.setdefault(router.db_for_write(Membership, club_id=club_id), []).append(club_id)
+            counts = {club_id: dict.fromkeys(fields, 0) for club_id in batch}
+            for database, database_club_ids in club_ids_by_database.items():
+                rows = Membership.objects.using(database).filter(club_id__in=database_club_ids).values_list(
+                    'club_id', 'role'
+                ).annotate(count=Count('id'))
+                for club_id, role, count in rows:
+                    counts[club_id]['associate_count'] += count
+                    field = Club.ROLE_COUNTERS.get(role)
+                    if field is not None:
+                        counts[club_id][field] += count
+            Club.objects.bulk_update([Club(pk=club_id, **values) for club_id, values in counts.items()], fields)
+        return len(club_ids)
+
+
 class Club(models.Model):
     name = models.CharField(unique=True, blank=False, max_length=50)
     location = models.CharField(blank=False, max_length=50)
     mission_statement = models.CharField(blank=True, max_length=520)
     associates = models.ManyToManyField(settings.AUTH_USER_MODEL, through='Membership')
 
+    applicant_count = models.PositiveIntegerField(default=0, editable=False)
+    member_count = models.PositiveIntegerField(default=0, editable=False)
+    officer_count = models.PositiveIntegerField(default=0, editable=False)
+    associate_count = models.PositiveIntegerField(default=0, editable=False)
+
+    # Counter field of each Membership role; owners are only counted as associates.
+    ROLE_COUNTERS = {
+        0: 'applicant_count',
+        1: 'member_count',
+        2: 'officer_count',
+    }
+
+    objects = ClubQuerySet.as_manager()
+
+    @retry_on_locked
     def add_user(self, user):
-        self.associates.add(user)
+        self.membership_set.get_or_create(user=user)
 
     def exist(self, user):
         return self.membership_set.filter(user=user).exists()
@@ -106,6 +209,17 @@ class Club(models.Model):
     def is_of_role(self, user, role):
         return self.membership_set.get(user=user).role == role
 
+    def associates_in(self, *roles):
+        """Return the users associated with the club in any of the given roles.
+
+        With sharding, the memberships are on the shard of the club and the users on the
+        primary, so the user ids are read from the shard before the users are queried.
+        """
+        user_ids = self.membership_set.filter(role__in=roles).values_list('user_id', flat=True)
+        if settings.DATABASE_SHARDS:
+            user_ids = list(user_ids)
+        return User.objects.filter(id__in=user_ids)
+
     def change_role(self, user, new_role):
         try:
             membership = self.membership_set.get(user=user)
@@ -114,14 +228,80 @@ class Club(models.Model):
         except ObjectDoesNotExist:
             pass
 
+    @retry_on_locked
+    def change_roles(self, user_ids, old_role, new_role):
+        """Move every given user who has old_role in the club to new_role, returning how many moved."""
+        using = router.db_for_write(Membership, instance=self)
+        with transaction.atomic(using=using):
+            changed = self.membership_set.filter(user_id__in=user_ids, role=old_role).update(role=new_role)
+            Club.objects.adjust_counts(self.id, old_role, new_role, count=changed)
+            record_role_transitions(self, old_role, new_role, changed)
+            if changed:
+                bump_versions(*[('user', user_id) for user_id in user_ids], using=using)
+        return changed
+
+    @retry_on_locked
+    def apply_role_transitions(self, transitions):
+        """Apply a batch of (user_id, old_role, new_role) changes with one UPDATE per kind of change.
+
+        Transitions that would break the role_upperbound or one_owner_per_club constraints
+        are skipped before reaching the database: roles must be valid and ownership cannot
+        be given or taken away here. Returns the numbers of changed and skipped transitions.
+        """
+        valid_roles = {role for role, _ in Membership.ROLE_CHOICES}
+        user_ids_by_change = {}
+        seen_user_ids = set()
+        skipped = 0
+        for user_id, old_role, new_role in transitions:
+            if (user_id in seen_user_ids or old_role not in valid_roles or new_role not in valid_roles
+                    or Membership.OWNER in (old_role, new_role) or old_role == new_role):
+                skipped += 1
+                continue
+            seen_user_ids.add(user_id)
+            user_ids_by_change.setdefault((old_role, new_role), []).append(user_id)
+
+        changed = 0
+        with transaction.atomic(using=router.db_for_write(Membership, instance=self)):
+            for (old_role, new_role), user_ids in user_ids_by_change.items():
+                changed += self.change_roles(user_ids, old_role, new_role)
+        skipped += len(seen_user_ids) - changed
+        return changed, skipped
+
+    @retry_on_locked
+    def transfer_ownership(self, old_owner, new_owner):
+        """Make an officer the owner of the club and the old owner an officer, atomically.
+
+        The old owner is demoted before the new owner is promoted, so the one_owner_per_club
+        constraint holds at every step. Both updates are conditional on the roles still
+        being the expected ones, so a racing transfer or demotion makes this one roll back
+        and return False instead of leaving the club with no owner or two.
+        """
+        using = router.db_for_write(Membership, instance=self)
+        with transaction.atomic(using=using):
+            memberships = self.membership_set.filter(user__in=[old_owner, new_owner])
+            if connections[using].features.has_select_for_update:
+                list(memberships.select_for_update().values_list('id', flat=True))
+            demoted = memberships.filter(user=old_owner, role=Membership.OWNER).update(role=Membership.OFFICER)
+            if not demoted:
+                return False
+            promoted = memberships.filter(user=new_owner, role=Membership.OFFICER).update(role=Membership.OWNER)
+            if not promoted:
+                transaction.set_rollback(True, using=using)
+                return False
+            record_role_transitions(self, Membership.OWNER, Membership.OFFICER, 1)
+            record_role_transitions(self, Membership.OFFICER, Membership.OWNER, 1)
+            bump_versions(('user', old_owner.id), ('user', new_owner.id), using=using)
+        return True
+
     @property
     def members_count(self):
-        return self.associates.count()
+        """Return the number of associates who are not applicants."""
+        return self.associate_count - self.applicant_count
 
     @property
     def owner(self):
         try:
-            return self.associates.get(membership__role=Membership.OWNER)
+            return self.associates_in(Membership.OWNER).get()
         except ObjectDoesNotExist:
             return None
 
@@ -129,6 +309,61 @@ class Club(models.Model):
         return self.name
 
 
+def record_role_transitions(club, old_role, new_role, count):
+    """Count role changes in a club in the metrics once the transaction making them commits."""
+    if count:
+        role_names = dict(Membership.ROLE_CHOICES)
+        transaction.on_commit(lambda: metrics.inc(
+            'clubs_role_transitions_total', count,
+            old_role=role_names[old_role].lower(), new_role=role_names[new_role].lower(),
+        ), using=router.db_for_write(Membership, instance=club))
+
+
+class ClubScopedQuerySet(models.QuerySet):
+    """Queries over rows that each belong to one club, which tell routers which club they are about.
+
+    The club is taken from the arguments of filter(), get() and create(), and
+    bulk_create() writes the rows of every club to the database routed to for it.
+    """
+
+    CLUB_LOOKUPS = ('club', 'club_id', 'club__id', 'club__pk')
+
+    def _hint_club(self, kwargs):
+        for lookup in self.CLUB_LOOKUPS:
+            club = kwargs.get(lookup)
+            if club is not None:
+                self._add_hints(club_id=getattr(club, 'pk', club))
+                break
+        return self
+
+    def filter(self, *args, **kwargs):
+        return super().filter(*args, **kwargs)._hint_club(kwargs)
+
+    def create(self, **kwargs):
+        return super(ClubScopedQuerySet, self._hint_club(kwargs)).create(**kwargs)
+
+    def get_or_create(self, defaults=None, **kwargs):
+        return super(ClubScopedQuerySet, self._hint_club(kwargs)).get_or_create(defaults, **kwargs)
+
+    def update_or_create(self, defaults=None, **kwargs):
+        return super(ClubScopedQuerySet, self._hint_club(kwargs)).update_or_create(defaults, **kwargs)
+
+    def bulk_create(self, objs, *args, **kwargs):
+        if self._db is not None:
+            return super().bulk_create(objs, *args, **kwargs)
+        objs = list(objs)
+        objs_by_club = {}
+        for obj in objs:
+            objs_by_club.setdefault(obj.club_id, []).append(obj)
+        objs_by_database = {}
+        for club_objs in objs_by_club.values():
+            database = router.db_for_write(self.model, instance=club_objs[0])
+            objs_by_database.setdefault(database, []).extend(club_objs)
+        for database, database_objs in objs_by_database.items():
+            super(ClubScopedQuerySet, self.using(database)).bulk_create(database_objs, *args, **kwargs)
+        return objs
+
+
 class Membership(models.Model):
     APPLICANT = 0
     MEMBER = 1
@@ -146,6 +381,21 @@ class Membership(models.Model):
     club = models.ForeignKey(Club, on_delete=models.CASCADE)
     role = models.PositiveSmallIntegerField(choices=ROLE_CHOICES, default=APPLICANT)
 
+    objects = ClubScopedQuerySet.as_manager()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._saved_role = instance.__dict__.get('role')
+        return instance
+
+    @retry_on_locked
+    def save(self, *args, **kwargs):
+        """Save the membership and update the club's counters in the same transaction."""
+        using = kwargs.get('using') or router.db_for_write(Membership, instance=self)
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+
     class Meta:
         db_table = 'membership'
         constraints = [
@@ -153,3 +403,29 @@ class Membership(models.Model):
             models.UniqueConstraint(name='one_owner_per_club', fields=['club', 'role'], condition=Q(role=3)),
             models.CheckConstraint(name='role_upperbound', check=models.Q(role__lte=3))
         ]
+        indexes = [
+            models.Index(name='membership_club_role_user_idx', fields=['club', 'role', 'user']),
+        ]
+
+
+class ClubShard(models.Model):
+    """The shard holding the club-scoped rows of a club that was moved off its default shard."""
+
+    club = models.OneToOneField(Club, primary_key=True, on_delete=models.CASCADE)
+    database = models.CharField(max_length=100)
+
+    class Meta:
+        db_table = 'club_shard'
+
+
+class MovedClub(models.Model):
+    """A club whose club-scoped rows were moved off the shard holding this row.
+
+    Triggers on the shard refuse new and changed membership rows of the club, so that a
+    request that looked up the shard before the move cannot write where nobody reads.
+    """
+
+    club_id = models.PositiveIntegerField(primary_key=True)
+
+    class Meta:
+        db_table = 'moved_club'
@@ -0,0 +1,133 @@
+"""Keyset (cursor) pagination for querysets with a stable, unique ordering."""
+
+import base64
+import binascii
+import json
+from hashlib import md5
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+from clubs.cache import cached
+
+
+class KeysetPage:
+    """A page of results produced by a KeysetPaginator."""
+
+    def __init__(self, object_list, paginator, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<KeysetPage of {len(self.object_list)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """Paginate a queryset by seeking past the last row seen instead of using OFFSET.
+
+    The ordering must be made of ascending field names whose combined values are
+    unique, so that every row has exactly one position (end it with the primary key).
+    The total count is only computed when asked for, and is cached for
+    count_cache_timeout seconds when that is given, by one request at a time.
+    """
+
+    def __init__(self, queryset, per_page, ordering=('id',), count_cache_timeout=None):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.count_cache_timeout = count_cache_timeout
+
+    @cached_property
+    def count(self):
+        """Return the total number of rows, possibly as cached by an earlier request."""
+        if self.count_cache_timeout is None:
+            return self.queryset.count()
+        key = 'keyset_count:' + md5(str(self.queryset.query).encode()).hexdigest()
+        return cached('keyset_count', key, self.queryset.count, timeout=self.count_cache_timeout, single_flight=True)
+
+    def page(self, after=None, before=None):
+        """Return the page following the `after` cursor, or preceding the `before` cursor."""
+        after_values = self.decode_cursor(after)
+        before_values = self.decode_cursor(before)
+
+        if before_values is not None:
+            queryset = self.queryset.order_by(*[f'-{field}' for field in self.ordering])
+            queryset = queryset.filter(self._seek(before_values, 'lt'))
+        else:
+            queryset = self.queryset.order_by(*self.ordering)
+            if after_values is not None:
+                queryset = queryset.filter(self._seek(after_values, 'gt'))
+
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+
+        if before_values is not None:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, after_values is not None
+
+        return KeysetPage(
+            rows,
+            self,
+            next_cursor=self.encode_cursor(rows[-1]) if rows and has_next else None,
+            previous_cursor=self.encode_cursor(rows[0]) if rows and has_previous else None,
+        )
+
+    def encode_cursor(self, obj):
+        """Return an opaque, URL safe cursor pointing at the given row."""
+        values = [getattr(obj, field) for field in self.ordering]
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+    def decode_cursor(self, cursor):
+        """Return the ordering values held by a cursor, or None if it is missing or invalid.
+
+        The values are converted by the ordering fields, so that a crafted cursor cannot
+        put values the fields do not accept into the query.
+        """
+        if not cursor:
+            return None
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except (binascii.Error, UnicodeError, ValueError):
+            return None
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            return None
+        if not all(isinstance(value, (str, int, float)) for value in values):
+            return None
+        opts = self.queryset.model._meta
+        try:
+            values = [opts.get_field(field).to_python(value) for field, value in zip(self.ordering, values)]
+        except (ValidationError, TypeError, ValueError):
+            return None
+        return values
+
+    def _seek(self, values, lookup):
+        """Build (a > x) OR (a = x AND b > y) OR ... for the ordering fields."""
+        condition = Q()
+        for index, field in enumerate(self.ordering):
+            equal = {self.ordering[i]: values[i] for i in range(index)}
+            condition |= Q(**equal, **{f'{field}__{lookup}': values[index]})
+        return condition
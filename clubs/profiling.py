@@ -0,0 +1,83 @@
+"""Per-request SQL profiles, kept in a bounded in-memory ring buffer per URL name."""
+
+import math
+import threading
+import time
+from collections import Counter, defaultdict, deque
+
+from django.conf import settings
+
+SLOWEST_STATEMENT_COUNT = 3
+
+_profiles = defaultdict(lambda: deque(maxlen=settings.SQL_PROFILING_BUFFER_SIZE))
+_lock = threading.Lock()
+
+
+class QueryRecorder:
+    """Database execute wrapper that records the SQL and duration of every query it runs."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, time.perf_counter() - start))
+
+    def summary(self, duration):
+        """Return the profile of a request that took the given number of seconds."""
+        # Statements are told apart by their SQL template alone, so repeats with other parameters count too.
+        statement_counts = Counter(sql for sql, _ in self.queries)
+        slowest = sorted(self.queries, key=lambda query: query[1], reverse=True)[:SLOWEST_STATEMENT_COUNT]
+        return {
+            'duration': duration,
+            'query_count': len(self.queries),
+            'sql_time': sum(query_time for _, query_time in self.queries),
+            'repeated_count': sum(count - 1 for count in statement_counts.values()),
+            'slowest': slowest,
+        }
+
+
+def record_profile(url_name, profile):
+    """Add a request profile to the ring buffer of its URL name."""
+    with _lock:
+        _profiles[url_name].append(profile)
+
+
+def clear_profiles():
+    with _lock:
+        _profiles.clear()
+
+
+def percentile(values, fraction):
+    """Return the nearest-rank percentile of a non-empty list of values."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def profile_report():
+    """Return aggregated profiles per URL name in milliseconds, slowest p95 first."""
+    with _lock:
+        profiles = {url_name: list(buffer) for url_name, buffer in _profiles.items()}
+
+    report = []
+    for url_name, requests in profiles.items():
+        durations = [request['duration'] for request in requests]
+        slowest = sorted(
+            ((sql, query_time * 1000) for request in requests for sql, query_time in request['slowest']),
+            key=lambda query: query[1], reverse=True
+        )[:SLOWEST_STATEMENT_COUNT]
+        report.append({
+            'url_name': url_name,
+            'requests': len(requests),
+            'p50_ms': percentile(durations, 0.5) * 1000,
+            'p95_ms': percentile(durations, 0.95) * 1000,
+            'mean_queries': sum(request['query_count'] for request in requests) / len(requests),
+            'max_queries': max(request['query_count'] for request in requests),
+            'mean_sql_ms': sum(request['sql_time'] for request in requests) / len(requests) * 1000,
+            'repeated': sum(request['repeated_count'] for request in requests),
+            'slowest': slowest,
+        })
+    return sorted(report, key=lambda row: row['p95_ms'], reverse=True)
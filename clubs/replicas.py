@@ -0,0 +1,104 @@
+"""Read replicas: routing the reads of read-only views to them, and keeping local SQLite copies in sync.
+
+Each request gets a ReplicaRouting. Its reads go to one of settings.DATABASE_REPLICAS when
+the view is marked with read_from_replica and the user has not written recently; every
+write, and every read after a write or within a transaction, goes to the primary.
+"""
+
+import random
+import sqlite3
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_routing = ContextVar('replica_routing', default=None)
+
+
+class ReplicaRouting:
+    """How the queries of one request are routed, and whether it has written."""
+
+    def __init__(self):
+        self.replica = None
+        self.wrote = False
+
+    def use_replica(self):
+        """Send the reads that follow to a replica, the same one for the rest of the request."""
+        if settings.DATABASE_REPLICAS:
+            self.replica = random.choice(settings.DATABASE_REPLICAS)
+
+
+@contextmanager
+def replica_routing():
+    """Route the queries run within the block, and in write queue writes it submits, by a new ReplicaRouting."""
+    routing = ReplicaRouting()
+    token = _routing.set(routing)
+    try:
+        yield routing
+    finally:
+        _routing.reset(token)
+
+
+@contextmanager
+def primary_reads():
+    """Send the reads run within the block to the primary, whatever the current ReplicaRouting chose.
+
+    Authorization reads, such as the role of the user in their current club, must not see
+    a replica that may not have caught up with a demotion yet.
+    """
+    routing = _routing.get()
+    replica = routing and routing.replica
+    if replica is not None:
+        routing.replica = None
+    try:
+        yield
+    finally:
+        if replica is not None:
+            routing.replica = replica
+
+
+class PrimaryReplicaRouter:
+    """Send reads to the replica chosen by the current ReplicaRouting, if any, and everything else to the primary."""
+
+    def db_for_read(self, model, **hints):
+        routing = _routing.get()
+        if (routing is None or routing.replica is None or routing.wrote
+                or connections[DEFAULT_DB_ALIAS].in_atomic_block):
+            return DEFAULT_DB_ALIAS
+        return routing.replica
+
+    def db_for_write(self, model, **hints):
+        routing = _routing.get()
+        if routing is not None:
+            routing.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema along with their data from sync_replicas.
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+def sync_replicas():
+    """Copy the primary SQLite database onto every replica with SQLite's online backup API.
+
+    Readers of a replica keep seeing its previous copy until the backup of it is complete.
+    """
+    primary = sqlite3.connect(str(connections.databases[DEFAULT_DB_ALIAS]['NAME']), uri=True)
+    try:
+        for alias in settings.DATABASE_REPLICAS:
+            replica = sqlite3.connect(str(connections.databases[alias]['NAME']), uri=True)
+            try:
+                primary.backup(replica)
+            finally:
+                replica.close()
+    finally:
+        primary.close()
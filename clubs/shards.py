@@ -0,0 +1,210 @@
+"""Club sharding: spreading club-scoped rows over several databases by club.
+
+Users, clubs and the shard map stay on the primary. The rows of club-scoped models live on
+the shard of their club, settings.DATABASE_SHARDS[club id % number of shards] unless a
+ClubShard row says the club was moved elsewhere. Queries about one club go to its shard;
+queries about a user across clubs are fanned out to every shard in parallel. Each process
+keeps the ClubShard rows in memory until moving a club bumps the version of the map.
+"""
+
+import itertools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from clubs.cache import bump_versions, current_version
+from clubs.models import User, Club, ClubShard, Membership, MovedClub
+
+# Models whose rows belong to one club, through a club foreign key.
+CLUB_SCOPED_MODELS = {'clubs.Membership'}
+
+# Entity whose version is bumped when a club moves, making the shard map of every process stale.
+SHARD_MAP = ('shard_map', 'all')
+
+# Version and contents of the shard map last read by this process.
+_shard_map = (None, {})
+
+
+def _moved_clubs():
+    """Return the database of every club moved off its default shard, by club id."""
+    global _shard_map
+    version = current_version(SHARD_MAP)
+    map_version, databases = _shard_map
+    if map_version != version:
+        databases = dict(ClubShard.objects.using(DEFAULT_DB_ALIAS).values_list('club_id', 'database'))
+        _shard_map = (version, databases)
+    return databases
+
+
+def _default_shard(club_id, database):
+    shards = settings.DATABASE_SHARDS
+    return database if database in shards else shards[club_id % len(shards)]
+
+
+def shard_for_club(club_id):
+    """Return the alias of the shard holding the club-scoped rows of a club, from the shard map of this process."""
+    return _default_shard(club_id, _moved_clubs().get(club_id))
+
+
+def _stored_shard_for_club(club_id):
+    """Return the alias of the shard of a club as the primary has it now, bypassing the map of this process."""
+    database = ClubShard.objects.using(DEFAULT_DB_ALIAS).filter(club_id=club_id).values_list(
+        'database', flat=True
+    ).first()
+    return _default_shard(club_id, database)
+
+
+class ClubShardRouter:
+    """Send queries on club-scoped models to the shard of the club they are about.
+
+    The club comes from the instance hint, a club or a club-scoped row, or from the club_id
+    hint of a ClubScopedQuerySet. Other queries are left to the next router.
+    """
+
+    def _club_shard(self, model, hints):
+        if not settings.DATABASE_SHARDS or model._meta.label not in CLUB_SCOPED_MODELS:
+            return None
+        instance = hints.get('instance')
+        if isinstance(instance, Club):
+            club_id = instance.pk
+        else:
+            club_id = getattr(instance, 'club_id', None) or hints.get('club_id')
+        if club_id is None:
+            return None
+        return shard_for_club(club_id)
+
+    def db_for_read(self, model, **hints):
+        return self._club_shard(model, hints)
+
+    def db_for_write(self, model, **hints):
+        return self._club_shard(model, hints)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_SHARDS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def _get_executor():
+    """Return the fan-out thread pool of this process, starting a new one after a fork."""
+    with _executors_lock:
+        executor = _executors.get(os.getpid())
+        if executor is None:
+            executor = _executors[os.getpid()] = ThreadPoolExecutor(
+                max_workers=len(settings.DATABASE_SHARDS), thread_name_prefix='shard-fan-out'
+            )
+        return executor
+
+
+def fan_out(function):
+    """Call function(alias) for every shard in parallel and return the results in shard order."""
+    executor = _get_executor()
+    futures = [executor.submit(function, alias) for alias in settings.DATABASE_SHARDS]
+    return [future.result() for future in futures]
+
+
+def memberships_of_user(user):
+    """Return the memberships of a user in every club, with their clubs loaded, ordered by club."""
+    if not settings.DATABASE_SHARDS:
+        return list(user.membership_set.select_related('club').order_by('club_id'))
+    shard_memberships = fan_out(lambda alias: list(Membership.objects.using(alias).filter(user_id=user.id)))
+    memberships = {}
+    for membership in itertools.chain.from_iterable(shard_memberships):
+        # A club being moved can briefly have its rows on two shards.
+        memberships.setdefault(membership.club_id, membership)
+    clubs = Club.objects.in_bulk(list(memberships))
+    for club_id, membership in memberships.items():
+        membership.club = clubs.get(club_id)
+    return [memberships[club_id] for club_id in sorted(memberships) if clubs.get(club_id) is not None]
+
+
+def owners_of_clubs(club_ids):
+    """Return the owner of each of the given clubs that has one, by club id.
+
+    The owner memberships are read from the shard of each club, one query per shard, and
+    the owners with one query on the primary.
+    """
+    club_ids_by_shard = {}
+    for club_id in club_ids:
+        club_ids_by_shard.setdefault(shard_for_club(club_id), []).append(club_id)
+    owner_ids = {}
+    for alias, shard_club_ids in club_ids_by_shard.items():
+        owner_ids.update(Membership.objects.using(alias).filter(
+            club_id__in=shard_club_ids, role=Membership.OWNER
+        ).values_list('club_id', 'user_id'))
+    owners = User.objects.only('first_name', 'last_name', 'bio').in_bulk(set(owner_ids.values()))
+    return {club_id: owners[user_id] for club_id, user_id in owner_ids.items() if user_id in owners}
+
+
+def move_club(club_id, target, batch_size=1000):
+    """Move the club-scoped rows of a club to the target shard while the club stays in use.
+
+    The rows are first copied in batches. Then, holding the write lock of the source shard
+    so that no write to it can slip in, the copy is brought up to date, the shard map
+    points at the target, the rows are deleted from the source and the club is marked as
+    moved off it, which makes the source refuse writes of requests that looked the shard
+    up before the switch. Returns the number of rows moved.
+    """
+    source = _stored_shard_for_club(club_id)
+    if source == target:
+        return 0
+    # The target may be a shard the club was moved off before.
+    MovedClub.objects.using(target).filter(club_id=club_id).delete()
+    last_user_id = 0
+    while True:
+        batch = list(Membership.objects.using(source).filter(club_id=club_id, user_id__gt=last_user_id).order_by(
+            'user_id'
+        ).values_list('user_id', 'role')[:batch_size])
+        if not batch:
+            break
+        Membership.objects.using(target).bulk_create(
+            [Membership(club_id=club_id, user_id=user_id, role=role) for user_id, role in batch],
+            ignore_conflicts=True,
+        )
+        last_user_id = batch[-1][0]
+    return _switch_shard(club_id, source, target, batch_size)
+
+
+def _switch_shard(club_id, source, target, batch_size):
+    """Make the rows of a club on the target identical to those on the source, then point the shard map at it."""
+    with transaction.atomic(using=source), transaction.atomic(using=DEFAULT_DB_ALIAS), \
+            transaction.atomic(using=target):
+        # Marking the club as moved first takes the write lock of the source shard before its rows are read.
+        MovedClub.objects.using(source).bulk_create([MovedClub(club_id=club_id)], ignore_conflicts=True)
+        roles = dict(Membership.objects.using(source).filter(club_id=club_id).values_list('user_id', 'role'))
+        _delete_memberships(source, club_id)
+        target_roles = dict(Membership.objects.using(target).filter(club_id=club_id).values_list('user_id', 'role'))
+        stale = [user_id for user_id, role in target_roles.items() if roles.get(user_id) != role]
+        for start in range(0, len(stale), batch_size):
+            _delete_memberships(target, club_id, stale[start:start + batch_size])
+        missing = [user_id for user_id, role in roles.items() if target_roles.get(user_id) != role]
+        Membership.objects.using(target).bulk_create(
+            [Membership(club_id=club_id, user_id=user_id, role=roles[user_id]) for user_id in missing],
+            batch_size=batch_size,
+        )
+        ClubShard.objects.using(DEFAULT_DB_ALIAS).update_or_create(club_id=club_id, defaults={'database': target})
+        bump_versions(SHARD_MAP, using=DEFAULT_DB_ALIAS)
+    return len(roles)
+
+
+def _delete_memberships(alias, club_id, user_ids=None):
+    """Delete the memberships of a club on a shard, or those of the given users, without sending signals.
+
+    Moving rows between shards changes no membership, so the counters and cached values
+    the delete signals would update must stay as they are.
+    """
+    sql = f'DELETE FROM {connections[alias].ops.quote_name(Membership._meta.db_table)} WHERE club_id = %s'
+    params = [club_id]
+    if user_ids is not None:
+        sql += f" AND user_id IN ({', '.join(['%s'] * len(user_ids))})"
+        params += user_ids
+    with connections[alias].cursor() as cursor:
+        cursor.execute(sql, params)
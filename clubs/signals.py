@@ -0,0 +1,67 @@
+"""Signal receivers that keep cached data in step with the database."""
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from clubs.cache import bump_versions
+from clubs.models import User, Club, Membership
+
+
+@receiver(post_save, sender=Membership)
+@receiver(post_delete, sender=Membership)
+def membership_changed(sender, instance, using, **kwargs):
+    """Make the values cached for the user of a membership stale."""
+    bump_versions(('user', instance.user_id), using=using)
+
+
+@receiver(post_save, sender=Membership)
+def membership_saved(sender, instance, created, raw, **kwargs):
+    """Count a new membership, or move a membership whose role changed between counters.
+
+    Memberships loaded from a fixture are not counted, as the fixture holds the counters of their clubs.
+    """
+    if raw:
+        return
+    if created:
+        Club.objects.adjust_counts(instance.club_id, new_role=instance.role)
+    elif hasattr(instance, '_saved_role'):
+        Club.objects.adjust_counts(instance.club_id, instance._saved_role, instance.role)
+    else:
+        Club.objects.filter(pk=instance.club_id).recount_members()
+    instance._saved_role = instance.role
+
+
+@receiver(post_delete, sender=Membership)
+def membership_deleted(sender, instance, **kwargs):
+    """Stop counting a deleted membership."""
+    Club.objects.adjust_counts(instance.club_id, old_role=instance.role)
+
+
+@receiver(post_save, sender=Club)
+def club_saved(sender, instance, using, **kwargs):
+    """Make the values cached for a club stale, including the club names cached for its associates."""
+    bump_versions(('club', instance.id), using=using)
+
+
+@receiver(post_delete, sender=Club)
+def club_deleted(sender, instance, using, **kwargs):
+    """Make the values cached for a deleted club stale."""
+    bump_versions(('club', instance.id), using=using)
+
+
+@receiver(pre_delete, sender=User)
+@receiver(pre_delete, sender=Club)
+def delete_shard_memberships(sender, instance, **kwargs):
+    """Delete the memberships of a user or club kept on the shards, which deletion cascades do not reach."""
+    if settings.DATABASE_SHARDS:
+        lookup = 'club_id' if sender is Club else 'user_id'
+        for alias in settings.DATABASE_SHARDS:
+            Membership.objects.using(alias).filter(**{lookup: instance.pk}).delete()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, using, **kwargs):
+    """Make the values cached for a user stale, so that a new user never sees those of a deleted one."""
+    bump_versions(('user', instance.id), using=using)
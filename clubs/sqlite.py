@@ -0,0 +1,49 @@
+"""SQLite tuning: connection pragmas from settings, and retrying writes that find the database locked."""
+
+import random
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.db import OperationalError, connections
+
+
+def configure_connection(sender, connection, **kwargs):
+    """Apply settings.SQLITE_PRAGMAS to every new SQLite connection."""
+    if connection.vendor != 'sqlite':
+        return
+    for pragma, value in settings.SQLITE_PRAGMAS.items():
+        # Run on the raw connection so the pragmas never show up as queries of a request.
+        connection.connection.execute(f'PRAGMA {pragma} = {value}')
+    if connection.alias in settings.DATABASE_SHARDS:
+        # The rows on a shard refer to users and clubs that are kept on the primary.
+        connection.connection.execute('PRAGMA foreign_keys = OFF')
+
+
+def is_locked_error(error):
+    message = str(error)
+    return 'database is locked' in message or 'database table is locked' in message
+
+
+def retry_on_locked(function):
+    """Retry a write transaction that found the database locked, with bounded exponential backoff.
+
+    The retries only happen outside of any transaction: within one, the enclosing
+    transaction has to be retried as a whole, so the error is passed on to it.
+    """
+
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        attempt = 0
+        while True:
+            try:
+                return function(*args, **kwargs)
+            except OperationalError as error:
+                if (not is_locked_error(error) or attempt >= settings.SQLITE_WRITE_RETRIES
+                        or any(connection.in_atomic_block for connection in connections.all())):
+                    raise
+            delay = min(settings.SQLITE_RETRY_MAX_DELAY, settings.SQLITE_RETRY_BASE_DELAY * 2 ** attempt)
+            time.sleep(delay * random.uniform(0.5, 1))
+            attempt += 1
+
+    return wrapper
@@ -0,0 +1,49 @@
+"""Query counts of the club list view from a handful of clubs to tens of thousands."""
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from clubs.models import User, Club, Membership
+
+
+class ClubListViewQueryCountTestCase(TestCase):
+    """Query counts of the club list view from a handful of clubs to tens of thousands."""
+
+    CLUB_COUNTS = [10, 1_000, 50_000]
+
+    fixtures = [
+        'clubs/tests/fixtures/users/default_user.json',
+        'clubs/tests/fixtures/users/other_users.json',
+    ]
+
+    def setUp(self):
+        self.url = reverse('club_list')
+        self.owners = list(User.objects.all())
+        self.client.login(email='johndoe@example.org', password='Password123')
+
+    def test_query_count_is_flat_as_clubs_grow(self):
+        query_counts = []
+        self.client.get(self.url)
+        for club_count in self.CLUB_COUNTS:
+            self._grow_clubs_to(club_count)
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(self.url)
+            self.assertEqual(response.status_code, 200)
+            query_counts.append(len(queries))
+        self.assertEqual(len(set(query_counts)), 1, f'Query counts grew with clubs: {query_counts}')
+
+    def _grow_clubs_to(self, club_count):
+        existing_count = Club.objects.count()
+        last_id = Club.objects.order_by('id').values_list('id', flat=True).last() or 0
+        Club.objects.bulk_create(
+            (Club(name=f'Club {club_id:06}', location='London') for club_id in range(existing_count, club_count)),
+            batch_size=5000
+        )
+        # Every other club gets an owner, so owner-less clubs are measured too.
+        Membership.objects.bulk_create(
+            (Membership(user=self.owners[index % len(self.owners)], club=club, role=Membership.OWNER)
+             for index, club in enumerate(Club.objects.filter(id__gt=last_id)) if index % 2 == 0),
+            batch_size=5000
+        )
@@ -0,0 +1,36 @@
+"""Micro-benchmark of gravatar URLs compared with building them through libgravatar."""
+
+import timeit
+
+from django.test import SimpleTestCase
+from libgravatar import Gravatar
+
+from clubs.models import User
+from clubs.tests.helpers import benchmark
+
+
+@benchmark
+class GravatarBenchmarkTestCase(SimpleTestCase):
+    """Micro-benchmark of gravatar URLs compared with building them through libgravatar."""
+
+    USER_COUNT = 1000
+    ROUNDS = 10
+
+    def setUp(self):
+        self.users = [User(email=f'user{index}@example.org') for index in range(self.USER_COUNT)]
+
+    def test_memoized_gravatar_is_faster_than_libgravatar(self):
+        def libgravatar_urls():
+            for user in self.users:
+                Gravatar(user.email).get_image(size=60, default='identicon')
+                Gravatar(user.email).get_image(size=120, default='identicon')
+
+        def memoized_urls():
+            for user in self.users:
+                user.mini_gravatar()
+                user.gravatar()
+
+        memoized_urls()
+        libgravatar_time = min(timeit.repeat(libgravatar_urls, number=self.ROUNDS, repeat=3))
+        memoized_time = min(timeit.repeat(memoized_urls, number=self.ROUNDS, repeat=3))
+        self.assertLess(memoized_time, libgravatar_time / 2)
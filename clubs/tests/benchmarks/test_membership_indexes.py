@@ -0,0 +1,82 @@
+"""Query plans of the hot membership queries with realistic club sizes."""
+
+import random
+
+from django.db import connection
+from django.test import TestCase
+
+from clubs.models import User, Club, Membership
+from clubs.tests.helpers import benchmark
+
+
+class MembershipIndexQueryPlanTestCase(TestCase):
+    """Query plans of the hot membership queries on a small sample with realistic club sizes.
+
+    MillionMembershipIndexQueryPlanTestCase checks the same plans at the scale of a
+    million memberships.
+    """
+
+    USER_COUNT = 20_000
+    # Most clubs are small and a few are large, up to a tenth of the users.
+    CLUB_SIZES = [20] * 150 + [200] * 40 + [2_000] * 10
+    BATCH_SIZE = 10_000
+
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.bulk_create(
+            (User(email=f'user{index}@example.org', first_name=f'First{index % 97}', last_name=f'Last{index % 89}',
+                  password='!', bio='', experience_level='Beginner', personal_statement='')
+             for index in range(cls.USER_COUNT)),
+            batch_size=5000
+        )
+        Club.objects.bulk_create(Club(name=f'Club {index}', location='London') for index in range(len(cls.CLUB_SIZES)))
+        user_ids = list(User.objects.values_list('id', flat=True))
+        club_ids = list(Club.objects.order_by('id').values_list('id', flat=True))
+        generator = random.Random(0)
+        rows = [
+            (user_id, club_id, index % 3)
+            for club_id, size in zip(club_ids, cls.CLUB_SIZES)
+            for index, user_id in enumerate(generator.sample(user_ids, size))
+        ]
+        sql = f'INSERT INTO {Membership._meta.db_table} (user_id, club_id, role) VALUES (%s, %s, %s)'
+        with connection.cursor() as cursor:
+            for start in range(0, len(rows), cls.BATCH_SIZE):
+                cursor.executemany(sql, rows[start:start + cls.BATCH_SIZE])
+            cursor.execute('ANALYZE')
+        cls.small_club = Club.objects.get(id=club_ids[0])
+        cls.large_club = Club.objects.get(id=club_ids[-1])
+        cls.user = User.objects.get(id=user_ids[len(user_ids) // 2])
+
+    def test_membership_rows_were_created(self):
+        self.assertEqual(Membership.objects.count(), sum(self.CLUB_SIZES))
+
+    def test_role_lists_drive_from_club_role_user_index(self):
+        for club in (self.small_club, self.large_club):
+            with self.subTest(club=club.name):
+                plan = self._role_list(club).explain()
+                self.assertIn('USING COVERING INDEX membership_club_role_user_idx (club_id=? AND role=?)', plan)
+                self.assertIn('SEARCH clubs_user USING INTEGER PRIMARY KEY', plan)
+                self.assertNotIn('SCAN', plan)
+
+    def test_membership_lookup_uses_an_index(self):
+        plan = self.small_club.membership_set.filter(user=self.user).explain()
+        self.assertIn('USING', plan)
+        self.assertNotIn('SCAN membership', plan)
+
+    def test_user_ordering_uses_name_index(self):
+        plan = User.objects.order_by('last_name', 'first_name', 'id').explain()
+        self.assertIn('user_name_order_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def _role_list(self, club):
+        """Return the first page of a role list, as queried by the role list views."""
+        queryset = club.associates_in(Membership.APPLICANT).only(*User.LIST_FIELDS)
+        return queryset.order_by('last_name', 'first_name', 'id')[:11]
+
+
+@benchmark
+class MillionMembershipIndexQueryPlanTestCase(MembershipIndexQueryPlanTestCase):
+    """Query plans of the hot membership queries with a million memberships."""
+
+    USER_COUNT = 200_000
+    CLUB_SIZES = [50] * 10_000 + [500] * 600 + [20_000] * 10
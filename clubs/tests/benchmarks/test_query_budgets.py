@@ -0,0 +1,183 @@
+"""Query budgets and wall-clock ceilings of every named route, for every role."""
+
+import json
+import os
+import tempfile
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, get_resolver, reverse
+
+from clubs.models import User, Club, Membership, gravatar_hash
+
+# Most queries any role may cause on a route, measured with a cold cache.
+QUERY_BUDGETS = {
+    'sql_profile': 2,
+    'log_in': 2,
+    'sign_up': 2,
+    'home': 2,
+    'start': 5,
+    'password': 4,
+    'log_out': 4,
+    'user_list': 6,
+    'show_user': 8,
+    'profile': 4,
+    'applicants_list': 6,
+    'approve_applicant': 8,
+    'approve_applicants': 7,
+    'export_roster': 5,
+    'members_list': 6,
+    'promote_member': 8,
+    'change_roles': 13,
+    'officers_list': 6,
+    'demote_officer': 8,
+    'transfer_ownership': 8,
+    'select_club': 5,
+    'club_list': 5,
+    'show_club': 6,
+    'my_clubs': 6,
+    'apply': 10,
+    'leave_club': 8,
+    'create_club': 4,
+    'metrics': 0,
+    'avatar': 0,
+}
+
+# Slowest any single request may be, in seconds.
+WALL_CLOCK_CEILING = 2.0
+
+# Set QUERY_BUDGET_RESULTS to a file path to save the measurements of every route and role there.
+RESULTS_PATH = os.environ.get('QUERY_BUDGET_RESULTS')
+
+
+class QueryBudgetTestCase(TestCase):
+    """Query budgets and wall-clock ceilings of every named route, for every role."""
+
+    USER_COUNT = 1_000
+    CLUB_COUNT = 100
+    CLUBS_PER_ROLE_USER = 30
+
+    @classmethod
+    def setUpClass(cls):
+        cls.results = []
+        super().setUpClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        password = make_password('Password123')
+        User.objects.bulk_create(
+            User(email=f'user{index:04}@example.org', first_name=f'First{index:04}', last_name=f'Last{index:04}',
+                 password=password, bio=f'Bio {index}', experience_level='Intermediate',
+                 personal_statement=f'Statement {index}')
+            for index in range(cls.USER_COUNT)
+        )
+        Club.objects.bulk_create(
+            Club(name=f'Club {index:03}', location='London', mission_statement=f'Mission {index}')
+            for index in range(cls.CLUB_COUNT)
+        )
+        users = list(User.objects.order_by('email'))
+        clubs = list(Club.objects.order_by('name'))
+        cls.club = clubs[0]
+        cls.role_users = {
+            'applicant': users[0], 'member': users[1], 'officer': users[2], 'owner': users[3],
+        }
+        roles = [Membership.APPLICANT, Membership.MEMBER, Membership.OFFICER, Membership.OWNER]
+        memberships = [Membership(user=user, club=cls.club, role=role)
+                       for user, role in zip(cls.role_users.values(), roles)]
+        memberships += [Membership(user=user, club=cls.club, role=index % 3)
+                        for index, user in enumerate(users[4:])]
+        memberships += [Membership(user=user, club=club, role=Membership.MEMBER)
+                        for user in cls.role_users.values() for club in clubs[1:cls.CLUBS_PER_ROLE_USER + 1]]
+        memberships += [Membership(user=users[4 + index], club=club, role=Membership.OWNER)
+                        for index, club in enumerate(clubs[1:])]
+        Membership.objects.bulk_create(memberships, batch_size=5000)
+        Club.objects.recount_members()
+        for user in cls.role_users.values():
+            user.select_club(cls.club)
+
+        cls.joined_club = clubs[1]
+        cls.other_club = clubs[-1]
+        cls.targets = {
+            Membership.APPLICANT: users[4 + 3 * 10],
+            Membership.MEMBER: users[4 + 3 * 10 + 1],
+            Membership.OFFICER: users[4 + 3 * 10 + 2],
+        }
+
+    @classmethod
+    def tearDownClass(cls):
+        if RESULTS_PATH:
+            with open(RESULTS_PATH, 'w') as results_file:
+                json.dump({'ceiling_seconds': WALL_CLOCK_CEILING, 'results': cls.results}, results_file, indent=2)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.avatar_directory = tempfile.TemporaryDirectory()
+        self.settings_override = override_settings(AVATAR_CACHE_DIR=self.avatar_directory.name)
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        self.avatar_directory.cleanup()
+
+    def test_every_named_route_has_a_budget(self):
+        self.assertEqual(set(QUERY_BUDGETS), set(self._route_names()))
+
+    def test_routes_stay_within_budget(self):
+        for url_name in self._route_names():
+            for role, user in self.role_users.items():
+                with self.subTest(url_name=url_name, role=role):
+                    query_count, duration, status_code = self._measure(url_name, user)
+                    self.results.append({
+                        'url_name': url_name, 'role': role, 'status_code': status_code,
+                        'queries': query_count, 'seconds': round(duration, 4),
+                        'budget': QUERY_BUDGETS.get(url_name),
+                    })
+                    self.assertLessEqual(query_count, QUERY_BUDGETS[url_name])
+                    self.assertLess(duration, WALL_CLOCK_CEILING)
+
+    def _route_names(self):
+        return [pattern.name for pattern in get_resolver().url_patterns
+                if isinstance(pattern, URLPattern) and pattern.name]
+
+    def _url(self, url_name):
+        kwargs = {
+            'show_user': {'user_id': self.targets[Membership.MEMBER].id},
+            'approve_applicant': {'user_id': self.targets[Membership.APPLICANT].id},
+            'promote_member': {'user_id': self.targets[Membership.MEMBER].id},
+            'demote_officer': {'user_id': self.targets[Membership.OFFICER].id},
+            'transfer_ownership': {'user_id': self.targets[Membership.OFFICER].id},
+            'select_club': {'club_id': self.club.id},
+            'show_club': {'club_id': self.club.id},
+            'apply': {'club_id': self.other_club.id},
+            'leave_club': {'club_id': self.joined_club.id},
+            'avatar': {'email_hash': gravatar_hash(self.club.name), 'size': 60},
+        }.get(url_name, {})
+        return reverse(url_name, kwargs=kwargs)
+
+    def _post_data(self, url_name):
+        """Return the form data of routes that only accept POST, or None for GET routes."""
+        applicant, member = self.targets[Membership.APPLICANT], self.targets[Membership.MEMBER]
+        return {
+            'approve_applicants': {'user_ids': [applicant.id]},
+            'change_roles': {'transitions': [f'{applicant.id}:0:1', f'{member.id}:1:2']},
+        }.get(url_name)
+
+    def _measure(self, url_name, user):
+        """Return the queries, seconds and status of one request, whose changes are rolled back."""
+        url = self._url(url_name)
+        data = self._post_data(url_name)
+        cache.clear()
+        with transaction.atomic():
+            self.client.force_login(user)
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                response = self.client.get(url) if data is None else self.client.post(url, data)
+                if response.streaming:
+                    b''.join(response.streaming_content)
+                duration = time.perf_counter() - start
+            transaction.set_rollback(True)
+        return len(queries), duration, response.status_code
@@ -0,0 +1,81 @@
+"""Write throughput of concurrent requests on an SQLite file, with and without the tuning layer."""
+
+import threading
+import time
+
+from django.db import OperationalError, connections
+from django.test import TransactionTestCase, override_settings
+
+from clubs.models import User, Club, Membership
+from clubs.tests.helpers import benchmark, sqlite_file_database
+
+UNTUNED = {
+    'SQLITE_PRAGMAS': {'journal_mode': 'delete', 'synchronous': 'full'},
+    'SQLITE_WRITE_RETRIES': 0,
+}
+
+
+class SQLiteWriteConcurrencyTestCase(TransactionTestCase):
+    """Write throughput of concurrent requests on an SQLite file, with and without the tuning layer."""
+
+    THREAD_COUNT = 8
+    WRITES_PER_THREAD = 40
+
+    def test_pragmas_are_applied_to_new_connections(self):
+        with sqlite_file_database() as alias:
+            with connections[alias].cursor() as cursor:
+                cursor.execute('PRAGMA journal_mode')
+                self.assertEqual(cursor.fetchone()[0], 'wal')
+                cursor.execute('PRAGMA synchronous')
+                self.assertEqual(cursor.fetchone()[0], 1)
+                cursor.execute('PRAGMA busy_timeout')
+                self.assertEqual(cursor.fetchone()[0], 5000)
+
+    @benchmark
+    def test_tuning_raises_write_throughput_without_lock_errors(self):
+        with override_settings(**UNTUNED):
+            untuned_throughput, _ = self._measure_write_throughput()
+        tuned_throughput, tuned_errors = self._measure_write_throughput()
+        self.assertEqual(tuned_errors, 0)
+        self.assertGreater(tuned_throughput, untuned_throughput)
+
+    def _measure_write_throughput(self):
+        """Return the writes per second and lock errors of threads mixing the site's write paths."""
+        with sqlite_file_database():
+            clubs = [Club.objects.create(name=f'Club {index}', location='London') for index in range(2)]
+            users = [
+                User.objects.create(email=f'user{index}@example.org', first_name='First', last_name='Last')
+                for index in range(self.THREAD_COUNT)
+            ]
+            for user in users:
+                clubs[0].add_user(user)
+            barrier = threading.Barrier(self.THREAD_COUNT)
+            completed = []
+            errors = []
+
+            def write(user):
+                barrier.wait()
+                try:
+                    for index in range(self.WRITES_PER_THREAD):
+                        try:
+                            club = clubs[index % 2]
+                            user.select_club(club)
+                            if index % 4 == 1:
+                                club.add_user(user)
+                            elif index % 4 == 3:
+                                new_role = Membership.MEMBER if index % 8 == 3 else Membership.APPLICANT
+                                club.change_roles([user.id], 1 - new_role, new_role)
+                            completed.append(1)
+                        except OperationalError:
+                            errors.append(1)
+                finally:
+                    connections.close_all()
+
+            threads = [threading.Thread(target=write, args=[user]) for user in users]
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+        return len(completed) / elapsed, len(errors)
@@ -0,0 +1,66 @@
+"""Query budget of the start view with a large number of clubs."""
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from clubs.models import User, Club, Membership
+
+START_VIEW_QUERY_BUDGET = 7
+
+
+class StartViewQueryBudgetTestCase(TestCase):
+    """Query budget of the start view with a large number of clubs."""
+
+    CLUB_COUNT = 100_000
+
+    fixtures = [
+        'clubs/tests/fixtures/users/default_user.json',
+        'clubs/tests/fixtures/users/other_users.json',
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        Club.objects.bulk_create(
+            (Club(name=f'Club {club_id:06}', location='London') for club_id in range(cls.CLUB_COUNT)),
+            batch_size=5000
+        )
+        users = list(User.objects.all())
+        clubs = Club.objects.order_by('id')[:3]
+        Membership.objects.bulk_create(
+            Membership(user=user, club=club, role=Membership.MEMBER) for user in users for club in clubs
+        )
+
+    def setUp(self):
+        self.url = reverse('start')
+        self.user = User.objects.get(email='johndoe@example.org')
+        self.user.select_club(Club.objects.order_by('id').first())
+        self.client.login(email=self.user.email, password='Password123')
+
+    def test_first_page_is_within_query_budget(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertLessEqual(len(queries), START_VIEW_QUERY_BUDGET)
+
+    def test_deep_page_costs_the_same_as_first_page(self):
+        response = self.client.get(self.url)
+        with CaptureQueriesContext(connection) as first_page_queries:
+            self.client.get(self.url)
+
+        deep_club = Club.objects.order_by('-id')[5]
+        cursor = response.context['paginator'].encode_cursor(deep_club)
+        with CaptureQueriesContext(connection) as deep_page_queries:
+            response = self.client.get(self.url, {'after': cursor})
+
+        self.assertEqual(len(deep_page_queries), len(first_page_queries))
+        self.assertEqual(len(response.context['clubs']), 5)
+        self.assertFalse(response.context['page_obj'].has_next())
+
+    def test_club_page_query_does_not_use_offset(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url)
+        club_queries = [query['sql'] for query in queries if 'FROM "clubs_club" ORDER BY' in query['sql']]
+        self.assertEqual(len(club_queries), 1)
+        self.assertNotIn('OFFSET', club_queries[0])
@@ -0,0 +1,111 @@
+"""Write throughput of bursts of concurrent requests, with direct writes and through the write queue."""
+
+import multiprocessing
+import threading
+import time
+from unittest import mock
+
+from django.db import OperationalError, connections
+from django.test import TransactionTestCase, override_settings
+
+from clubs.models import User, Club, Membership
+from clubs.tests.helpers import benchmark, sqlite_file_database
+from clubs.write_queue import WriteQueue, run_write
+
+
+class WriteQueueThroughputTestCase(TransactionTestCase):
+    """Write throughput of bursts of concurrent requests, with direct writes and through the write queue.
+
+    Like gunicorn workers running several threads each, a few processes share the database
+    file and each has several threads handling requests that write. The write queue turns
+    the writes of a process into far fewer transactions, which is where its gain comes from;
+    how large that gain is depends on the cost of a commit, and so of fsync, on the host.
+    """
+
+    PROCESS_COUNT = 2
+    THREADS_PER_PROCESS = 16
+    WRITES_PER_THREAD = 20
+
+    @benchmark
+    def test_write_queue_batches_writes_without_losing_throughput(self):
+        with override_settings(WRITE_QUEUE=False):
+            direct_throughput, _, _ = self._measure_write_throughput()
+        with override_settings(WRITE_QUEUE=True):
+            queued_throughput, queued_errors, transactions = self._measure_write_throughput()
+        writes = self.PROCESS_COUNT * self.THREADS_PER_PROCESS * self.WRITES_PER_THREAD
+        self.assertEqual(queued_errors, 0)
+        self.assertLess(transactions, writes / 4)
+        self.assertGreater(queued_throughput, direct_throughput * 0.8)
+
+    def _measure_write_throughput(self):
+        """Return the writes per second, errors and write queue transactions of processes
+        whose threads each replay a burst of writes."""
+        with sqlite_file_database():
+            clubs = [Club.objects.create(name=f'Club {index}', location='London') for index in range(2)]
+            user_count = self.PROCESS_COUNT * self.THREADS_PER_PROCESS
+            users = [
+                User.objects.create(email=f'user{index}@example.org', first_name='First', last_name='Last')
+                for index in range(user_count)
+            ]
+            for user in users:
+                Membership.objects.create(user=user, club=clubs[0], role=Membership.MEMBER)
+            connections.close_all()
+
+            context = multiprocessing.get_context('fork')
+            barrier = context.Barrier(self.PROCESS_COUNT + 1)
+            results = context.Queue()
+            processes = [
+                context.Process(target=self._write_in_process, args=[
+                    clubs, users[index::self.PROCESS_COUNT], barrier, results
+                ])
+                for index in range(self.PROCESS_COUNT)
+            ]
+            for process in processes:
+                process.start()
+            barrier.wait()
+            start = time.perf_counter()
+            outcomes = [results.get() for _ in processes]
+            elapsed = time.perf_counter() - start
+            for process in processes:
+                process.join()
+        return (
+            sum(completed for completed, _, _ in outcomes) / elapsed,
+            sum(errors for _, errors, _ in outcomes),
+            sum(transactions for _, _, transactions in outcomes),
+        )
+
+    def _write_in_process(self, clubs, users, barrier, results):
+        completed = []
+        errors = []
+        transactions = []
+        commit = WriteQueue._commit
+
+        def counting_commit(write_queue, batch):
+            transactions.append(1)
+            return commit(write_queue, batch)
+
+        def write(user):
+            try:
+                for index in range(self.WRITES_PER_THREAD):
+                    try:
+                        if index % 3 == 0:
+                            run_write(user.select_club, clubs[0])
+                        elif index % 3 == 1:
+                            run_write(clubs[1].add_user, user)
+                        else:
+                            new_role = Membership.OFFICER if index % 2 else Membership.MEMBER
+                            run_write(clubs[0].change_roles, [user.id], 3 - new_role, new_role)
+                        completed.append(1)
+                    except OperationalError:
+                        errors.append(1)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=write, args=[user]) for user in users]
+        with mock.patch.object(WriteQueue, '_commit', counting_commit):
+            barrier.wait()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        results.put((len(completed), len(errors), len(transactions)))
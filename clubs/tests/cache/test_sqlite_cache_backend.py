@@ -0,0 +1,90 @@
+"""Tests of the cache backend keeping its entries in a SQLite file."""
+
+import multiprocessing
+import tempfile
+import time
+from pathlib import Path
+
+from django.test import SimpleTestCase
+
+from clubs.cache_backends import SQLiteCache
+
+
+def increment_in_worker(path, count):
+    cache = SQLiteCache(path, {})
+    for _ in range(count):
+        cache.incr('counter')
+
+
+class SQLiteCacheTestCase(SimpleTestCase):
+    """Tests of the cache backend keeping its entries in a SQLite file."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = str(Path(self.directory.name) / 'cache.sqlite3')
+        self.cache = SQLiteCache(self.path, {})
+
+    def test_set_and_get(self):
+        self.cache.set('key', {'name': 'Chess Club'})
+        self.assertEqual(self.cache.get('key'), {'name': 'Chess Club'})
+        self.assertIsNone(self.cache.get('missing'))
+        self.assertEqual(self.cache.get('missing', 'default'), 'default')
+
+    def test_get_many(self):
+        self.cache.set_many({'a': 1, 'b': [2]})
+        self.assertEqual(self.cache.get_many(['a', 'b', 'c']), {'a': 1, 'b': [2]})
+
+    def test_entries_expire(self):
+        self.cache.set('key', 'value', 0.05)
+        self.assertTrue(self.cache.has_key('key'))
+        time.sleep(0.1)
+        self.assertIsNone(self.cache.get('key'))
+        self.assertFalse(self.cache.has_key('key'))
+
+    def test_add_only_adds_missing_or_expired_keys(self):
+        self.assertTrue(self.cache.add('key', 'first'))
+        self.assertFalse(self.cache.add('key', 'second'))
+        self.assertEqual(self.cache.get('key'), 'first')
+        self.cache.set('expiring', 'first', 0.05)
+        time.sleep(0.1)
+        self.assertTrue(self.cache.add('expiring', 'second'))
+        self.assertEqual(self.cache.get('expiring'), 'second')
+
+    def test_incr(self):
+        self.cache.set('counter', 1)
+        self.assertEqual(self.cache.incr('counter', 5), 6)
+        self.assertEqual(self.cache.decr('counter'), 5)
+        with self.assertRaises(ValueError):
+            self.cache.incr('missing')
+
+    def test_delete_and_clear(self):
+        self.cache.set_many({'a': 1, 'b': 2, 'c': 3})
+        self.assertTrue(self.cache.delete('a'))
+        self.assertFalse(self.cache.delete('a'))
+        self.cache.delete_many(['b'])
+        self.assertEqual(self.cache.get_many(['a', 'b', 'c']), {'c': 3})
+        self.cache.clear()
+        self.assertIsNone(self.cache.get('c'))
+
+    def test_entries_are_shared_with_other_instances(self):
+        self.cache.set('key', 'value')
+        self.assertEqual(SQLiteCache(self.path, {}).get('key'), 'value')
+
+    def test_cull_keeps_entries_that_never_expire(self):
+        cache = SQLiteCache(self.path, {'OPTIONS': {'MAX_ENTRIES': 50, 'CULL_FREQUENCY': 2}})
+        cache.set('version', 1, None)
+        for number in range(100):
+            cache.set(f'entry:{number}', number, 60)
+        self.assertLessEqual(len(cache.get_many([f'entry:{number}' for number in range(100)])), 50)
+        self.assertEqual(cache.get('version'), 1)
+
+    def test_incr_is_atomic_across_processes(self):
+        self.cache.set('counter', 0, None)
+        context = multiprocessing.get_context('fork')
+        workers = [context.Process(target=increment_in_worker, args=(self.path, 50)) for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.assertEqual(self.cache.get('counter'), 200)
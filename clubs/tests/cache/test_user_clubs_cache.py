@@ -0,0 +1,85 @@
+"""Tests of the cached clubs shown in the navbar club switcher."""
+
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.test import TestCase, RequestFactory
+
+from clubs.cache import get_user_clubs
+from clubs.models import User, Club, Membership
+
+
+class UserClubsCacheTestCase(TestCase):
+    """Tests of the cached clubs shown in the navbar club switcher."""
+
+    fixtures = [
+        'clubs/tests/fixtures/users/default_user.json',
+        'clubs/tests/fixtures/users/other_users.json',
+        'clubs/tests/fixtures/clubs/default_club.json',
+        'clubs/tests/fixtures/clubs/other_clubs.json',
+        'clubs/tests/fixtures/memberships/memberships.json'
+    ]
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.get(email='johndoe@example.org')
+        self.member = User.objects.get(email='janedoe@example.org')
+        self.club = Club.objects.get(name='Chess Club')
+        self.other_club = Club.objects.get(name='The Royal Rooks')
+        Membership.objects.create(user=self.member, club=self.club, role=Membership.MEMBER)
+        self.member.select_club(self.other_club)
+
+    def test_get_user_clubs(self):
+        self.assertEqual(self._club_names(self.member), ['Chess Club', 'The Royal Rooks'])
+
+    def test_dropdown_renders_without_queries_on_cache_hit(self):
+        self._render_dropdown(self.member)
+        with self.assertNumQueries(0):
+            html = self._render_dropdown(self.member)
+        self.assertIn('The Royal Rooks', html)
+        self.assertIn(f'/select_club/{self.club.id}', html)
+        self.assertNotIn(f'/select_club/{self.other_club.id}', html)
+
+    def test_dropdown_follows_current_club_change(self):
+        self._render_dropdown(self.member)
+        self.member.select_club(self.club)
+        html = self._render_dropdown(self.member)
+        self.assertIn(f'/select_club/{self.other_club.id}', html)
+        self.assertNotIn(f'/select_club/{self.club.id}', html)
+
+    def test_cache_is_invalidated_when_joining_a_club(self):
+        get_user_clubs(self.user)
+        Membership.objects.create(user=self.user, club=self.other_club)
+        self.assertIn('The Royal Rooks', self._club_names(self.user))
+
+    def test_cache_is_invalidated_when_leaving_a_club(self):
+        get_user_clubs(self.member)
+        Membership.objects.get(user=self.member, club=self.club).delete()
+        self.assertEqual(self._club_names(self.member), ['The Royal Rooks'])
+
+    def test_cache_is_invalidated_when_club_is_renamed(self):
+        get_user_clubs(self.member)
+        self.club.name = 'Renamed Club'
+        self.club.save()
+        self.assertIn('Renamed Club', self._club_names(self.member))
+
+    def test_renaming_a_club_only_bumps_the_version_of_the_club(self):
+        get_user_clubs(self.member)
+        user_version = cache.get(f'version:user:{self.member.id}')
+        self.club.name = 'Renamed Club'
+        self.club.save()
+        self.assertEqual(cache.get(f'version:user:{self.member.id}'), user_version)
+        self.assertIn('Renamed Club', self._club_names(self.member))
+
+    def test_cache_is_not_invalidated_for_other_users(self):
+        get_user_clubs(self.member)
+        Membership.objects.create(user=self.user, club=self.other_club)
+        with self.assertNumQueries(0):
+            get_user_clubs(self.member)
+
+    def _club_names(self, user):
+        return [club['name'] for club in get_user_clubs(user)]
+
+    def _render_dropdown(self, user):
+        request = RequestFactory().get('/')
+        request.user = user
+        return render_to_string('partials/select_club_dropdown.html', {'user': user}, request=request)
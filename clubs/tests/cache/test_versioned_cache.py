@@ -0,0 +1,155 @@
+"""Tests of values cached against the versions of the users and clubs they depend on."""
+
+import threading
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from clubs.cache import bump_versions, cache_stats, cached, reset_cache_stats
+from clubs.models import User, Club, Membership
+
+
+class VersionedCacheTestCase(TestCase):
+    """Tests of values cached against the versions of the users and clubs they depend on."""
+
+    fixtures = [
+        'clubs/tests/fixtures/users/default_user.json',
+        'clubs/tests/fixtures/users/other_users.json',
+        'clubs/tests/fixtures/clubs/default_club.json',
+        'clubs/tests/fixtures/clubs/other_clubs.json',
+        'clubs/tests/fixtures/memberships/memberships.json'
+    ]
+
+    def setUp(self):
+        cache.clear()
+        reset_cache_stats()
+        self.user = User.objects.get(email='johndoe@example.org')
+        self.owner = User.objects.get(email='jennydoe@example.org')
+        self.officer = User.objects.get(email='jamesdoe@example.org')
+        self.club = Club.objects.get(name='The Royal Rooks')
+        self.computed = 0
+
+    def test_value_is_cached(self):
+        self.assertEqual(self._cached_value(), 1)
+        self.assertEqual(self._cached_value(), 1)
+        self.assertEqual(self.computed, 1)
+
+    def test_bumping_a_dependency_makes_the_value_stale(self):
+        self._cached_value()
+        bump_versions(('club', self.club.id))
+        self.assertEqual(self._cached_value(), 2)
+
+    def test_bumping_another_entity_keeps_the_value(self):
+        self._cached_value()
+        bump_versions(('club', self.club.id + 1), ('user', self.user.id))
+        self.assertEqual(self._cached_value(), 1)
+
+    def test_saving_a_club_bumps_its_version(self):
+        self._cached_value()
+        self.club.mission_statement = 'Checkmate'
+        self.club.save()
+        self.assertEqual(self._cached_value(), 2)
+
+    def test_saving_a_membership_bumps_the_version_of_its_user_only(self):
+        self._cached_value()
+        self._cached_value(('user', self.user.id))
+        Membership.objects.create(user=self.user, club=self.club)
+        self.assertEqual(self._cached_value(), 1)
+        self.assertEqual(self._cached_value(('user', self.user.id)), 3)
+
+    def test_saving_a_user_bumps_their_version(self):
+        self._cached_value(('user', self.user.id))
+        self.user.first_name = 'Johnny'
+        self.user.save()
+        self.assertEqual(self._cached_value(('user', self.user.id)), 2)
+
+    def test_changing_roles_bumps_the_versions_of_the_users_only(self):
+        self._cached_value()
+        self._cached_value(('user', self.officer.id))
+        self.club.transfer_ownership(self.owner, self.officer)
+        self.assertEqual(self._cached_value(), 1)
+        self.assertEqual(self._cached_value(('user', self.officer.id)), 3)
+
+    def test_dropped_version_does_not_revive_stale_values(self):
+        self._cached_value()
+        cache.delete(f'version:club:{self.club.id}')
+        self.assertEqual(self._cached_value(), 2)
+
+    def test_values_expire(self):
+        cached('test', 'test:key', self._compute, timeout=0.05)
+        time.sleep(0.1)
+        self.assertEqual(cached('test', 'test:key', self._compute, timeout=0.05), 2)
+
+    def test_cache_stats(self):
+        self._cached_value()
+        self._cached_value()
+        self._cached_value()
+        self.assertEqual(cache_stats(), {'test': {'hits': 2, 'misses': 1, 'hit_rate': 2 / 3}})
+        reset_cache_stats()
+        self.assertEqual(cache_stats(), {})
+
+    def _compute(self):
+        self.computed += 1
+        return self.computed
+
+    def _cached_value(self, *dependencies):
+        dependencies = dependencies or [('club', self.club.id)]
+        key = 'test:' + ','.join(f'{kind}:{id}' for kind, id in dependencies)
+        return cached('test', key, self._compute, dependencies=dependencies)
+
+
+class VersionBumpOnCommitTestCase(TransactionTestCase):
+    """Tests of the versions bumped again when the transaction making a change commits."""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_value_computed_before_commit_is_stale_after_it(self):
+        values = iter(['before commit', 'after commit'])
+        with transaction.atomic():
+            bump_versions(('club', 1))
+            cached('test', 'test:key', lambda: next(values), dependencies=[('club', 1)])
+        self.assertEqual(cached('test', 'test:key', lambda: next(values), dependencies=[('club', 1)]), 'after commit')
+
+
+@override_settings(CACHE_LOCK_TIMEOUT=5, CACHE_LOCK_POLL_INTERVAL=0.01)
+class SingleFlightTestCase(TestCase):
+    """Tests of the stampede guard letting one request at a time compute an expensive value."""
+
+    def setUp(self):
+        cache.clear()
+        self.computed = 0
+        self.computed_lock = threading.Lock()
+
+    def test_value_is_computed_once_by_concurrent_requests(self):
+        results = []
+
+        def request():
+            results.append(cached('test', 'test:expensive', self._compute_slowly, single_flight=True))
+
+        threads = [threading.Thread(target=request) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.computed, 1)
+        self.assertEqual(results, [1] * 8)
+
+    @override_settings(CACHE_LOCK_TIMEOUT=0.1)
+    def test_value_is_computed_when_the_lock_is_held_too_long(self):
+        cache.add('test:expensive:lock', True, 10)
+        self.assertEqual(cached('test', 'test:expensive', self._compute_slowly, single_flight=True), 1)
+        self.assertTrue(cache.has_key('test:expensive:lock'))
+
+    def test_lock_is_released_when_computing_fails(self):
+        with self.assertRaises(ZeroDivisionError):
+            cached('test', 'test:expensive', lambda: 1 / 0, single_flight=True)
+        self.assertFalse(cache.has_key('test:expensive:lock'))
+
+    def _compute_slowly(self):
+        time.sleep(0.2)
+        with self.computed_lock:
+            self.computed += 1
+            return self.computed
@@ -1,3 +1,13 @@
+import itertools
+import os
+import tempfile
+from contextlib import contextmanager
+from unittest import skipUnless
+
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Model
+from django.test import override_settings, tag
 from django.urls import reverse
 
 
@@ -7,6 +17,119 @@ def reverse_with_next(url_name, next_url):
     return url
 
 
+def benchmark(test):
+    """Tag a test, or test case, that measures timings; it only runs when CLUBS_BENCHMARKS is set."""
+    test = skipUnless(os.environ.get('CLUBS_BENCHMARKS'), 'set CLUBS_BENCHMARKS=1 to run benchmarks')(test)
+    return tag('benchmark')(test)
+
+
 class LogInTester:
     def _is_logged_in(self):
         return '_auth_user_id' in self.client.session.keys()
+
+
+@contextmanager
+def forbid_deferred_loading():
+    """Fail when a deferred field is loaded lazily, i.e. one query per object and field."""
+
+    refresh_from_db = Model.refresh_from_db
+
+    def guarded_refresh_from_db(instance, using=None, fields=None):
+        if fields is not None:
+            raise AssertionError(
+                f"Deferred field(s) {', '.join(fields)} of {type(instance).__name__} {instance.pk} loaded lazily"
+            )
+        return refresh_from_db(instance, using=using, fields=fields)
+
+    Model.refresh_from_db = guarded_refresh_from_db
+    try:
+        yield
+    finally:
+        Model.refresh_from_db = refresh_from_db
+
+
+class SingleDatabaseRouter:
+    """Router that sends every query to one database alias."""
+
+    def __init__(self, alias):
+        self.alias = alias
+
+    def db_for_read(self, model, **hints):
+        return self.alias
+
+    def db_for_write(self, model, **hints):
+        return self.alias
+
+
+_file_database_numbers = itertools.count()
+
+
+@contextmanager
+def sqlite_file_database(alias=None):
+    """Route every query to a freshly migrated SQLite file, which unlike the
+    in-memory test database can be shared by concurrent threads.
+
+    Each database gets a new alias, so long-lived threads that kept a connection
+    to an earlier one cannot reuse its settings."""
+
+    alias = alias or f'file_{next(_file_database_numbers)}'
+    with tempfile.TemporaryDirectory() as directory:
+        connections.databases[alias] = {
+            **connections.databases[DEFAULT_DB_ALIAS],
+            'NAME': os.path.join(directory, 'db.sqlite3'),
+        }
+        try:
+            with override_settings(DATABASE_ROUTERS=[SingleDatabaseRouter(alias)]):
+                call_command('migrate', database=alias, verbosity=0)
+                yield alias
+        finally:
+            connections[alias].close()
+            del connections[alias]
+            del connections.databases[alias]
+
+
+@contextmanager
+def sqlite_replica_databases(count=1):
+    """Add read replicas in temporary SQLite files, which stay empty until
+    sync_replicas copies the primary onto them."""
+
+    aliases = [f'replica_{next(_file_database_numbers)}' for _ in range(count)]
+    with tempfile.TemporaryDirectory() as directory:
+        for alias in aliases:
+            connections.databases[alias] = {
+                **connections.databases[DEFAULT_DB_ALIAS],
+                'NAME': os.path.join(directory, f'{alias}.sqlite3'),
+            }
+        try:
+            with override_settings(DATABASE_REPLICAS=aliases):
+                yield aliases
+        finally:
+            for alias in aliases:
+                connections[alias].close()
+                del connections[alias]
+                del connections.databases[alias]
+
+
+@contextmanager
+def sqlite_shard_databases(count=2):
+    """Add club shards in temporary, freshly migrated SQLite files."""
+
+    aliases = [f'shard_{next(_file_database_numbers)}' for _ in range(count)]
+    with tempfile.TemporaryDirectory() as directory:
+        for alias in aliases:
+            connections.databases[alias] = {
+                **connections.databases[DEFAULT_DB_ALIAS],
+                'NAME': os.path.join(directory, f'{alias}.sqlite3'),
+            }
+        try:
+            with override_settings(DATABASE_SHARDS=aliases):
+                for alias in aliases:
+                    call_command('migrate', database=alias, verbosity=0)
+                    # Reconnect, as migrating turns foreign key checks back on.
+                    connections[alias].close()
+                yield aliases
+        finally:
+            for alias in aliases:
+                connections[alias].close()
+                del connections[alias]
+                del connections.databases[alias]
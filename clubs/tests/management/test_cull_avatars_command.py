@@ -0,0 +1,44 @@
+"""Tests of the cull_avatars command."""
+
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+
+from clubs.avatars import avatar_path, get_avatar
+
+
+class CullAvatarsCommandTestCase(SimpleTestCase):
+    """Tests of the cull_avatars command."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.settings_override = override_settings(AVATAR_CACHE_DIR=self.directory.name, AVATAR_CACHE_MAX_FILES=6)
+        self.settings_override.enable()
+        self.email_hashes = [f'{number:032x}' for number in range(9)]
+        for email_hash in self.email_hashes:
+            get_avatar(email_hash, 60)
+
+    def tearDown(self):
+        self.settings_override.disable()
+        self.directory.cleanup()
+
+    def _remaining(self):
+        return [email_hash for email_hash in self.email_hashes if avatar_path(email_hash, 60).exists()]
+
+    def test_requests_do_not_cull_the_cache(self):
+        self.assertEqual(len(self._remaining()), 9)
+
+    def test_cull_deletes_oldest_avatars_past_the_limit(self):
+        stdout = StringIO()
+        call_command('cull_avatars', stdout=stdout)
+        self.assertEqual(len(self._remaining()), 6)
+        self.assertIn('Deleted 3 cached avatars', stdout.getvalue())
+
+    @override_settings(AVATAR_CACHE_MAX_FILES=9)
+    def test_cull_keeps_avatars_within_the_limit(self):
+        stdout = StringIO()
+        call_command('cull_avatars', stdout=stdout)
+        self.assertEqual(len(self._remaining()), 9)
+        self.assertIn('Deleted 0 cached avatars', stdout.getvalue())
@@ -0,0 +1,155 @@
+"""Tests of the import_users command."""
+
+import csv
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import authenticate
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from clubs.models import User, Club, Membership
+
+FIELDS = ['first_name', 'last_name', 'email', 'bio', 'experience_level', 'personal_statement', 'password', 'role']
+
+
+class ImportUsersCommandTestCase(TestCase):
+    """Tests of the import_users command."""
+
+    fixtures = [
+        'clubs/tests/fixtures/users/default_user.json',
+        'clubs/tests/fixtures/users/other_users.json',
+        'clubs/tests/fixtures/clubs/default_club.json',
+        'clubs/tests/fixtures/clubs/other_clubs.json',
+        'clubs/tests/fixtures/memberships/memberships.json',
+    ]
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self.directory.name, 'users.csv')
+        self.club = Club.objects.get(pk=6)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _write_csv(self, rows):
+        with open(self.csv_path, 'w', newline='') as csv_file:
+            writer = csv.DictWriter(csv_file, fieldnames=FIELDS)
+            writer.writeheader()
+            for row in rows:
+                writer.writerow(row)
+
+    def _row(self, index, **overrides):
+        row = {
+            'first_name': 'Imported',
+            'last_name': f'User{index}',
+            'email': f'imported{index}@example.org',
+            'bio': 'Imported bio',
+            'experience_level': 'Beginner',
+            'personal_statement': 'Imported statement',
+            'password': '',
+            'role': '',
+        }
+        row.update(overrides)
+        return row
+
+    def _import(self, **options):
+        stdout, stderr = StringIO(), StringIO()
+        call_command('import_users', self.csv_path, stdout=stdout, stderr=stderr, **options)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_imports_valid_rows(self):
+        self._write_csv([self._row(index) for index in range(5)])
+        before_count = User.objects.count()
+        output, _ = self._import(batch_size=2)
+        self.assertEqual(User.objects.count(), before_count + 5)
+        self.assertIn('Imported 5 users, skipped 0 duplicates and 0 invalid rows.', output)
+        self.assertFalse(os.path.exists(f'{self.csv_path}.checkpoint'))
+
+    def test_rows_without_password_get_unusable_password(self):
+        self._write_csv([self._row(0)])
+        self._import()
+        self.assertFalse(User.objects.get(email='imported0@example.org').has_usable_password())
+
+    def test_rows_with_password_can_log_in(self):
+        self._write_csv([self._row(0, password='Password123')])
+        self._import()
+        user = User.objects.get(email='imported0@example.org')
+        self.assertEqual(authenticate(email=user.email, password='Password123'), user)
+
+    def test_passwords_hashed_by_worker_processes_can_log_in(self):
+        rows = [self._row(index, password=f'Password{index}') for index in range(120)]
+        rows.append(self._row(120))
+        self._write_csv(rows)
+        self._import(batch_size=60, workers=2)
+        for index in (0, 59, 60, 119):
+            user = User.objects.get(email=f'imported{index}@example.org')
+            self.assertEqual(authenticate(email=user.email, password=f'Password{index}'), user)
+        self.assertFalse(User.objects.get(email='imported120@example.org').has_usable_password())
+
+    def test_invalid_rows_are_skipped(self):
+        self._write_csv([
+            self._row(0, email='not an email'),
+            self._row(1, first_name=''),
+            self._row(2, password='weak'),
+            self._row(3, role='3'),
+            self._row(4),
+        ])
+        before_count = User.objects.count()
+        output, errors = self._import()
+        self.assertEqual(User.objects.count(), before_count + 1)
+        self.assertIn('skipped 0 duplicates and 4 invalid rows.', output)
+        self.assertIn('Row 1 is invalid', errors)
+
+    def test_duplicate_emails_are_skipped(self):
+        self._write_csv([
+            self._row(0, email='JOHNDOE@example.org'),
+            self._row(1),
+            self._row(2, email='IMPORTED1@example.org'),
+        ])
+        before_count = User.objects.count()
+        output, _ = self._import()
+        self.assertEqual(User.objects.count(), before_count + 1)
+        self.assertIn('skipped 2 duplicates', output)
+
+    def test_imported_users_join_club_and_update_counters(self):
+        self._write_csv([self._row(0), self._row(1, role='0'), self._row(2, role='2')])
+        before_members = self.club.member_count
+        self._import(club=self.club.name, batch_size=2)
+        self.club.refresh_from_db()
+        self.assertEqual(self.club.member_count, before_members + 1)
+        self.assertEqual(self.club.officer_count, 1)
+        self.assertEqual(self.club.applicant_count, 1)
+        membership = Membership.objects.get(user__email='imported1@example.org', club=self.club)
+        self.assertEqual(membership.role, Membership.APPLICANT)
+
+    def test_unknown_club_raises_error(self):
+        self._write_csv([self._row(0)])
+        with self.assertRaises(CommandError):
+            self._import(club='No such club')
+
+    def test_resumes_from_checkpoint_after_failure(self):
+        self._write_csv([self._row(index) for index in range(6)])
+        before_count = User.objects.count()
+        original_bulk_create = User.objects.bulk_create
+        calls = []
+
+        def failing_bulk_create(objs, *args, **kwargs):
+            calls.append(objs)
+            if len(calls) == 2:
+                raise RuntimeError('Interrupted')
+            return original_bulk_create(objs, *args, **kwargs)
+
+        with mock.patch.object(User.objects, 'bulk_create', side_effect=failing_bulk_create):
+            with self.assertRaises(RuntimeError):
+                self._import(batch_size=2)
+        self.assertEqual(User.objects.count(), before_count + 2)
+        self.assertTrue(os.path.exists(f'{self.csv_path}.checkpoint'))
+
+        output, _ = self._import(batch_size=2)
+        self.assertIn('Resuming after row 2.', output)
+        self.assertEqual(User.objects.count(), before_count + 6)
+        self.assertFalse(os.path.exists(f'{self.csv_path}.checkpoint'))
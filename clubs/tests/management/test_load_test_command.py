@@ -0,0 +1,84 @@
+"""Tests of the load_test command against a live server."""
+
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import LiveServerTestCase
+
+from clubs.models import Club, Membership
+from clubs.tests.helpers import sqlite_shard_databases
+
+
+class LoadTestCommandTestCase(LiveServerTestCase):
+    """Tests of the load_test command against a live server."""
+
+    fixtures = [
+        'clubs/tests/fixtures/users/default_user.json',
+        'clubs/tests/fixtures/users/other_users.json',
+        'clubs/tests/fixtures/clubs/default_club.json',
+        'clubs/tests/fixtures/clubs/other_clubs.json',
+        'clubs/tests/fixtures/memberships/memberships.json'
+    ]
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.output_path = os.path.join(self.directory.name, 'results.json')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _load_test(self, **options):
+        call_command('load_test', base_url=self.live_server_url, password='Password123',
+                     output=self.output_path, stdout=StringIO(), **options)
+        with open(self.output_path) as output_file:
+            return json.load(output_file)
+
+    # The live server shares the in-memory test database between its threads, which can fail
+    # under concurrent requests, so the virtual users of these tests run one at a time.
+
+    def test_replays_journeys_without_errors(self):
+        report = self._load_test(concurrency=1, journeys=2)
+        self.assertEqual(report['errors'], 0)
+        self.assertEqual(report['config']['concurrency'], 1)
+        for step in ['log_in', 'start', 'my_clubs', 'select_club', 'user_list', 'log_out']:
+            self.assertIn(step, report['steps'])
+            self.assertGreater(report['steps'][step]['p50_ms'], 0)
+        self.assertEqual(report['steps']['start']['requests'], 2)
+        self.assertGreater(report['throughput_rps'], 0)
+
+    def test_officers_approve_applicants(self):
+        club = Club.objects.get(name='The Royal Rooks')
+        applicant_count = club.membership_set.filter(role=Membership.APPLICANT).count()
+        report = self._load_test(concurrency=1, journeys=1)
+        self.assertEqual(report['errors'], 0)
+        self.assertIn('approve_applicant', report['steps'])
+        self.assertEqual(report['steps']['approve_applicant']['errors'], 0)
+        approved = report['steps']['approve_applicant']['requests']
+        self.assertEqual(approved, 1)
+        self.assertEqual(club.membership_set.filter(role=Membership.APPLICANT).count(), applicant_count - approved)
+
+    def test_replays_journeys_with_sharded_clubs(self):
+        club = Club.objects.get(name='The Royal Rooks')
+        with sqlite_shard_databases():
+            rows = list(Membership.objects.using('default').values_list('user_id', 'club_id', 'role'))
+            Membership.objects.using('default').all().delete()
+            Membership.objects.bulk_create([
+                Membership(user_id=user_id, club_id=club_id, role=role) for user_id, club_id, role in rows
+            ])
+            Club.objects.recount_members()
+            applicant_count = club.membership_set.filter(role=Membership.APPLICANT).count()
+            report = self._load_test(concurrency=1, journeys=1)
+            self.assertEqual(report['errors'], 0)
+            self.assertEqual(report['steps']['approve_applicant']['requests'], 1)
+            self.assertEqual(club.membership_set.filter(role=Membership.APPLICANT).count(), applicant_count - 1)
+
+    def test_wrong_password_is_reported_as_errors(self):
+        call_command('load_test', base_url=self.live_server_url, password='WrongPassword1',
+                     output=self.output_path, concurrency=1, journeys=1, stdout=StringIO())
+        with open(self.output_path) as output_file:
+            report = json.load(output_file)
+        self.assertEqual(report['steps']['log_in']['errors'], 1)
+        self.assertNotIn('start', report['steps'])
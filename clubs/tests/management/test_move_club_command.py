@@ -0,0 +1,87 @@
+"""Tests of the move_club command."""
+
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import IntegrityError
+from django.test import TransactionTestCase
+
+from clubs.models import User, Club, ClubShard, Membership
+from clubs.shards import shard_for_club
+from clubs.tests.helpers import sqlite_shard_databases
+
+
+class MoveClubCommandTestCase(TransactionTestCase):
+    """Tests of the move_club command."""
+
+    def setUp(self):
+        self.club = Club.objects.create(name='Chess Club', location='London')
+        self.users = [
+            User.objects.create(email=f'user{index}@example.org', first_name='First', last_name='Last')
+            for index in range(5)
+        ]
+
+    def _move(self, shard, **options):
+        call_command('move_club', self.club.id, shard, stdout=StringIO(), **options)
+
+    def test_move_club_moves_its_memberships(self):
+        with sqlite_shard_databases() as shards:
+            for role, user in enumerate(self.users[:4]):
+                Membership.objects.create(user=user, club=self.club, role=role)
+            source = shard_for_club(self.club.id)
+            target, = set(shards) - {source}
+            self._move(target, batch_size=3)
+            self.assertEqual(shard_for_club(self.club.id), target)
+            self.assertFalse(Membership.objects.using(source).filter(club=self.club).exists())
+            roles = dict(self.club.membership_set.values_list('user_id', 'role'))
+            self.assertEqual(roles, {user.id: role for role, user in enumerate(self.users[:4])})
+            self.club.refresh_from_db()
+            self.assertEqual(self.club.associate_count, 4)
+
+    def test_move_club_brings_earlier_copy_up_to_date(self):
+        with sqlite_shard_databases() as shards:
+            for user in self.users[:3]:
+                Membership.objects.create(user=user, club=self.club)
+            source = shard_for_club(self.club.id)
+            target, = set(shards) - {source}
+            Membership.objects.using(target).bulk_create([
+                Membership(user=self.users[0], club=self.club, role=Membership.MEMBER),
+                Membership(user=self.users[4], club=self.club),
+            ])
+            self._move(target)
+            roles = dict(self.club.membership_set.values_list('user_id', 'role'))
+        self.assertEqual(roles, {user.id: Membership.APPLICANT for user in self.users[:3]})
+
+    def test_club_can_be_moved_back(self):
+        with sqlite_shard_databases() as shards:
+            Membership.objects.create(user=self.users[0], club=self.club)
+            source = shard_for_club(self.club.id)
+            target, = set(shards) - {source}
+            self._move(target)
+            self._move(source)
+            self.assertEqual(shard_for_club(self.club.id), source)
+            self.assertTrue(self.club.exist(self.users[0]))
+            self.assertEqual(ClubShard.objects.get(club=self.club).database, source)
+
+    def test_old_shard_refuses_writes_to_a_moved_club(self):
+        with sqlite_shard_databases() as shards:
+            Membership.objects.create(user=self.users[0], club=self.club)
+            source = shard_for_club(self.club.id)
+            target, = set(shards) - {source}
+            self._move(target)
+            with self.assertRaises(IntegrityError):
+                Membership.objects.using(source).create(user=self.users[1], club=self.club)
+            self.assertFalse(Membership.objects.using(source).filter(club=self.club).exists())
+            self.club.add_user(self.users[1])
+            self.assertEqual(self.club.membership_set.count(), 2)
+
+    def test_move_to_unknown_shard_fails(self):
+        with sqlite_shard_databases():
+            with self.assertRaises(CommandError):
+                self._move('no_such_shard')
+
+    def test_move_of_unknown_club_fails(self):
+        with sqlite_shard_databases() as shards:
+            with self.assertRaises(CommandError):
+                call_command('move_club', self.club.id + 1, shards[0], stdout=StringIO())
@@ -0,0 +1,48 @@
+"""Tests of the bulk seeding mode of the seed command."""
+
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import authenticate
+from django.core.management import call_command
+from django.test import TestCase
+
+from clubs.management.commands.seed import Command
+from clubs.models import User, Club, Membership
+
+
+class BulkSeedCommandTestCase(TestCase):
+    """Tests of the bulk seeding mode of the seed command."""
+
+    def setUp(self):
+        with mock.patch('sys.stdout', new_callable=StringIO):
+            call_command('seed', users=120, clubs=4, memberships_per_club=25, batch_size=50, workers=1)
+
+    def test_bulk_seed_creates_requested_rows(self):
+        self.assertEqual(User.objects.count(), 120)
+        self.assertEqual(Club.objects.count(), 4)
+        self.assertEqual(Membership.objects.count(), 100)
+
+    def test_every_club_has_one_owner(self):
+        for club in Club.objects.all():
+            self.assertEqual(club.membership_set.filter(role=Membership.OWNER).count(), 1)
+
+    def test_club_counters_are_recounted(self):
+        for club in Club.objects.all():
+            self.assertEqual(club.associate_count, 25)
+            self.assertEqual(club.applicant_count, club.membership_set.filter(role=Membership.APPLICANT).count())
+            self.assertEqual(club.member_count, club.membership_set.filter(role=Membership.MEMBER).count())
+            self.assertEqual(club.officer_count, club.membership_set.filter(role=Membership.OFFICER).count())
+
+    def test_seeded_users_can_log_in_with_default_password(self):
+        user = User.objects.first()
+        self.assertEqual(authenticate(email=user.email, password=Command.DEFAULT_PASSWORD), user)
+
+    def test_bulk_seed_can_run_again(self):
+        with mock.patch('sys.stdout', new_callable=StringIO):
+            call_command('seed', users=120, clubs=4, memberships_per_club=25, batch_size=50, workers=1)
+        self.assertEqual(User.objects.count(), 240)
+        self.assertEqual(Club.objects.count(), 8)
+
+    def test_password_is_hashed_once(self):
+        self.assertEqual(User.objects.values('password').distinct().count(), 1)
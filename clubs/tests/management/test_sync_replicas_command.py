@@ -0,0 +1,40 @@
+"""Tests of the sync_replicas command."""
+
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TransactionTestCase, override_settings
+
+from clubs.models import User
+from clubs.tests.helpers import sqlite_replica_databases
+
+
+class SyncReplicasCommandTestCase(TransactionTestCase):
+    """Tests of the sync_replicas command."""
+
+    fixtures = [
+        'clubs/tests/fixtures/users/default_user.json',
+        'clubs/tests/fixtures/users/other_users.json',
+    ]
+
+    def test_sync_copies_primary_onto_every_replica(self):
+        with sqlite_replica_databases(2) as replicas:
+            call_command('sync_replicas', stdout=StringIO())
+            for replica in replicas:
+                self.assertEqual(User.objects.using(replica).count(), User.objects.count())
+
+    def test_sync_replaces_earlier_copy(self):
+        with sqlite_replica_databases() as replicas:
+            call_command('sync_replicas', stdout=StringIO())
+            User.objects.create(email='new@example.org', first_name='New', last_name='User')
+            User.objects.filter(email='johndoe@example.org').delete()
+            call_command('sync_replicas', stdout=StringIO())
+            emails = set(User.objects.using(replicas[0]).values_list('email', flat=True))
+        self.assertIn('new@example.org', emails)
+        self.assertNotIn('johndoe@example.org', emails)
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_sync_fails_without_replicas(self):
+        with self.assertRaises(CommandError):
+            call_command('sync_replicas', stdout=StringIO())
@@ -0,0 +1,65 @@
+"""Tests of the current membership middleware."""
+
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from django.http import HttpRequest
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from clubs.middleware import CurrentMembership
+from clubs.models import User, Club, Membership
+
+
+class CurrentMembershipMiddlewareTestCase(TestCase):
+    """Tests of the current membership middleware."""
+
+    fixtures = [
+        'clubs/tests/fixtures/users/default_user.json',
+        'clubs/tests/fixtures/users/other_users.json',
+        'clubs/tests/fixtures/clubs/default_club.json',
+        'clubs/tests/fixtures/clubs/other_clubs.json',
+        'clubs/tests/fixtures/memberships/memberships.json'
+    ]
+
+    def setUp(self):
+        self.user = User.objects.get(email='johndoe@example.org')
+        self.owner = User.objects.get(email='jennydoe@example.org')
+        self.other_club = Club.objects.get(name='The Royal Rooks')
+        self.owner.select_club(self.other_club)
+
+    def test_role_of_current_club(self):
+        membership = self._current_membership(self.owner)
+        self.assertEqual(membership.role, Membership.OWNER)
+
+    def test_role_is_none_without_current_club(self):
+        membership = self._current_membership(self.user)
+        self.assertIsNone(membership.role)
+
+    def test_role_is_none_for_anonymous_user(self):
+        membership = self._current_membership(AnonymousUser())
+        self.assertIsNone(membership.role)
+
+    def test_membership_is_loaded_once(self):
+        membership = self._current_membership(self.owner)
+        with self.assertNumQueries(1):
+            membership.role
+            membership.role
+            self.owner.current_club.name
+
+    def test_page_load_looks_up_membership_once(self):
+        self.client.login(email=self.owner.email, password='Password123')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('officers_list'))
+        self.assertEqual(response.status_code, 200)
+        membership_lookups = [
+            query['sql'] for query in queries
+            if f'"membership"."club_id" = {self.other_club.id}' in query['sql']
+            and f'"membership"."user_id" = {self.owner.id}' in query['sql']
+        ]
+        self.assertEqual(len(membership_lookups), 1)
+
+    def _current_membership(self, user):
+        request = HttpRequest()
+        request.user = user
+        return CurrentMembership(request)
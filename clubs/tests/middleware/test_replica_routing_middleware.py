@@ -0,0 +1,84 @@
+"""Tests of the replica routing middleware."""
+
+from django.db import connections
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from clubs.middleware import ReplicaRoutingMiddleware
+from clubs.models import User, Club, Membership
+from clubs.replicas import sync_replicas
+from clubs.tests.helpers import sqlite_replica_databases
+
+
+class ReplicaRoutingMiddlewareTestCase(TransactionTestCase):
+    """Tests of the replica routing middleware."""
+
+    fixtures = [
+        'clubs/tests/fixtures/users/default_user.json',
+        'clubs/tests/fixtures/users/other_users.json',
+        'clubs/tests/fixtures/clubs/default_club.json',
+        'clubs/tests/fixtures/clubs/other_clubs.json',
+        'clubs/tests/fixtures/memberships/memberships.json'
+    ]
+
+    def setUp(self):
+        self.user = User.objects.get(email='janedoe@example.org')
+        self.user.select_club(Club.objects.get(name='The Royal Rooks'))
+        self.client.login(email=self.user.email, password='Password123')
+
+    def test_read_only_view_reads_from_replica(self):
+        with sqlite_replica_databases():
+            sync_replicas()
+            Club.objects.create(name='Club created after the sync', location='London')
+            response = self.client.get(reverse('club_list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, 'Club created after the sync')
+        self.assertNotIn(ReplicaRoutingMiddleware.COOKIE_NAME, response.cookies)
+
+    def test_other_views_read_from_primary(self):
+        with sqlite_replica_databases() as replicas:
+            sync_replicas()
+            with CaptureQueriesContext(connections[replicas[0]]) as replica_queries:
+                response = self.client.get(reverse('my_clubs'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(replica_queries), 0)
+
+    def test_write_keeps_the_user_on_primary(self):
+        with sqlite_replica_databases() as replicas:
+            sync_replicas()
+            club = Club.objects.create(name='Club created after the sync', location='London')
+            response = self.client.get(reverse('apply', kwargs={'club_id': club.id}))
+            cookie = response.cookies[ReplicaRoutingMiddleware.COOKIE_NAME]
+            with CaptureQueriesContext(connections[replicas[0]]) as replica_queries:
+                response = self.client.get(reverse('club_list'))
+        self.assertGreater(cookie['max-age'], 0)
+        self.assertEqual(len(replica_queries), 0)
+        self.assertContains(response, 'Club created after the sync')
+
+    def test_reads_return_to_replica_when_stickiness_expires(self):
+        with sqlite_replica_databases() as replicas:
+            sync_replicas()
+            club = Club.objects.create(name='Club created after the sync', location='London')
+            self.client.get(reverse('apply', kwargs={'club_id': club.id}))
+            del self.client.cookies[ReplicaRoutingMiddleware.COOKIE_NAME]
+            with CaptureQueriesContext(connections[replicas[0]]) as replica_queries:
+                self.client.get(reverse('club_list'))
+        self.assertGreater(len(replica_queries), 0)
+
+    def test_role_is_checked_on_primary_in_views_reading_from_replica(self):
+        officer = User.objects.get(email='jamesdoe@example.org')
+        club = Club.objects.get(name='The Royal Rooks')
+        officer.select_club(club)
+        self.client.login(email=officer.email, password='Password123')
+        with sqlite_replica_databases():
+            sync_replicas()
+            Membership.objects.filter(user=officer, club=club).update(role=Membership.MEMBER)
+            response = self.client.get(reverse('applicants_list'))
+        self.assertRedirects(response, reverse('start'), fetch_redirect_response=False)
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_middleware_is_not_used_without_replicas(self):
+        club = Club.objects.create(name='New Club', location='London')
+        response = self.client.get(reverse('apply', kwargs={'club_id': club.id}))
+        self.assertNotIn(ReplicaRoutingMiddleware.COOKIE_NAME, response.cookies)
@@ -0,0 +1,90 @@
+"""Tests of the SQL profiling middleware and its admin report."""
+
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from clubs.middleware import SQLProfilingMiddleware
+from clubs.models import User, Club
+from clubs.profiling import QueryRecorder, clear_profiles, percentile, profile_report
+
+
+@override_settings(SQL_PROFILING=True)
+class SQLProfilingMiddlewareTestCase(TestCase):
+    """Tests of the SQL profiling middleware and its admin report."""
+
+    fixtures = [
+        'clubs/tests/fixtures/users/default_user.json',
+        'clubs/tests/fixtures/users/other_users.json',
+        'clubs/tests/fixtures/clubs/default_club.json',
+        'clubs/tests/fixtures/clubs/other_clubs.json',
+        'clubs/tests/fixtures/memberships/memberships.json'
+    ]
+
+    def setUp(self):
+        clear_profiles()
+        self.user = User.objects.get(email='johndoe@example.org')
+        self.user.select_club(Club.objects.get(name='Chess Club'))
+        self.client.login(email=self.user.email, password='Password123')
+
+    def tearDown(self):
+        clear_profiles()
+
+    def test_middleware_is_not_used_when_disabled(self):
+        with override_settings(SQL_PROFILING=False):
+            with self.assertRaises(MiddlewareNotUsed):
+                SQLProfilingMiddleware(lambda request: None)
+
+    def test_records_requests_per_url_name(self):
+        self.client.get(reverse('start'))
+        self.client.get(reverse('start'))
+        self.client.get(reverse('club_list'))
+        report = {row['url_name']: row for row in profile_report()}
+        self.assertEqual(report['start']['requests'], 2)
+        self.assertEqual(report['club_list']['requests'], 1)
+        self.assertGreater(report['start']['mean_queries'], 0)
+        self.assertGreater(report['start']['p95_ms'], 0)
+        self.assertGreaterEqual(report['start']['p95_ms'], report['start']['p50_ms'])
+
+    def test_unresolved_urls_are_grouped(self):
+        self.client.get('/no_such_page/')
+        self.assertEqual([row['url_name'] for row in profile_report()], ['unresolved'])
+
+    @override_settings(SQL_PROFILING_BUFFER_SIZE=3)
+    def test_buffer_is_bounded(self):
+        clear_profiles()
+        for _ in range(5):
+            self.client.get(reverse('start'))
+        self.assertEqual(profile_report()[0]['requests'], 3)
+
+    def test_recorder_counts_repeated_statements(self):
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            list(User.objects.filter(id=self.user.id))
+            list(User.objects.filter(id=self.user.id + 1))
+            list(Club.objects.all())
+        summary = recorder.summary(0.1)
+        self.assertEqual(summary['query_count'], 3)
+        self.assertEqual(summary['repeated_count'], 1)
+        self.assertEqual(len(summary['slowest']), 3)
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 0.5), 50)
+        self.assertEqual(percentile(values, 0.95), 95)
+        self.assertEqual(percentile([7], 0.95), 7)
+
+    def test_report_page_is_staff_only(self):
+        response = self.client.get(reverse('sql_profile'))
+        self.assertEqual(response.status_code, 302)
+        self.assertIn(reverse('admin:login'), response.url)
+
+    def test_staff_can_see_report_page(self):
+        self.user.is_staff = True
+        self.user.save()
+        self.client.get(reverse('start'))
+        response = self.client.get(reverse('sql_profile'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'admin/sql_profile.html')
+        self.assertContains(response, '<td>start</td>', html=True)
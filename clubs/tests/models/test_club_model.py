@@ -1,5 +1,6 @@
 """Unit tests for the Club model."""
 from django.core.exceptions import ValidationError, ObjectDoesNotExist
+from django.core.management import call_command
 from django.db import IntegrityError
 from django.test import TestCase
 
@@ -11,12 +12,14 @@ class ClubModelTestCase(TestCase):
 
     fixtures = [
         'clubs/tests/fixtures/users/default_user.json',
+        'clubs/tests/fixtures/users/other_users.json',
         'clubs/tests/fixtures/clubs/default_club.json',
         'clubs/tests/fixtures/clubs/other_clubs.json'
     ]
 
     def setUp(self):
         self.user = User.objects.get(email='johndoe@example.org')
+        self.other_user = User.objects.get(email='janedoe@example.org')
         self.club = Club.objects.get(name='Chess Club')
         self.other_club = Club.objects.get(name='The Royal Rooks')
 
@@ -120,9 +123,57 @@ class ClubModelTestCase(TestCase):
     def test_club_owner_property_raises_error_when_no_owner(self):
         self.assertEqual(self.club.owner, None)
 
+    def test_counters_count_new_memberships(self):
+        self.club.add_user(self.user)
+        Membership.objects.create(user=self.other_user, club=self.club, role=Membership.OFFICER)
+        self._assert_counts(applicants=1, members=0, officers=1, associates=2)
+        self.assertEqual(self.club.members_count, 1)
+
+    def test_counters_follow_role_changes(self):
+        self.club.add_user(self.user)
+        self.club.change_role(self.user, Membership.MEMBER)
+        self._assert_counts(applicants=0, members=1, officers=0, associates=1)
+        self.club.change_role(self.user, Membership.OFFICER)
+        self._assert_counts(applicants=0, members=0, officers=1, associates=1)
+
+    def test_counters_count_deleted_memberships(self):
+        self.club.add_user(self.user)
+        Membership.objects.create(user=self.other_user, club=self.club, role=Membership.OWNER)
+        self.club.membership_set.get(user=self.user).delete()
+        self._assert_counts(applicants=0, members=0, officers=0, associates=1)
+        self.other_user.delete()
+        self._assert_counts(applicants=0, members=0, officers=0, associates=0)
+
+    def test_adding_existing_user_is_not_counted_twice(self):
+        self.club.add_user(self.user)
+        self.club.add_user(self.user)
+        self._assert_counts(applicants=1, members=0, officers=0, associates=1)
+
+    def test_recount_members_repairs_counters(self):
+        Membership.objects.bulk_create([
+            Membership(user=self.user, club=self.club, role=Membership.MEMBER),
+            Membership(user=self.other_user, club=self.club, role=Membership.APPLICANT),
+        ])
+        self._assert_counts(applicants=0, members=0, officers=0, associates=0)
+        Club.objects.all().recount_members()
+        self._assert_counts(applicants=1, members=1, officers=0, associates=2)
+
+    def test_loading_a_fixture_keeps_its_counters(self):
+        call_command('loaddata', 'clubs/tests/fixtures/memberships/memberships.json', verbosity=0)
+        self.other_club.refresh_from_db()
+        self.assertEqual(self.other_club.applicant_count, 1)
+        self.assertEqual(self.other_club.associate_count, 4)
+
     def test_str_returns_club_name(self):
         self.assertEqual(self.club.__str__(), self.club.name)
 
+    def _assert_counts(self, applicants, members, officers, associates):
+        self.club.refresh_from_db()
+        self.assertEqual(self.club.applicant_count, applicants)
+        self.assertEqual(self.club.member_count, members)
+        self.assertEqual(self.club.officer_count, officers)
+        self.assertEqual(self.club.associate_count, associates)
+
     def _assert_club_is_valid(self):
         try:
             self.club.full_clean()
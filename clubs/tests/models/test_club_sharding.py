@@ -0,0 +1,155 @@
+"""Tests of club sharding."""
+
+from django.db import transaction
+from django.test import TransactionTestCase
+from django.urls import reverse
+
+from clubs.cache import bump_versions, get_user_clubs
+from clubs.models import User, Club, ClubShard, Membership
+from clubs.shards import SHARD_MAP, memberships_of_user, owners_of_clubs, shard_for_club
+from clubs.tests.helpers import sqlite_shard_databases
+
+
+class ClubShardingTestCase(TransactionTestCase):
+    """Tests of club sharding."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('user@example.org', password='Password123',
+                                             first_name='First', last_name='Last')
+        self.other_user = User.objects.create_user('other@example.org', first_name='Other', last_name='User')
+        self.clubs = [Club.objects.create(name=f'Club {index}', location='London') for index in range(2)]
+
+    def _shard_memberships(self, alias, club):
+        return Membership.objects.using(alias).filter(club=club)
+
+    def test_clubs_are_spread_over_shards(self):
+        with sqlite_shard_databases() as shards:
+            self.assertEqual({shard_for_club(club.id) for club in self.clubs}, set(shards))
+
+    def test_shard_map_is_kept_in_the_process_until_its_version_is_bumped(self):
+        with sqlite_shard_databases() as shards:
+            club = self.clubs[0]
+            source = shard_for_club(club.id)
+            target, = set(shards) - {source}
+            ClubShard.objects.create(club=club, database=target)
+            with self.assertNumQueries(0):
+                self.assertEqual(shard_for_club(club.id), source)
+            bump_versions(SHARD_MAP)
+            self.assertEqual(shard_for_club(club.id), target)
+
+    def test_membership_is_written_to_the_shard_of_its_club(self):
+        with sqlite_shard_databases() as shards:
+            for club in self.clubs:
+                Membership.objects.create(user=self.user, club=club)
+            for club in self.clubs:
+                shard = shard_for_club(club.id)
+                other_shard, = set(shards) - {shard}
+                self.assertTrue(self._shard_memberships(shard, club).filter(user=self.user).exists())
+                self.assertFalse(self._shard_memberships(other_shard, club).exists())
+            self.assertFalse(Membership.objects.using('default').exists())
+
+    def test_club_methods_use_the_shard_of_the_club(self):
+        with sqlite_shard_databases():
+            club = self.clubs[0]
+            club.add_user(self.user)
+            self.assertTrue(club.exist(self.user))
+            self.assertEqual(club.change_roles([self.user.id], Membership.APPLICANT, Membership.MEMBER), 1)
+            self.assertTrue(club.is_of_role(self.user, Membership.MEMBER))
+            self.assertEqual(Membership.objects.get(user=self.user, club=club).role, Membership.MEMBER)
+            club.refresh_from_db()
+            self.assertEqual(club.member_count, 1)
+
+    def test_counters_change_when_the_shard_transaction_commits(self):
+        with sqlite_shard_databases():
+            club = self.clubs[0]
+            shard = shard_for_club(club.id)
+            with transaction.atomic(using=shard):
+                Membership.objects.create(user=self.user, club=club)
+                club.refresh_from_db()
+                self.assertEqual(club.applicant_count, 0)
+            club.refresh_from_db()
+            self.assertEqual(club.applicant_count, 1)
+            with transaction.atomic(using=shard):
+                Membership.objects.create(user=self.other_user, club=club)
+                transaction.set_rollback(True, using=shard)
+            club.refresh_from_db()
+            self.assertEqual(club.applicant_count, 1)
+
+    def test_recount_members_counts_the_memberships_on_every_shard(self):
+        with sqlite_shard_databases():
+            for club in self.clubs:
+                Membership.objects.create(user=self.user, club=club, role=Membership.MEMBER)
+                Membership.objects.create(user=self.other_user, club=club)
+            Club.objects.update(member_count=0, applicant_count=5, associate_count=0)
+            self.assertEqual(Club.objects.recount_members(batch_size=1), 2)
+            for club in self.clubs:
+                club.refresh_from_db()
+                self.assertEqual((club.applicant_count, club.member_count, club.associate_count), (1, 1, 2))
+
+    def test_bulk_create_writes_every_row_to_the_shard_of_its_club(self):
+        with sqlite_shard_databases():
+            Membership.objects.bulk_create([
+                Membership(user=user, club=club) for user in [self.user, self.other_user] for club in self.clubs
+            ])
+            for club in self.clubs:
+                self.assertEqual(self._shard_memberships(shard_for_club(club.id), club).count(), 2)
+
+    def test_memberships_of_user_are_gathered_from_every_shard(self):
+        with sqlite_shard_databases():
+            for club in reversed(self.clubs):
+                Membership.objects.create(user=self.user, club=club, role=Membership.MEMBER)
+            Membership.objects.create(user=self.other_user, club=self.clubs[0])
+            memberships = memberships_of_user(self.user)
+            self.assertEqual([membership.club for membership in memberships], self.clubs)
+            self.assertEqual(get_user_clubs(self.user), [{'id': club.id, 'name': club.name} for club in self.clubs])
+
+    def test_my_clubs_view_lists_clubs_of_every_shard(self):
+        with sqlite_shard_databases():
+            for club in self.clubs:
+                Membership.objects.create(user=self.user, club=club, role=Membership.MEMBER)
+            self.user.select_club(self.clubs[1])
+            self.client.login(email=self.user.email, password='Password123')
+            response = self.client.get(reverse('my_clubs'))
+        self.assertEqual([club for club, _ in response.context['clubs_user_in']], self.clubs)
+        self.assertEqual(list(response.context['clubs_user_not_in']), [])
+        self.assertEqual(response.context['current_club_name'], self.clubs[1].name)
+
+    def test_club_scoped_reads_use_the_shard_of_the_club(self):
+        with sqlite_shard_databases():
+            club = self.clubs[0]
+            Membership.objects.create(user=self.user, club=club, role=Membership.OWNER)
+            Membership.objects.create(user=self.other_user, club=club, role=Membership.APPLICANT)
+            self.assertEqual(club.owner, self.user)
+            self.assertIsNone(self.clubs[1].owner)
+            self.assertEqual(list(club.associates_in(Membership.APPLICANT)), [self.other_user])
+            self.assertEqual(owners_of_clubs([club.id for club in self.clubs]), {club.id: self.user})
+
+    def test_club_pages_list_the_rows_of_the_shard_of_the_club(self):
+        with sqlite_shard_databases():
+            club = self.clubs[0]
+            Membership.objects.create(user=self.user, club=club, role=Membership.OWNER)
+            Membership.objects.create(user=self.other_user, club=club, role=Membership.APPLICANT)
+            self.user.select_club(club)
+            self.client.login(email=self.user.email, password='Password123')
+            applicants = self.client.get(reverse('applicants_list')).context['applicants']
+            users = self.client.get(reverse('user_list')).context['users']
+            clubs = self.client.get(reverse('club_list')).context['clubs']
+            show_club = self.client.get(reverse('show_club', kwargs={'club_id': club.id}))
+            roster = b''.join(self.client.get(reverse('export_roster')).streaming_content).decode()
+        self.assertEqual(list(applicants), [self.other_user])
+        self.assertEqual(list(users), [self.user])
+        self.assertEqual([(club.owner_first_name, club.owner_last_name) for club in clubs],
+                         [('First', 'Last'), (None, None)])
+        self.assertContains(show_club, 'First Last')
+        self.assertIn('First,Last,user@example.org,Owner', roster)
+        self.assertIn('Other,User,other@example.org,Applicant', roster)
+
+    def test_deleting_a_user_deletes_their_memberships_on_every_shard(self):
+        with sqlite_shard_databases():
+            for club in self.clubs:
+                Membership.objects.create(user=self.other_user, club=club, role=Membership.MEMBER)
+            self.other_user.delete()
+            self.assertEqual(memberships_of_user(self.other_user), [])
+            for club in self.clubs:
+                club.refresh_from_db()
+                self.assertEqual(club.member_count, 0)
@@ -0,0 +1,68 @@
+"""Tests of retrying model writes that find the database locked."""
+
+from unittest import mock
+
+from django.db import OperationalError, transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from clubs.sqlite import retry_on_locked
+
+
+@override_settings(SQLITE_WRITE_RETRIES=3, SQLITE_RETRY_BASE_DELAY=0.001, SQLITE_RETRY_MAX_DELAY=0.002)
+class RetryOnLockedTestCase(SimpleTestCase):
+    """Tests of retrying model writes that find the database locked."""
+
+    def _failing(self, failures, message='database is locked'):
+        calls = []
+
+        @retry_on_locked
+        def write():
+            calls.append(1)
+            if len(calls) <= failures:
+                raise OperationalError(message)
+            return 'written'
+
+        return write, calls
+
+    def test_retries_until_write_succeeds(self):
+        write, calls = self._failing(2)
+        self.assertEqual(write(), 'written')
+        self.assertEqual(len(calls), 3)
+
+    def test_gives_up_after_bounded_retries(self):
+        write, calls = self._failing(10)
+        with self.assertRaises(OperationalError):
+            write()
+        self.assertEqual(len(calls), 4)
+
+    def test_other_errors_are_not_retried(self):
+        write, calls = self._failing(1, message='no such table: membership')
+        with self.assertRaises(OperationalError):
+            write()
+        self.assertEqual(len(calls), 1)
+
+    def test_backoff_is_bounded(self):
+        write, _ = self._failing(3)
+        with mock.patch('clubs.sqlite.time.sleep') as sleep:
+            write()
+        delays = [call.args[0] for call in sleep.call_args_list]
+        self.assertEqual(len(delays), 3)
+        self.assertTrue(all(delay <= 0.002 for delay in delays))
+
+
+@override_settings(SQLITE_WRITE_RETRIES=3, SQLITE_RETRY_BASE_DELAY=0.001)
+class RetryOnLockedInTransactionTestCase(TestCase):
+    """Tests of retrying model writes within an enclosing transaction."""
+
+    def test_errors_within_a_transaction_are_not_retried(self):
+        calls = []
+
+        @retry_on_locked
+        def write():
+            calls.append(1)
+            raise OperationalError('database is locked')
+
+        with self.assertRaises(OperationalError):
+            with transaction.atomic():
+                write()
+        self.assertEqual(len(calls), 1)
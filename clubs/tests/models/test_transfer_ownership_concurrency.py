@@ -0,0 +1,86 @@
+"""Concurrency tests of transferring the ownership of a club."""
+
+import random
+import threading
+
+from django.db import connections
+from django.test import TransactionTestCase
+
+from clubs.models import User, Club, Membership
+from clubs.tests.helpers import sqlite_file_database
+
+
+class TransferOwnershipConcurrencyTestCase(TransactionTestCase):
+    """Concurrency tests of transferring the ownership of a club."""
+
+    THREAD_COUNT = 8
+    ATTEMPTS_PER_THREAD = 25
+    OFFICER_COUNT = 5
+
+    def test_parallel_transfers_keep_exactly_one_owner(self):
+        with sqlite_file_database():
+            club = Club.objects.create(name='Chess Club', location='London')
+            users = [
+                User.objects.create(email=f'user{index}@example.org', first_name='First', last_name='Last')
+                for index in range(self.OFFICER_COUNT + 1)
+            ]
+            Membership.objects.create(user=users[0], club=club, role=Membership.OWNER)
+            for user in users[1:]:
+                Membership.objects.create(user=user, club=club, role=Membership.OFFICER)
+
+            successes, errors = self._run_in_threads(self._transfer_repeatedly, club, users)
+
+            self.assertEqual(errors, [])
+            self.assertGreater(successes, 0)
+            self.assertEqual(club.membership_set.filter(role=Membership.OWNER).count(), 1)
+            self.assertEqual(club.membership_set.filter(role=Membership.OFFICER).count(), self.OFFICER_COUNT)
+
+    def test_parallel_transfers_from_the_same_owner_succeed_once(self):
+        with sqlite_file_database():
+            club = Club.objects.create(name='Chess Club', location='London')
+            owner = User.objects.create(email='owner@example.org', first_name='First', last_name='Last')
+            Membership.objects.create(user=owner, club=club, role=Membership.OWNER)
+            officers = []
+            for index in range(self.THREAD_COUNT):
+                officer = User.objects.create(email=f'officer{index}@example.org', first_name='First', last_name='Last')
+                Membership.objects.create(user=officer, club=club, role=Membership.OFFICER)
+                officers.append(officer)
+            barrier = threading.Barrier(self.THREAD_COUNT)
+
+            def transfer(index):
+                barrier.wait()
+                return int(club.transfer_ownership(owner, officers[index]))
+
+            successes, errors = self._run_in_threads(transfer)
+
+            self.assertEqual(errors, [])
+            self.assertEqual(successes, 1)
+            self.assertEqual(club.membership_set.filter(role=Membership.OWNER).count(), 1)
+            self.assertEqual(club.membership_set.get(user=owner).role, Membership.OFFICER)
+
+    def _transfer_repeatedly(self, index, club, users):
+        successes = 0
+        for _ in range(self.ATTEMPTS_PER_THREAD):
+            owner = club.membership_set.get(role=Membership.OWNER).user
+            new_owner = random.choice([user for user in users if user != owner])
+            successes += club.transfer_ownership(owner, new_owner)
+        return successes
+
+    def _run_in_threads(self, target, *args):
+        results = []
+        errors = []
+
+        def run(index):
+            try:
+                results.append(target(index, *args))
+            except Exception as error:
+                errors.append(error)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=run, args=(index,)) for index in range(self.THREAD_COUNT)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return sum(results), errors
@@ -1,6 +1,7 @@
 """Unit tests for the User model."""
 from django.core.exceptions import ValidationError
 from django.test import TestCase
+from libgravatar import Gravatar
 
 from clubs.models import User, Club
 
@@ -152,6 +153,29 @@ class UserModelTestCase(TestCase):
             self.assertTrue(user.is_staff)
             self.assertFalse(user.is_superuser)
 
+    def test_gravatar_matches_libgravatar(self):
+        for size in (1, 60, 80, 120, 2047):
+            expected = Gravatar(self.user.email).get_image(size=size, default='identicon')
+            self.assertEqual(self.user.gravatar(size=size), expected)
+
+    def test_mini_gravatar_matches_libgravatar(self):
+        expected = Gravatar(self.user.email).get_image(size=60, default='identicon')
+        self.assertEqual(self.user.mini_gravatar(), expected)
+
+    def test_gravatar_ignores_email_case_and_whitespace(self):
+        gravatar_url = self.user.gravatar()
+        self.user.email = f'  {self.user.email.upper()} '
+        self.assertEqual(self.user.gravatar(), gravatar_url)
+
+    def test_gravatar_follows_email_changes(self):
+        self.user.email = 'changed@example.org'
+        expected = Gravatar('changed@example.org').get_image(size=120, default='identicon')
+        self.assertEqual(self.user.gravatar(), expected)
+
+    def test_gravatar_rejects_invalid_size(self):
+        with self.assertRaises(ValueError):
+            self.user.gravatar(size=2048)
+
     def _assert_user_is_valid(self):
         try:
             self.user.full_clean()
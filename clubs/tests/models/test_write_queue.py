@@ -0,0 +1,180 @@
+"""Tests of the write queue."""
+
+import threading
+from contextvars import ContextVar
+from unittest import mock
+
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import IntegrityError, connections, transaction
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from clubs.models import User, Club, Membership
+from clubs.tests.helpers import sqlite_file_database, sqlite_shard_databases
+from clubs.middleware import WriteQueueMiddleware
+from clubs.write_queue import WriteQueue, WriteTimeout, get_write_queue, run_write
+
+
+@override_settings(WRITE_QUEUE=True)
+class WriteQueueTestCase(TransactionTestCase):
+    """Tests of the write queue."""
+
+    def _create_users(self, count):
+        return [User.objects.create(email=f'user{index}@example.org', first_name='First', last_name='Last')
+                for index in range(count)]
+
+    def test_run_write_returns_the_result(self):
+        with sqlite_file_database():
+            club = Club.objects.create(name='Chess Club', location='London')
+            user = self._create_users(1)[0]
+            membership = run_write(Membership.objects.create, user=user, club=club)
+            self.assertEqual(Membership.objects.get(user=user, club=club).id, membership.id)
+
+    def test_run_write_raises_the_error_of_the_write(self):
+        with sqlite_file_database():
+            with self.assertRaises(ObjectDoesNotExist):
+                run_write(Club.objects.get, name='No such club')
+
+    def test_failed_write_does_not_undo_the_rest_of_its_batch(self):
+        with sqlite_file_database():
+            club = Club.objects.create(name='Chess Club', location='London')
+            users = self._create_users(3)
+            Membership.objects.create(user=users[1], club=club)
+            write_queue = get_write_queue()
+            with mock.patch('django.conf.settings.WRITE_QUEUE_MAX_WAIT', 0.2):
+                futures = [write_queue.submit(Membership.objects.create, user=user, club=club) for user in users]
+                results = [future.exception(timeout=10) for future in futures]
+            self.assertIsNone(results[0])
+            self.assertIsInstance(results[1], IntegrityError)
+            self.assertIsNone(results[2])
+            self.assertEqual(club.membership_set.count(), 3)
+
+    def test_failed_write_rolls_back_its_rows_on_the_shards(self):
+        with sqlite_shard_databases():
+            club = Club.objects.create(name='Chess Club', location='London')
+            user = self._create_users(1)[0]
+
+            def join_then_fail():
+                Membership.objects.create(user=user, club=club)
+                raise ValueError('Failed after joining')
+
+            future = get_write_queue().submit(join_then_fail)
+            self.assertIsInstance(future.exception(timeout=10), ValueError)
+            self.assertFalse(club.membership_set.exists())
+            club.refresh_from_db()
+            self.assertEqual(club.applicant_count, 0)
+
+    def test_writes_of_a_failed_batch_run_once(self):
+        with sqlite_file_database():
+            club = Club.objects.create(name='Chess Club', location='London')
+            users = self._create_users(3)
+            Membership.objects.create(user=users[1], club=club)
+            calls = []
+
+            def join(user):
+                calls.append(user.id)
+                return Membership.objects.create(user=user, club=club)
+
+            write_queue = get_write_queue()
+            with mock.patch('django.conf.settings.WRITE_QUEUE_MAX_WAIT', 0.2):
+                futures = [write_queue.submit(join, user) for user in users]
+                for future in futures:
+                    future.exception(timeout=10)
+            self.assertEqual(sorted(calls), sorted(user.id for user in users))
+
+    def test_write_that_times_out_raises_write_timeout(self):
+        with sqlite_file_database():
+            started = threading.Event()
+            release = threading.Event()
+            dropped = []
+
+            def slow_write():
+                started.set()
+                release.wait(10)
+
+            write_queue = get_write_queue()
+            write_queue.submit(slow_write)
+            started.wait(10)
+            try:
+                with mock.patch('django.conf.settings.WRITE_QUEUE_TIMEOUT', 0.05):
+                    with self.assertRaises(WriteTimeout):
+                        run_write(dropped.append, 'written')
+            finally:
+                release.set()
+            write_queue.submit(lambda: None).result(timeout=10)
+            self.assertEqual(dropped, [])
+
+    def test_write_timeout_is_answered_with_service_unavailable(self):
+        middleware = WriteQueueMiddleware(lambda request: None)
+        response = middleware.process_exception(RequestFactory().post('/'), WriteTimeout())
+        self.assertEqual(response.status_code, 503)
+        self.assertIn('Retry-After', response)
+
+    def test_concurrent_writes_are_committed_in_batches(self):
+        with sqlite_file_database():
+            club = Club.objects.create(name='Chess Club', location='London')
+            users = self._create_users(20)
+            batch_sizes = []
+            commit = WriteQueue._commit
+
+            def counting_commit(write_queue, batch):
+                batch_sizes.append(len(batch))
+                return commit(write_queue, batch)
+
+            barrier = threading.Barrier(len(users))
+
+            def apply(user):
+                barrier.wait()
+                try:
+                    run_write(Membership.objects.create, user=user, club=club)
+                finally:
+                    connections.close_all()
+
+            with mock.patch.object(WriteQueue, '_commit', counting_commit), \
+                    mock.patch('django.conf.settings.WRITE_QUEUE_MAX_WAIT', 0.05):
+                threads = [threading.Thread(target=apply, args=[user]) for user in users]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+
+            self.assertEqual(club.membership_set.count(), len(users))
+            self.assertEqual(sum(batch_sizes), len(users))
+            self.assertLess(len(batch_sizes), len(users))
+            club.refresh_from_db()
+            self.assertEqual(club.applicant_count, len(users))
+
+    def test_writes_run_in_the_context_of_the_caller(self):
+        request_id = ContextVar('request_id')
+        request_id.set('caller')
+        with sqlite_file_database():
+            self.assertEqual(run_write(request_id.get), 'caller')
+
+    def test_select_club_view_writes_through_the_queue(self):
+        with sqlite_file_database():
+            club = Club.objects.create(name='Chess Club', location='London')
+            user = User.objects.create_user('user@example.org', password='Password123',
+                                            first_name='First', last_name='Last')
+            Membership.objects.create(user=user, club=club, role=Membership.MEMBER)
+            self.client.login(email=user.email, password='Password123')
+            with mock.patch.object(WriteQueue, 'submit', wraps=get_write_queue().submit) as submit:
+                self.client.get(reverse('select_club', kwargs={'club_id': club.id}))
+            self.assertEqual(submit.call_count, 1)
+            user.refresh_from_db()
+            self.assertEqual(user.current_club, club)
+
+
+class RunWriteDirectlyTestCase(TestCase):
+    """Tests of writes that bypass the write queue."""
+
+    def test_writes_run_directly_when_disabled(self):
+        with mock.patch.object(WriteQueue, 'submit') as submit:
+            self.assertEqual(run_write(lambda: 'written'), 'written')
+        submit.assert_not_called()
+
+    @override_settings(WRITE_QUEUE=True)
+    def test_writes_within_a_transaction_run_directly(self):
+        with mock.patch.object(WriteQueue, 'submit') as submit:
+            with transaction.atomic():
+                self.assertEqual(run_write(lambda: 'written'), 'written')
+        submit.assert_not_called()
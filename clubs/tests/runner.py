@@ -0,0 +1,28 @@
+"""The test runner of the project."""
+
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.test import override_settings
+from django.test.runner import DiscoverRunner
+
+
+class TestRunner(DiscoverRunner):
+    """Run the tests with a cache of their own, so that they neither see nor clear the cache of the site."""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.cache_directory = tempfile.mkdtemp(prefix='clubs_test_cache_')
+        self.cache_override = override_settings(CACHES={
+            'default': {
+                'BACKEND': 'clubs.cache_backends.SQLiteCache',
+                'LOCATION': str(Path(self.cache_directory) / 'cache.sqlite3'),
+            }
+        })
+        self.cache_override.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.cache_override.disable()
+        shutil.rmtree(self.cache_directory, ignore_errors=True)
+        super().teardown_test_environment(**kwargs)
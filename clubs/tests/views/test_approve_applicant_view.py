@@ -4,6 +4,7 @@ from django.test import TestCase
 from django.urls import reverse
 
 from clubs.models import User, Club, Membership
+from clubs.tests.helpers import forbid_deferred_loading
 
 
 class ApproveApplicantViewTestCase(TestCase):
@@ -62,6 +63,13 @@ class ApproveApplicantViewTestCase(TestCase):
         response = self.client.get(url, follow=True)
         self.assertRedirects(response, redirect_url, status_code=302, target_status_code=200)
 
+    def test_applicants_list_does_not_load_profile_text(self):
+        self.client.login(email=self.officer.email, password='Password123')
+        with forbid_deferred_loading():
+            response = self.client.get(reverse('applicants_list'))
+        self.assertContains(response, self.applicant.full_name)
+        self.assertNotIn('bio', response.context['applicants'][0].__dict__)
+
     def assert_redirects(self, test_user, role=None):
         self.client.login(email=test_user.email, password='Password123')
         response_url = reverse('start')
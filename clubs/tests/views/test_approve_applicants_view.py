@@ -0,0 +1,135 @@
+"""Tests of the bulk approve applicants view."""
+
+from django.contrib import messages
+from django.test import TestCase
+from django.urls import reverse
+
+from clubs.models import User, Club, Membership
+
+
+class ApproveApplicantsViewTestCase(TestCase):
+    """Tests of the bulk approve applicants view."""
+
+    fixtures = [
+        'clubs/tests/fixtures/users/default_user.json',
+        'clubs/tests/fixtures/users/other_users.json',
+        'clubs/tests/fixtures/clubs/default_club.json',
+        'clubs/tests/fixtures/clubs/other_clubs.json',
+        'clubs/tests/fixtures/memberships/memberships.json'
+    ]
+
+    def setUp(self):
+        self.url = reverse('approve_applicants')
+        self.user = User.objects.get(email='johndoe@example.org')
+        self.applicant = User.objects.get(email='jamiedoe@example.org')
+        self.member = User.objects.get(email='janedoe@example.org')
+        self.officer = User.objects.get(email='jamesdoe@example.org')
+        self.owner = User.objects.get(email='jennydoe@example.org')
+        self.other_club = Club.objects.get(name='The Royal Rooks')
+        self.applicant.select_club(self.other_club)
+        self.member.select_club(self.other_club)
+        self.officer.select_club(self.other_club)
+        self.owner.select_club(self.other_club)
+
+    def test_approve_applicants_url(self):
+        self.assertEqual(self.url, '/approve_applicants/')
+
+    def test_approve_several_applicants(self):
+        applicants = self._create_applicants(5)
+        self.client.login(email=self.officer.email, password='Password123')
+        user_ids = [applicant.id for applicant in applicants] + [self.applicant.id]
+        response = self.client.post(self.url, {'user_ids': user_ids}, follow=True)
+        self.assertRedirects(response, reverse('applicants_list'), status_code=302, target_status_code=200)
+        self.assertFalse(self.other_club.membership_set.filter(role=Membership.APPLICANT).exists())
+        self.assertEqual(
+            self.other_club.membership_set.filter(user_id__in=user_ids, role=Membership.MEMBER).count(), 6
+        )
+        self._assert_message(response, 'Approved 6 applicants, skipped 0.')
+
+    def test_approve_applicants_skips_users_who_are_not_applicants(self):
+        self.client.login(email=self.owner.email, password='Password123')
+        user_ids = [self.applicant.id, self.member.id, self.officer.id, self.user.id, 9999]
+        response = self.client.post(self.url, {'user_ids': user_ids}, follow=True)
+        self._assert_role(self.applicant, Membership.MEMBER)
+        self._assert_role(self.officer, Membership.OFFICER)
+        self.assertFalse(self.other_club.membership_set.filter(user=self.user).exists())
+        self._assert_message(response, 'Approved 1 applicants, skipped 4.')
+
+    def test_approve_applicants_updates_club_counters(self):
+        self._create_applicants(3)
+        self.client.login(email=self.officer.email, password='Password123')
+        self.other_club.refresh_from_db()
+        applicant_count = self.other_club.applicant_count
+        member_count = self.other_club.member_count
+        user_ids = self.other_club.membership_set.filter(role=Membership.APPLICANT).values_list('user_id', flat=True)
+        self.client.post(self.url, {'user_ids': list(user_ids)})
+        self.other_club.refresh_from_db()
+        self.assertEqual(self.other_club.applicant_count, 0)
+        self.assertEqual(self.other_club.member_count, member_count + applicant_count)
+
+    def test_approve_applicants_uses_constant_queries(self):
+        self.client.login(email=self.officer.email, password='Password123')
+        applicants = self._create_applicants(50)
+        self.client.post(self.url, {'user_ids': [applicants[0].id]})
+        with self.assertNumQueries(7):
+            self.client.post(self.url, {'user_ids': [applicant.id for applicant in applicants[1:]]})
+
+    def test_approve_applicants_ignores_invalid_ids(self):
+        self.client.login(email=self.officer.email, password='Password123')
+        response = self.client.post(self.url, {'user_ids': ['abc', self.applicant.id]}, follow=True)
+        self._assert_role(self.applicant, Membership.MEMBER)
+        self._assert_message(response, 'Approved 1 applicants, skipped 0.')
+
+    def test_approve_applicants_ignores_malformed_ids(self):
+        self.client.login(email=self.officer.email, password='Password123')
+        malformed_ids = ['²', '٣', '-1', ' 1', '1.0', '9' * 30]
+        response = self.client.post(self.url, {'user_ids': [*malformed_ids, self.applicant.id]}, follow=True)
+        self.assertEqual(response.status_code, 200)
+        self._assert_role(self.applicant, Membership.MEMBER)
+        self._assert_message(response, 'Approved 1 applicants, skipped 0.')
+
+    def test_approve_applicants_rejects_get(self):
+        self.client.login(email=self.officer.email, password='Password123')
+        response = self.client.get(self.url, {'user_ids': [self.applicant.id]})
+        self.assertEqual(response.status_code, 405)
+        self._assert_role(self.applicant, Membership.APPLICANT)
+
+    def test_approve_applicants_redirects_when_not_logged_in(self):
+        response = self.client.post(self.url, {'user_ids': [self.applicant.id]})
+        self.assertRedirects(response, reverse('log_in'), status_code=302, target_status_code=200)
+        self._assert_role(self.applicant, Membership.APPLICANT)
+
+    def test_approve_applicants_redirects_when_not_officer(self):
+        for test_user in [self.applicant, self.member]:
+            self.client.login(email=test_user.email, password='Password123')
+            response = self.client.post(self.url, {'user_ids': [self.applicant.id]})
+            self.assertRedirects(response, reverse('start'), status_code=302, target_status_code=200)
+        self._assert_role(self.applicant, Membership.APPLICANT)
+
+    def test_applicants_list_shows_bulk_approve_form(self):
+        self.client.login(email=self.officer.email, password='Password123')
+        response = self.client.get(reverse('applicants_list'))
+        self.assertContains(response, f'action="{self.url}"')
+        self.assertContains(response, f'name="user_ids" value="{self.applicant.id}"')
+
+    def _create_applicants(self, applicant_count):
+        applicants = []
+        for applicant_id in range(applicant_count):
+            applicant = User.objects.create_user(
+                email=f'applicant{applicant_id}@test.org',
+                password='Password123',
+                first_name=f'First{applicant_id}',
+                last_name=f'Last{applicant_id}',
+            )
+            Membership.objects.create(user=applicant, club=self.other_club, role=Membership.APPLICANT)
+            applicants.append(applicant)
+        return applicants
+
+    def _assert_role(self, test_user, role):
+        self.assertEqual(self.other_club.membership_set.get(user=test_user).role, role)
+
+    def _assert_message(self, response, text):
+        messages_list = list(response.context['messages'])
+        self.assertEqual(len(messages_list), 1)
+        self.assertEqual(messages_list[0].level, messages.SUCCESS)
+        self.assertEqual(str(messages_list[0]), text)
@@ -0,0 +1,107 @@
+"""Tests of the avatar view."""
+
+import struct
+import tempfile
+import zlib
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from clubs.avatars import avatar_path, cull_cache, get_avatar, identicon_png
+from clubs.models import User, gravatar_hash
+
+
+def stand_in_fetcher(email_hash, size):
+    return b'upstream avatar'
+
+
+class AvatarViewTestCase(TestCase):
+    """Tests of the avatar view."""
+
+    fixtures = ['clubs/tests/fixtures/users/default_user.json']
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.settings_override = override_settings(AVATAR_CACHE_DIR=self.directory.name)
+        self.settings_override.enable()
+        self.user = User.objects.get(email='johndoe@example.org')
+        self.email_hash = gravatar_hash(self.user.email)
+        self.url = reverse('avatar', args=[self.email_hash, 60])
+
+    def tearDown(self):
+        self.settings_override.disable()
+        self.directory.cleanup()
+
+    def test_avatar_url(self):
+        self.assertEqual(self.url, f'/avatar/{self.email_hash}/60.png')
+
+    def test_get_avatar(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertEqual(response.content, identicon_png(self.email_hash, 60))
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertIn('max-age=31536000', response['Cache-Control'])
+        self.assertTrue(response.has_header('ETag'))
+
+    def test_avatar_is_a_valid_png_of_requested_size(self):
+        image = self.client.get(self.url).content
+        self.assertTrue(image.startswith(b'\x89PNG\r\n\x1a\n'))
+        width, height = struct.unpack('>II', image[16:24])
+        self.assertEqual((width, height), (60, 60))
+        idat_length = struct.unpack('>I', image[33:37])[0]
+        raw_rows = zlib.decompress(image[41:41 + idat_length])
+        self.assertEqual(len(raw_rows), 60 * (1 + 60 * 3))
+
+    def test_avatar_is_cached_on_disk(self):
+        self.client.get(self.url)
+        path = avatar_path(self.email_hash, 60)
+        self.assertTrue(path.exists())
+        path.write_bytes(b'cached avatar')
+        self.assertEqual(self.client.get(self.url).content, b'cached avatar')
+
+    def test_conditional_get_returns_not_modified(self):
+        response = self.client.get(self.url)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_different_sizes_have_different_etags(self):
+        small = self.client.get(self.url)
+        large = self.client.get(reverse('avatar', args=[self.email_hash, 120]))
+        self.assertNotEqual(small['ETag'], large['ETag'])
+
+    def test_invalid_hash_returns_not_found(self):
+        response = self.client.get(reverse('avatar', args=['not-a-hash', 60]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_invalid_size_returns_not_found(self):
+        response = self.client.get(reverse('avatar', args=[self.email_hash, 4096]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_size_not_rendered_by_templates_returns_not_found(self):
+        response = self.client.get(reverse('avatar', args=[self.email_hash, 61]))
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(avatar_path(self.email_hash, 61).exists())
+
+    @override_settings(AVATAR_CACHE_MAX_FILES=6)
+    def test_cull_cache_deletes_oldest_avatars(self):
+        email_hashes = [f'{number:032x}' for number in range(9)]
+        for email_hash in email_hashes:
+            get_avatar(email_hash, 60)
+        cull_cache()
+        remaining = [email_hash for email_hash in email_hashes if avatar_path(email_hash, 60).exists()]
+        self.assertEqual(len(remaining), 6)
+
+    def test_post_is_not_allowed(self):
+        response = self.client.post(self.url)
+        self.assertEqual(response.status_code, 405)
+
+    @override_settings(AVATAR_UPSTREAM_FETCHER='clubs.tests.views.test_avatar_view.stand_in_fetcher')
+    def test_upstream_fetcher_is_used_when_configured(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.content, b'upstream avatar')
+
+    @override_settings(LOCAL_AVATARS=True)
+    def test_gravatar_links_to_local_avatar_when_enabled(self):
+        self.assertEqual(self.user.mini_gravatar(), self.url)
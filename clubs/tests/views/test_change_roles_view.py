@@ -0,0 +1,132 @@
+"""Tests of the bulk role change view."""
+
+from django.test import TestCase
+from django.urls import reverse
+
+from clubs.models import User, Club, Membership
+
+
+class ChangeRolesViewTestCase(TestCase):
+    """Tests of the bulk role change view."""
+
+    fixtures = [
+        'clubs/tests/fixtures/users/default_user.json',
+        'clubs/tests/fixtures/users/other_users.json',
+        'clubs/tests/fixtures/clubs/default_club.json',
+        'clubs/tests/fixtures/clubs/other_clubs.json',
+        'clubs/tests/fixtures/memberships/memberships.json'
+    ]
+
+    def setUp(self):
+        self.url = reverse('change_roles')
+        self.applicant = User.objects.get(email='jamiedoe@example.org')
+        self.member = User.objects.get(email='janedoe@example.org')
+        self.officer = User.objects.get(email='jamesdoe@example.org')
+        self.owner = User.objects.get(email='jennydoe@example.org')
+        self.other_club = Club.objects.get(name='The Royal Rooks')
+        self.applicant.select_club(self.other_club)
+        self.member.select_club(self.other_club)
+        self.officer.select_club(self.other_club)
+        self.owner.select_club(self.other_club)
+
+    def test_change_roles_url(self):
+        self.assertEqual(self.url, '/change_roles/')
+
+    def test_promote_and_demote_in_one_batch(self):
+        self.client.login(email=self.owner.email, password='Password123')
+        transitions = [
+            self._transition(self.member, Membership.MEMBER, Membership.OFFICER),
+            self._transition(self.officer, Membership.OFFICER, Membership.MEMBER),
+            self._transition(self.applicant, Membership.APPLICANT, Membership.MEMBER),
+        ]
+        response = self.client.post(self.url, {'transitions': transitions}, follow=True)
+        self.assertRedirects(response, reverse('members_list'), status_code=302, target_status_code=200)
+        self._assert_role(self.member, Membership.OFFICER)
+        self._assert_role(self.officer, Membership.MEMBER)
+        self._assert_role(self.applicant, Membership.MEMBER)
+        self.assertContains(response, 'Changed the role of 3 users, skipped 0.')
+        self.other_club.refresh_from_db()
+        self.assertEqual(self.other_club.applicant_count, 0)
+        self.assertEqual(self.other_club.member_count, 2)
+        self.assertEqual(self.other_club.officer_count, 1)
+
+    def test_stale_transitions_are_skipped(self):
+        self.client.login(email=self.owner.email, password='Password123')
+        transitions = [self._transition(self.officer, Membership.MEMBER, Membership.OFFICER)]
+        response = self.client.post(self.url, {'transitions': transitions}, follow=True)
+        self._assert_role(self.officer, Membership.OFFICER)
+        self.assertContains(response, 'Changed the role of 0 users, skipped 1.')
+
+    def test_ownership_cannot_change_hands(self):
+        self.client.login(email=self.owner.email, password='Password123')
+        transitions = [
+            self._transition(self.officer, Membership.OFFICER, Membership.OWNER),
+            self._transition(self.owner, Membership.OWNER, Membership.OFFICER),
+        ]
+        self.client.post(self.url, {'transitions': transitions})
+        self._assert_role(self.officer, Membership.OFFICER)
+        self._assert_role(self.owner, Membership.OWNER)
+
+    def test_invalid_transitions_are_skipped(self):
+        self.client.login(email=self.owner.email, password='Password123')
+        transitions = ['not:a:transition', f'{self.member.id}:1:7', f'{self.member.id}:1']
+        response = self.client.post(self.url, {'transitions': transitions}, follow=True)
+        self._assert_role(self.member, Membership.MEMBER)
+        self.assertContains(response, 'Changed the role of 0 users, skipped 3.')
+
+    def test_user_is_changed_at_most_once_per_batch(self):
+        self.client.login(email=self.owner.email, password='Password123')
+        transitions = [
+            self._transition(self.member, Membership.MEMBER, Membership.OFFICER),
+            self._transition(self.member, Membership.OFFICER, Membership.MEMBER),
+        ]
+        response = self.client.post(self.url, {'transitions': transitions}, follow=True)
+        self._assert_role(self.member, Membership.OFFICER)
+        self.assertContains(response, 'Changed the role of 1 users, skipped 1.')
+
+    def test_redirects_to_next_page(self):
+        self.client.login(email=self.owner.email, password='Password123')
+        transitions = [self._transition(self.officer, Membership.OFFICER, Membership.MEMBER)]
+        next_url = reverse('officers_list')
+        response = self.client.post(self.url, {'transitions': transitions, 'next': next_url})
+        self.assertRedirects(response, next_url, status_code=302, target_status_code=200)
+
+    def test_does_not_redirect_to_other_hosts(self):
+        self.client.login(email=self.owner.email, password='Password123')
+        response = self.client.post(self.url, {'transitions': [], 'next': 'https://example.com/'})
+        self.assertRedirects(response, reverse('members_list'), status_code=302, target_status_code=200)
+
+    def test_batch_uses_one_update_per_kind_of_change(self):
+        self.client.login(email=self.owner.email, password='Password123')
+        members = [self._create_user(f'member{index}@test.org', Membership.MEMBER) for index in range(20)]
+        transitions = [self._transition(member, Membership.MEMBER, Membership.OFFICER) for member in members]
+        self.client.post(self.url, {'transitions': transitions[:1]})
+        with self.assertNumQueries(9):
+            self.client.post(self.url, {'transitions': transitions[1:]})
+        self.assertEqual(self.other_club.membership_set.filter(role=Membership.OFFICER).count(), 21)
+
+    def test_only_owner_can_change_roles(self):
+        transitions = [self._transition(self.member, Membership.MEMBER, Membership.OFFICER)]
+        for test_user in [self.applicant, self.member, self.officer]:
+            self.client.login(email=test_user.email, password='Password123')
+            response = self.client.post(self.url, {'transitions': transitions})
+            self.assertRedirects(response, reverse('start'), status_code=302, target_status_code=200)
+        self._assert_role(self.member, Membership.MEMBER)
+
+    def test_list_pages_show_multi_select_forms(self):
+        self.client.login(email=self.owner.email, password='Password123')
+        response = self.client.get(reverse('members_list'))
+        self.assertContains(response, f'value="{self.member.id}:1:2"')
+        response = self.client.get(reverse('officers_list'))
+        self.assertContains(response, f'value="{self.officer.id}:2:1"')
+
+    def _transition(self, user, old_role, new_role):
+        return f'{user.id}:{old_role}:{new_role}'
+
+    def _create_user(self, email, role):
+        user = User.objects.create_user(email=email, password='Password123')
+        Membership.objects.create(user=user, club=self.other_club, role=role)
+        return user
+
+    def _assert_role(self, test_user, role):
+        self.assertEqual(self.other_club.membership_set.get(user=test_user).role, role)
@@ -1,5 +1,6 @@
 """Test of the club list view"""
 
+from django.conf import settings
 from django.test import TestCase
 from django.urls import reverse
 from with_asserts.mixin import AssertHTMLMixin
@@ -54,6 +55,33 @@ class ClubListTest(TestCase,AssertHTMLMixin):
         test_user = User.objects.get(email='test@example.org')
         self.assert_accessible(test_user)
 
+    def test_club_list_shows_owner_name_and_bio(self):
+        self.client.login(email=self.member.email, password='Password123')
+        response = self.client.get(self.url)
+        owner = self.other_club.owner
+        self.assertContains(response, f'Owner: {owner.full_name}')
+        self.assertContains(response, f'Bio: {owner.bio}')
+
+    def test_club_list_shows_club_without_owner(self):
+        club = Club.objects.create(name='Ownerless Club', location='Leeds')
+        self.client.login(email=self.member.email, password='Password123')
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, club.name)
+        self.assertContains(response, 'Owner: N/A')
+
+    def test_club_list_with_keyset_pagination(self):
+        for club_id in range(settings.CLUBS_PER_PAGE):
+            Club.objects.create(name=f'Club {club_id}', location='London')
+        self.client.login(email=self.member.email, password='Password123')
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.context['clubs']), settings.CLUBS_PER_PAGE)
+        page_obj = response.context['page_obj']
+        self.assertTrue(page_obj.has_next())
+        response = self.client.get(self.url, {'after': page_obj.next_cursor})
+        self.assertEqual(len(response.context['clubs']), Club.objects.count() - settings.CLUBS_PER_PAGE)
+        self.assertFalse(response.context['page_obj'].has_next())
+
     def assert_accessible(self, test_user):
         self.client.login(email=test_user.email, password='Password123')
         response = self.client.get(self.url, follow=True)
@@ -0,0 +1,120 @@
+"""Tests of the roster export view."""
+
+import csv
+import json
+import tracemalloc
+
+from django.http import StreamingHttpResponse
+from django.test import TestCase
+from django.urls import reverse
+
+from clubs.models import User, Club, Membership
+
+
+class ExportRosterViewTestCase(TestCase):
+    """Tests of the roster export view."""
+
+    fixtures = [
+        'clubs/tests/fixtures/users/default_user.json',
+        'clubs/tests/fixtures/users/other_users.json',
+        'clubs/tests/fixtures/clubs/default_club.json',
+        'clubs/tests/fixtures/clubs/other_clubs.json',
+        'clubs/tests/fixtures/memberships/memberships.json'
+    ]
+
+    def setUp(self):
+        self.url = reverse('export_roster')
+        self.user = User.objects.get(email='johndoe@example.org')
+        self.applicant = User.objects.get(email='jamiedoe@example.org')
+        self.member = User.objects.get(email='janedoe@example.org')
+        self.officer = User.objects.get(email='jamesdoe@example.org')
+        self.owner = User.objects.get(email='jennydoe@example.org')
+        self.other_club = Club.objects.get(name='The Royal Rooks')
+        self.applicant.select_club(self.other_club)
+        self.member.select_club(self.other_club)
+        self.officer.select_club(self.other_club)
+        self.owner.select_club(self.other_club)
+
+    def test_export_roster_url(self):
+        self.assertEqual(self.url, '/export_roster/')
+
+    def test_export_roster_as_csv(self):
+        self.client.login(email=self.officer.email, password='Password123')
+        response = self.client.get(self.url, {'format': 'csv'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response, StreamingHttpResponse)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="the-royal-rooks-roster.csv"')
+        rows = list(csv.reader(self._content(response).splitlines()))
+        self.assertEqual(rows[0], ['first_name', 'last_name', 'email', 'role'])
+        self.assertIn(['Jamie', 'Doe', 'jamiedoe@example.org', 'Applicant'], rows)
+        self.assertIn(['Jenny', 'Doe', 'jennydoe@example.org', 'Owner'], rows)
+        self.assertEqual(len(rows) - 1, self.other_club.membership_set.count())
+
+    def test_export_roster_as_json_lines(self):
+        self.client.login(email=self.owner.email, password='Password123')
+        response = self.client.get(self.url, {'format': 'jsonl'})
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in self._content(response).splitlines()]
+        self.assertIn(
+            {'first_name': 'Jane', 'last_name': 'Doe', 'email': 'janedoe@example.org', 'role': 'Member'}, rows
+        )
+        self.assertEqual(len(rows), self.other_club.membership_set.count())
+
+    def test_export_roster_filtered_by_role(self):
+        self.client.login(email=self.officer.email, password='Password123')
+        response = self.client.get(self.url, {'format': 'jsonl', 'role': [Membership.MEMBER, Membership.OFFICER]})
+        rows = [json.loads(line) for line in self._content(response).splitlines()]
+        self.assertEqual({row['role'] for row in rows}, {'Member', 'Officer'})
+
+    def test_export_roster_only_lists_current_club(self):
+        self.client.login(email=self.officer.email, password='Password123')
+        response = self.client.get(self.url)
+        self.assertNotIn('johndoe@example.org', self._content(response))
+
+    def test_export_roster_rejects_unknown_format(self):
+        self.client.login(email=self.officer.email, password='Password123')
+        response = self.client.get(self.url, {'format': 'xml'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_export_roster_redirects_when_not_logged_in(self):
+        response = self.client.get(self.url)
+        self.assertRedirects(response, reverse('log_in'), status_code=302, target_status_code=200)
+
+    def test_export_roster_redirects_when_not_officer(self):
+        for test_user in [self.applicant, self.member, self.user]:
+            self.client.login(email=test_user.email, password='Password123')
+            response = self.client.get(self.url)
+            self.assertRedirects(response, reverse('start'), status_code=302, target_status_code=200)
+
+    def test_export_roster_memory_does_not_grow_with_club_size(self):
+        self.client.login(email=self.officer.email, password='Password123')
+        self._add_members(0, 5000)
+        self._peak_memory_of_export()
+        medium_peak = self._peak_memory_of_export()
+        self._add_members(5000, 25000)
+        large_peak = self._peak_memory_of_export()
+        self.assertLess(large_peak, medium_peak * 1.5)
+
+    def _add_members(self, first_index, last_index):
+        User.objects.bulk_create(
+            User(email=f'user{index}@test.org', first_name='First', last_name=f'Last{index}')
+            for index in range(first_index, last_index)
+        )
+        Membership.objects.bulk_create(
+            Membership(user_id=user_id, club=self.other_club, role=Membership.MEMBER)
+            for user_id in User.objects.filter(email__endswith='@test.org', membership=None).values_list('id', flat=True)
+        )
+
+    def _peak_memory_of_export(self):
+        tracemalloc.start()
+        try:
+            response = self.client.get(self.url)
+            for _ in response.streaming_content:
+                pass
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    def _content(self, response):
+        return b''.join(response.streaming_content).decode()
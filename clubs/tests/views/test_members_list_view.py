@@ -4,6 +4,7 @@ from django.test import TestCase
 from django.urls import reverse
 
 from clubs.models import User, Club, Membership
+from clubs.tests.helpers import forbid_deferred_loading
 
 
 class MembersListViewTestCase(TestCase):
@@ -95,6 +96,13 @@ class MembersListViewTestCase(TestCase):
     def test_redirects_when_no_club_selected(self):
         self.assert_redirects(self.user)
 
+    def test_members_list_does_not_load_profile_text(self):
+        self.client.login(email=self.owner.email, password='Password123')
+        with forbid_deferred_loading():
+            response = self.client.get(self.url)
+        self.assertContains(response, self.member.full_name)
+        self.assertNotIn('bio', response.context['members'][0].__dict__)
+
     def _create_new_user_with_email(self, email='somedoe@example.org', role=Membership.MEMBER):
         user = User.objects.create_user(
             email=email,
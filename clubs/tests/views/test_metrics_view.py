@@ -0,0 +1,149 @@
+"""Tests of the metrics view and the metrics shared by worker processes."""
+
+import multiprocessing
+import tempfile
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from clubs import metrics
+from clubs.models import User, Club, Membership
+
+
+def increment_in_worker(count):
+    for _ in range(count):
+        metrics.inc('clubs_logins_total', result='success')
+
+
+class MetricsViewTestCase(TestCase):
+    """Tests of the metrics view and the metrics shared by worker processes."""
+
+    fixtures = [
+        'clubs/tests/fixtures/users/default_user.json',
+        'clubs/tests/fixtures/users/other_users.json',
+        'clubs/tests/fixtures/clubs/default_club.json',
+        'clubs/tests/fixtures/clubs/other_clubs.json',
+        'clubs/tests/fixtures/memberships/memberships.json'
+    ]
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.settings_override = override_settings(
+            METRICS=True, METRICS_DIR=self.directory.name, METRICS_TOKEN='scraper-token'
+        )
+        self.settings_override.enable()
+        self.url = reverse('metrics')
+        self.user = User.objects.get(email='johndoe@example.org')
+        self.owner = User.objects.get(email='jennydoe@example.org')
+        self.officer = User.objects.get(email='jamesdoe@example.org')
+        self.applicant = User.objects.get(email='jamiedoe@example.org')
+        self.other_club = Club.objects.get(name='The Royal Rooks')
+        self.owner.select_club(self.other_club)
+        self.officer.select_club(self.other_club)
+
+    def tearDown(self):
+        self.settings_override.disable()
+        self.directory.cleanup()
+
+    def test_metrics_url(self):
+        self.assertEqual(self.url, '/metrics')
+
+    def test_metrics_are_not_found_when_disabled(self):
+        with override_settings(METRICS=False):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 404)
+
+    def test_metrics_are_forbidden_without_token(self):
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+        response = self.client.get(self.url, HTTP_AUTHORIZATION='Bearer wrong-token')
+        self.assertEqual(response.status_code, 403)
+
+    def test_metrics_are_forbidden_to_users_who_are_not_staff(self):
+        self.client.login(email=self.user.email, password='Password123')
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    def test_metrics_are_shown_to_staff(self):
+        self.user.is_staff = True
+        self.user.save()
+        self.client.login(email=self.user.email, password='Password123')
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+    @override_settings(METRICS_TOKEN='')
+    def test_empty_token_is_not_accepted(self):
+        response = self.client.get(self.url, HTTP_AUTHORIZATION='Bearer ')
+        self.assertEqual(response.status_code, 403)
+
+    def test_metrics_use_prometheus_text_format(self):
+        response = self._scrape()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        content = response.content.decode()
+        self.assertIn('# TYPE clubs_http_requests_total counter', content)
+        self.assertIn('# TYPE clubs_http_request_duration_seconds histogram', content)
+
+    def test_requests_are_counted_per_url_name(self):
+        self.client.login(email=self.user.email, password='Password123')
+        self.client.get(reverse('start'))
+        self.client.get(reverse('start'))
+        samples = metrics.collect()
+        self.assertEqual(samples['clubs_http_requests_total{url_name="start",method="GET",status="200"}'], 2)
+        self.assertEqual(samples['clubs_http_request_duration_seconds_count{url_name="start"}'], 2)
+        self.assertEqual(samples['clubs_http_request_duration_seconds_bucket{url_name="start",le="+Inf"}'], 2)
+        self.assertGreater(samples['clubs_db_queries_total{url_name="start"}'], 0)
+        self.assertIn('clubs_db_query_duration_seconds_total{url_name="start"}', samples)
+
+    def test_logins_are_counted(self):
+        self.client.post(reverse('log_in'), {'email': self.user.email, 'password': 'Password123'})
+        self.client.logout()
+        self.client.post(reverse('log_in'), {'email': self.user.email, 'password': 'WrongPassword123'})
+        samples = metrics.collect()
+        self.assertEqual(samples['clubs_logins_total{result="success"}'], 1)
+        self.assertEqual(samples['clubs_logins_total{result="failure"}'], 1)
+
+    def test_cache_hits_and_misses_are_counted(self):
+        self.client.login(email=self.user.email, password='Password123')
+        self.client.get(reverse('start'))
+        self.client.get(reverse('start'))
+        samples = metrics.collect()
+        self.assertGreaterEqual(samples['clubs_cache_requests_total{cache="user_clubs",result="hit"}'], 1)
+
+    def test_role_transitions_are_counted_on_commit(self):
+        self.client.login(email=self.officer.email, password='Password123')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.get(reverse('approve_applicant', kwargs={'user_id': self.applicant.id}))
+        self.client.login(email=self.owner.email, password='Password123')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.get(reverse('transfer_ownership', kwargs={'user_id': self.officer.id}))
+        samples = metrics.collect()
+        self.assertEqual(samples['clubs_role_transitions_total{old_role="applicant",new_role="member"}'], 1)
+        self.assertEqual(samples['clubs_role_transitions_total{old_role="officer",new_role="owner"}'], 1)
+        self.assertEqual(samples['clubs_role_transitions_total{old_role="owner",new_role="officer"}'], 1)
+
+    def test_role_transitions_are_not_counted_when_rolled_back(self):
+        self.client.login(email=self.officer.email, password='Password123')
+        self.client.get(reverse('approve_applicant', kwargs={'user_id': self.applicant.id}))
+        self.assertNotIn('clubs_role_transitions_total{old_role="applicant",new_role="member"}', metrics.collect())
+
+    def test_metrics_are_summed_across_processes(self):
+        metrics.inc('clubs_logins_total', result='success')
+        context = multiprocessing.get_context('fork')
+        workers = [context.Process(target=increment_in_worker, args=[5]) for _ in range(3)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.assertEqual(metrics.collect()['clubs_logins_total{result="success"}'], 16)
+        self.assertIn('clubs_logins_total{result="success"} 16', self._scrape().content.decode())
+
+    def test_metrics_file_grows_with_many_samples(self):
+        for index in range(5000):
+            metrics.inc('clubs_http_requests_total', url_name=f'route_{index}', method='GET', status=200)
+        samples = metrics.collect()
+        self.assertEqual(samples['clubs_http_requests_total{url_name="route_4999",method="GET",status="200"}'], 1)
+        self.assertEqual(len(samples), 5000)
+
+    def test_label_values_are_escaped(self):
+        self.assertEqual(metrics.sample_key('metric', label='a"b\\c\nd'), 'metric{label="a\\"b\\\\c\\nd"}')
+
+    def _scrape(self):
+        return self.client.get(self.url, HTTP_AUTHORIZATION='Bearer scraper-token')
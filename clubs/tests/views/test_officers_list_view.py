@@ -4,6 +4,7 @@ from django.test import TestCase
 from django.urls import reverse
 
 from clubs.models import User, Club, Membership
+from clubs.tests.helpers import forbid_deferred_loading
 
 
 class OfficersListViewTestCase(TestCase):
@@ -123,6 +124,13 @@ class OfficersListViewTestCase(TestCase):
         response_url = reverse('start')
         self.assertRedirects(response, response_url, status_code=302, target_status_code=200)
 
+    def test_officers_list_does_not_load_profile_text(self):
+        self.client.login(email=self.owner.email, password='Password123')
+        with forbid_deferred_loading():
+            response = self.client.get(self.url)
+        self.assertContains(response, self.officer.full_name)
+        self.assertNotIn('bio', response.context['officers'][0].__dict__)
+
     def _create_new_user_with_email(self, email='somedoe@example.org'):
         user = User.objects.create_user(
             email=email,
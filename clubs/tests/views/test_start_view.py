@@ -0,0 +1,98 @@
+"""Tests of the start view"""
+
+import base64
+import json
+
+from django.conf import settings
+from django.test import TestCase
+from django.urls import reverse
+
+from clubs.models import User, Club, Membership
+from clubs.tests.helpers import reverse_with_next
+
+
+class StartViewTestCase(TestCase):
+    """Tests of the start view"""
+
+    fixtures = [
+        'clubs/tests/fixtures/users/default_user.json',
+        'clubs/tests/fixtures/users/other_users.json',
+        'clubs/tests/fixtures/clubs/default_club.json',
+        'clubs/tests/fixtures/clubs/other_clubs.json',
+        'clubs/tests/fixtures/memberships/memberships.json'
+    ]
+
+    def setUp(self):
+        self.url = reverse('start')
+        self.user = User.objects.get(email='johndoe@example.org')
+        self.club = Club.objects.get(name='Chess Club')
+        self.other_club = Club.objects.get(name='The Royal Rooks')
+
+    def test_start_url(self):
+        self.assertEqual(self.url, '/start/')
+
+    def test_start_redirects_when_not_logged_in(self):
+        redirect_url = reverse_with_next('log_in', self.url)
+        response = self.client.get(self.url)
+        self.assertRedirects(response, redirect_url, status_code=302, target_status_code=200)
+
+    def test_get_start_lists_clubs_with_member_counts(self):
+        self.client.login(email=self.user.email, password='Password123')
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'start.html')
+        clubs = list(response.context['clubs'])
+        self.assertEqual(clubs, [self.club, self.other_club])
+        for club in clubs:
+            members = club.membership_set.exclude(role=Membership.APPLICANT).count()
+            self.assertEqual(club.members_count, members)
+            self.assertContains(response, f'{members} Members')
+        self.assertFalse(response.context['is_paginated'])
+
+    def test_get_start_with_keyset_pagination(self):
+        self.client.login(email=self.user.email, password='Password123')
+        self._create_test_clubs(settings.CLUBS_PER_PAGE * 2 + 3 - 2)
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.context['clubs']), settings.CLUBS_PER_PAGE)
+        self.assertTrue(response.context['is_paginated'])
+        page_obj = response.context['page_obj']
+        self.assertFalse(page_obj.has_previous())
+        self.assertTrue(page_obj.has_next())
+        self.assertContains(response, f'?after={page_obj.next_cursor}')
+
+        response = self.client.get(self.url, {'after': page_obj.next_cursor})
+        self.assertEqual(len(response.context['clubs']), settings.CLUBS_PER_PAGE)
+        page_obj = response.context['page_obj']
+        self.assertTrue(page_obj.has_previous())
+        self.assertTrue(page_obj.has_next())
+        second_page = list(page_obj)
+
+        response = self.client.get(self.url, {'after': page_obj.next_cursor})
+        self.assertEqual(len(response.context['clubs']), 3)
+        page_obj = response.context['page_obj']
+        self.assertTrue(page_obj.has_previous())
+        self.assertFalse(page_obj.has_next())
+
+        response = self.client.get(self.url, {'before': page_obj.previous_cursor})
+        self.assertEqual(list(response.context['clubs']), second_page)
+
+    def test_get_start_with_invalid_cursor_shows_first_page(self):
+        self.client.login(email=self.user.email, password='Password123')
+        response = self.client.get(self.url, {'after': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context['clubs']), [self.club, self.other_club])
+
+    def test_get_start_with_crafted_cursor_shows_first_page(self):
+        self.client.login(email=self.user.email, password='Password123')
+        for values in (['abc'], [None], [{}], [[1]]):
+            with self.subTest(values=values):
+                cursor = base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+                for direction in ('after', 'before'):
+                    response = self.client.get(self.url, {direction: cursor})
+                    self.assertEqual(response.status_code, 200)
+                    self.assertEqual(list(response.context['clubs']), [self.club, self.other_club])
+
+    def _create_test_clubs(self, club_count=10):
+        for club_id in range(club_count):
+            club = Club.objects.create(name=f'Club {club_id}', location=f'Location {club_id}')
+            Membership.objects.create(user=self.user, club=club, role=Membership.OWNER)
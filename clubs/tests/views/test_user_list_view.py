@@ -1,10 +1,17 @@
 """Test of the user list view"""
 
+import base64
+import json
+
 from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from with_asserts.mixin import AssertHTMLMixin
 from clubs.models import User, Club, Membership
+from clubs.tests.helpers import forbid_deferred_loading
 
 
 class UserListTest(TestCase, AssertHTMLMixin):
@@ -19,6 +26,7 @@ class UserListTest(TestCase, AssertHTMLMixin):
     ]
 
     def setUp(self):
+        cache.clear()
         self.url = reverse('user_list')
         self.user = User.objects.get(email='johndoe@example.org')
         self.applicant = User.objects.get(email='jamiedoe@example.org')
@@ -62,30 +70,72 @@ class UserListTest(TestCase, AssertHTMLMixin):
         page_obj = response.context['page_obj']
         self.assertFalse(page_obj.has_previous())
         self.assertTrue(page_obj.has_next())
-        page_one_url = reverse('user_list') + '?page=1'
-        response = self.client.get(page_one_url)
-        self.assertEqual(response.status_code, 200)
-        self.assertTemplateUsed(response, 'user_list.html')
-        self.assertEqual(len(response.context['users']), settings.USERS_PER_PAGE)
-        page_obj = response.context['page_obj']
-        self.assertFalse(page_obj.has_previous())
-        self.assertTrue(page_obj.has_next())
-        page_two_url = reverse('user_list') + '?page=2'
-        response = self.client.get(page_two_url)
+        response = self.client.get(self.url, {'after': page_obj.next_cursor})
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, 'user_list.html')
         self.assertEqual(len(response.context['users']), settings.USERS_PER_PAGE)
         page_obj = response.context['page_obj']
         self.assertTrue(page_obj.has_previous())
         self.assertTrue(page_obj.has_next())
-        page_three_url = reverse('user_list') + '?page=3'
-        response = self.client.get(page_three_url)
+        page_two_cursor = page_obj.previous_cursor
+        response = self.client.get(self.url, {'after': page_obj.next_cursor})
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, 'user_list.html')
         self.assertEqual(len(response.context['users']), 3)
         page_obj = response.context['page_obj']
         self.assertTrue(page_obj.has_previous())
         self.assertFalse(page_obj.has_next())
+        response = self.client.get(self.url, {'before': page_two_cursor})
+        self.assertEqual(len(response.context['users']), settings.USERS_PER_PAGE)
+        page_obj = response.context['page_obj']
+        self.assertFalse(page_obj.has_previous())
+        self.assertTrue(page_obj.has_next())
+
+    def test_user_list_is_ordered_by_name(self):
+        self.client.login(email=self.member.email, password='Password123')
+        self._create_test_users(settings.USERS_PER_PAGE * 2)
+        users = []
+        cursor = None
+        while True:
+            response = self.client.get(self.url, {'after': cursor} if cursor else {})
+            users.extend(response.context['users'])
+            cursor = response.context['page_obj'].next_cursor
+            if cursor is None:
+                break
+        names = [(user.last_name, user.first_name, user.id) for user in users]
+        self.assertEqual(names, sorted(names))
+        self.assertEqual(len(names), len(set(names)))
+
+    def test_user_list_shows_total_count(self):
+        self.client.login(email=self.member.email, password='Password123')
+        self._create_test_users(settings.USERS_PER_PAGE * 2)
+        response = self.client.get(self.url)
+        total = self.other_club.associates.filter(membership__role=Membership.MEMBER).count()
+        self.assertContains(response, f'{total} in total')
+
+    def test_deep_page_costs_the_same_as_first_page(self):
+        self.client.login(email=self.member.email, password='Password123')
+        self._create_test_users(settings.USERS_PER_PAGE * 3)
+        response = self.client.get(self.url)
+        response = self.client.get(self.url, {'after': response.context['page_obj'].next_cursor})
+        deep_page = {'after': response.context['page_obj'].next_cursor}
+        with CaptureQueriesContext(connection) as first_page_queries:
+            self.client.get(self.url)
+        with CaptureQueriesContext(connection) as deep_page_queries:
+            response = self.client.get(self.url, deep_page)
+        self.assertTrue(response.context['page_obj'].has_previous())
+        self.assertEqual(len(deep_page_queries), len(first_page_queries))
+        self.assertFalse(any('COUNT' in query['sql'] for query in deep_page_queries))
+
+    def test_get_user_list_with_crafted_cursor_shows_first_page(self):
+        self.client.login(email=self.member.email, password='Password123')
+        first_page = list(self.client.get(self.url).context['users'])
+        for values in (['Doe', 'Jane', 'abc'], ['Doe', None, 1], [{}, 'Jane', 1], ['Doe', 'Jane', [1]]):
+            with self.subTest(values=values):
+                cursor = base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+                response = self.client.get(self.url, {'after': cursor})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(list(response.context['users']), first_page)
 
     def test_get_user_list_redirects_when_not_logged_in(self):
         redirect_url = reverse('log_in')
@@ -151,6 +201,13 @@ class UserListTest(TestCase, AssertHTMLMixin):
         response_url = reverse('start')
         self.assertRedirects(response, response_url, status_code=302, target_status_code=200)
 
+    def test_user_list_does_not_load_profile_text(self):
+        self.client.login(email=self.owner.email, password='Password123')
+        with forbid_deferred_loading():
+            response = self.client.get(self.url)
+        self.assertContains(response, self.member.full_name)
+        self.assertNotIn('bio', response.context['users'][0].__dict__)
+
     def _create_test_users(self, user_count=10):
         for user_id in range(user_count):
             user = User.objects.create_user(f'user{user_id}@test.org',
@@ -1,6 +1,8 @@
 from .account_views import *
 from .authentication_views import *
+from .avatar_views import *
 from .club_views import *
+from .monitoring_views import *
 from .start_views import *
 from .static_views import *
 from .user_views import *
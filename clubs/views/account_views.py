@@ -5,9 +5,10 @@ from django.contrib import messages
 from django.contrib.auth import login
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.urls import reverse
-from django.views.generic.edit import FormView, UpdateView
+from django.views.generic.edit import FormView, ModelFormMixin, UpdateView
 
 from clubs.forms import PasswordForm, UserForm, SignUpForm
+from clubs.write_queue import run_write
 from .mixins import LoginProhibitedMixin
 
 
@@ -50,6 +51,11 @@ class ProfileUpdateView(LoginRequiredMixin, UpdateView):
         user = self.request.user
         return user
 
+    def form_valid(self, form):
+        """Save the profile through the write queue."""
+        self.object = run_write(form.save)
+        return super(ModelFormMixin, self).form_valid(form)
+
     def get_success_url(self):
         """Return redirect URL after successful update."""
         messages.add_message(self.request, messages.SUCCESS, "Profile updated!")
@@ -64,7 +70,7 @@ class SignUpView(LoginProhibitedMixin, FormView):
     redirect_when_logged_in_url = settings.REDIRECT_URL_WHEN_LOGGED_IN
 
     def form_valid(self, form):
-        self.object = form.save()
+        self.object = run_write(form.save)
         login(self.request, self.object)
         return super().form_valid(form)
 
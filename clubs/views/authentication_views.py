@@ -6,6 +6,7 @@ from django.contrib.auth import login, logout
 from django.shortcuts import redirect, render
 from django.views import View
 
+from clubs import metrics
 from clubs.forms import LogInForm
 from .mixins import LoginProhibitedMixin
 
@@ -28,7 +29,9 @@ class LogInView(LoginProhibitedMixin, View):
         user = form.get_user()
         if user is not None:
             login(request, user)
+            metrics.inc('clubs_logins_total', result='success')
             return redirect(self.next)
+        metrics.inc('clubs_logins_total', result='failure')
         messages.add_message(request, messages.ERROR, "The credentials provided were invalid!")
         return self.render()
 
@@ -0,0 +1,23 @@
+import re
+
+from django.http import Http404, HttpResponse
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import etag, require_safe
+
+from clubs.avatars import AVATAR_SIZES, get_avatar
+
+EMAIL_HASH_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+
+def avatar_etag(request, email_hash, size):
+    return f'{email_hash}-{size}'
+
+
+"""method to serve a locally generated avatar, which never changes for a given hash and size"""
+@require_safe
+@cache_control(public=True, max_age=31536000, immutable=True)
+@etag(avatar_etag)
+def avatar(request, email_hash, size):
+    if not EMAIL_HASH_PATTERN.match(email_hash) or size not in AVATAR_SIZES:
+        raise Http404
+    return HttpResponse(get_avatar(email_hash, size), content_type='image/png')
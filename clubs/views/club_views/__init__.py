@@ -1,2 +1,3 @@
 from .club_owner_officer_views import *
 from .club_views import *
+from .roster_views import *
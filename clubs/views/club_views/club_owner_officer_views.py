@@ -1,20 +1,36 @@
 """Club owner related views."""
 from django.conf import settings
+from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.exceptions import ObjectDoesNotExist
 from django.shortcuts import redirect
 from django.utils.decorators import method_decorator
+from django.utils.http import url_has_allowed_host_and_scheme
+from django.views.decorators.http import require_POST
 from django.views.generic import ListView
 
 from clubs.helpers import required_role
 from clubs.models import User, Membership
+from clubs.views.mixins import UserKeysetPaginationMixin
+from clubs.write_queue import run_write
+
+# Role changes an owner may make in bulk; ownership only moves through transfer_ownership.
+ROLE_TRANSITIONS = {
+    (Membership.APPLICANT, Membership.MEMBER),
+    (Membership.MEMBER, Membership.OFFICER),
+    (Membership.OFFICER, Membership.MEMBER),
+}
+
+# Largest id SQLite can store; larger numbers cannot even be looked up.
+MAX_ID = 2 ** 63 - 1
 
 """a list to show all applicants"""
-class ApplicantListView(LoginRequiredMixin, ListView):
+class ApplicantListView(LoginRequiredMixin, UserKeysetPaginationMixin, ListView):
     model = User
     template_name = "approve_applicants.html"
     context_object_name = "applicants"
     paginate_by = settings.USERS_PER_PAGE
+    read_from_replica = True
 
     @method_decorator(required_role(Membership.OFFICER))
     def dispatch(self, *args, **kwargs):
@@ -22,15 +38,16 @@ class ApplicantListView(LoginRequiredMixin, ListView):
 
     def get_queryset(self):
         club = self.request.user.current_club
-        applicants = club.associates.filter(membership__role=Membership.APPLICANT)
+        applicants = club.associates_in(Membership.APPLICANT).only(*User.LIST_FIELDS)
         return applicants
 
 """a list to display all members of the club"""
-class MemberListView(LoginRequiredMixin, ListView):
+class MemberListView(LoginRequiredMixin, UserKeysetPaginationMixin, ListView):
     model = User
     template_name = "promote_members.html"
     context_object_name = "members"
     paginate_by = settings.USERS_PER_PAGE
+    read_from_replica = True
 
     @method_decorator(required_role(Membership.OWNER))
     def dispatch(self, *args, **kwargs):
@@ -38,15 +55,16 @@ class MemberListView(LoginRequiredMixin, ListView):
 
     def get_queryset(self):
         club = self.request.user.current_club
-        members = club.associates.filter(membership__role=Membership.MEMBER)
+        members = club.associates_in(Membership.MEMBER).only(*User.LIST_FIELDS)
         return members
 
 """list to displau all officers of club"""
-class OfficerListView(LoginRequiredMixin, ListView):
+class OfficerListView(LoginRequiredMixin, UserKeysetPaginationMixin, ListView):
     model = User
     template_name = "manage_officers.html"
     context_object_name = "officers"
     paginate_by = settings.USERS_PER_PAGE
+    read_from_replica = True
 
     @method_decorator(required_role(Membership.OWNER))
     def dispatch(self, *args, **kwargs):
@@ -54,53 +72,81 @@ class OfficerListView(LoginRequiredMixin, ListView):
 
     def get_queryset(self):
         club = self.request.user.current_club
-        officers = club.associates.filter(membership__role=Membership.OFFICER)
+        officers = club.associates_in(Membership.OFFICER).only(*User.LIST_FIELDS)
         return officers
 
 """method for approving applications"""
 @required_role(Membership.OFFICER)
 def approve_applicant(request, user_id):
     try:
-        old_role = Membership.APPLICANT
-        new_role = Membership.MEMBER
         club = request.user.current_club
         user = User.objects.get(id=user_id)
-        if club.exist(user) and club.is_of_role(user, old_role):
-            club.change_role(user, new_role)
+        run_write(club.change_roles, [user.id], Membership.APPLICANT, Membership.MEMBER)
     except ObjectDoesNotExist:
         return redirect('start')
     else:
         return redirect('applicants_list')
 
+"""method for approving several applications at once"""
+@required_role(Membership.OFFICER)
+@require_POST
+def approve_applicants(request):
+    user_ids = set()
+    for user_id in request.POST.getlist('user_ids'):
+        # isdigit() also accepts characters such as '²' that int() rejects.
+        if user_id.isascii() and user_id.isdecimal() and int(user_id) <= MAX_ID:
+            user_ids.add(int(user_id))
+    club = request.user.current_club
+    approved = club.change_roles(user_ids, Membership.APPLICANT, Membership.MEMBER)
+    skipped = len(user_ids) - approved
+    messages.add_message(request, messages.SUCCESS, f"Approved {approved} applicants, skipped {skipped}.")
+    return redirect('applicants_list')
+
 """method to promote users to officer"""
 @required_role(Membership.OWNER)
 def promote_member(request, user_id):
-    try:
-        old_role = Membership.MEMBER
-        new_role = Membership.OFFICER
-        club = request.user.current_club
-        user = User.objects.get(id=user_id)
-        if club.exist(user) and club.is_of_role(user, old_role):
-            club.change_role(user, new_role)
-    except ObjectDoesNotExist:
-        return redirect('start')
-    else:
-        return redirect('members_list')
+    return _change_role(request, user_id, Membership.MEMBER, Membership.OFFICER, 'members_list')
 
 """method to demote an officer"""
 @required_role(Membership.OWNER)
 def demote_officer(request, user_id):
+    return _change_role(request, user_id, Membership.OFFICER, Membership.MEMBER, 'officers_list')
+
+"""method to apply a batch of role changes"""
+@required_role(Membership.OWNER)
+@require_POST
+def change_roles(request):
+    transitions = []
+    rejected = 0
+    for transition in request.POST.getlist('transitions'):
+        try:
+            user_id, old_role, new_role = (int(value) for value in transition.split(':'))
+        except ValueError:
+            rejected += 1
+            continue
+        if (old_role, new_role) in ROLE_TRANSITIONS:
+            transitions.append((user_id, old_role, new_role))
+        else:
+            rejected += 1
+    club = request.user.current_club
+    changed, skipped = club.apply_role_transitions(transitions)
+    skipped += rejected
+    messages.add_message(request, messages.SUCCESS, f"Changed the role of {changed} users, skipped {skipped}.")
+
+    next_url = request.POST.get('next')
+    if next_url and url_has_allowed_host_and_scheme(next_url, allowed_hosts={request.get_host()}):
+        return redirect(next_url)
+    return redirect('members_list')
+
+def _change_role(request, user_id, old_role, new_role, success_url):
     try:
-        old_role = Membership.OFFICER
-        new_role = Membership.MEMBER
         club = request.user.current_club
         user = User.objects.get(id=user_id)
-        if club.exist(user) and club.is_of_role(user, old_role):
-            club.change_role(user, new_role)
+        run_write(club.change_roles, [user.id], old_role, new_role)
     except ObjectDoesNotExist:
         return redirect('start')
     else:
-        return redirect('officers_list')
+        return redirect(success_url)
 
 """method to transfer ownership to another user"""
 @required_role(Membership.OWNER)
@@ -109,9 +155,8 @@ def transfer_ownership(request, user_id):
         old_owner = request.user
         new_owner = User.objects.get(id=user_id)
         club = old_owner.current_club
-        if club.exist(new_owner) and club.is_of_role(new_owner, Membership.OFFICER):
-            club.change_role(old_owner, Membership.OFFICER)
-            club.change_role(new_owner, Membership.OWNER)
+        if not club.transfer_ownership(old_owner, new_owner):
+            messages.add_message(request, messages.ERROR, "Ownership can only be transferred to an officer.")
     except ObjectDoesNotExist:
         return redirect('start')
     else:
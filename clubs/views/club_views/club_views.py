@@ -1,8 +1,10 @@
 """Club related views."""
 
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import F, FilteredRelation, Q
 from django.http import Http404
 from django.shortcuts import redirect
 from django.shortcuts import render
@@ -11,26 +13,51 @@ from django.utils.decorators import method_decorator
 from django.views.generic import ListView, DetailView
 from django.views.generic.edit import FormView
 
+from clubs.cache import get_user_clubs
 from clubs.forms import CreateClubForm
 from clubs.models import Club, Membership
+from clubs.shards import memberships_of_user, owners_of_clubs
+from clubs.views.mixins import KeysetPaginationMixin
+from clubs.write_queue import run_write
 
 
-class ClubListView(LoginRequiredMixin, ListView):
+class ClubListView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     """View that shows a list of all clubs, their details and their owner"""
 
     model = Club
     template_name = "club_list.html"
-    context_object_name = "owners"
+    context_object_name = "clubs"
+    paginate_by = settings.CLUBS_PER_PAGE
+    read_from_replica = True
 
     def dispatch(self, *args, **kwargs):
         return super().dispatch(*args, **kwargs)
 
     def get_queryset(self):
-        clubs = Club.objects.all()
-        owners = []
-        for club in clubs:
-            owners.append((club, club.membership_set.get(role=Membership.OWNER).user))
-        return owners
+        """Return all clubs, joined with the name and bio of their owner if they have one.
+
+        With sharding, the owners are on the shards of their clubs, so get_context_data adds
+        them to the clubs of the page instead.
+        """
+        if settings.DATABASE_SHARDS:
+            return Club.objects.all()
+        return Club.objects.annotate(
+            owner_membership=FilteredRelation('membership', condition=Q(membership__role=Membership.OWNER)),
+            owner_first_name=F('owner_membership__user__first_name'),
+            owner_last_name=F('owner_membership__user__last_name'),
+            owner_bio=F('owner_membership__user__bio'),
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        if settings.DATABASE_SHARDS:
+            owners = owners_of_clubs([club.id for club in context['clubs']])
+            for club in context['clubs']:
+                owner = owners.get(club.id)
+                club.owner_first_name = owner and owner.first_name
+                club.owner_last_name = owner and owner.last_name
+                club.owner_bio = owner and owner.bio
+        return context
 
 
 class CreateClubView(LoginRequiredMixin, FormView):
@@ -61,6 +88,7 @@ class ShowClubView(DetailView):
     template_name = 'show_club.html'
     context_object_name = 'club'
     pk_url_kwarg = 'club_id'
+    read_from_replica = True
 
     @method_decorator(login_required)
     def dispatch(self, request, *args, **kwargs):
@@ -81,9 +109,8 @@ class ShowClubView(DetailView):
 @login_required
 def apply_for_club(request, club_id):
     try:
-        clubs = Club.objects.get(id=club_id)
-        membership = Membership.objects.create(user=request.user, club=clubs)
-        membership.save()
+        club = Club.objects.get(id=club_id)
+        run_write(Membership.objects.create, user=request.user, club=club)
     except ObjectDoesNotExist:
         return redirect('my_clubs')
     return redirect('my_clubs')
@@ -93,24 +120,26 @@ def apply_for_club(request, club_id):
 def leave_club(request, club_id):
     try:
         club = Club.objects.get(id=club_id)
-        user = request.user
-        if not club.is_of_role(user, Membership.OWNER):
-            membership = Membership.objects.get(user=user, club=club)
-            membership.delete()
-            if request.user.current_club == club:
-                new_current_club = Club.objects.filter(membership__user=request.user).first()
-                request.user.current_club = new_current_club
-                request.user.save()
+        run_write(_leave_club, request.user, club)
     except ObjectDoesNotExist:
         pass
 
     return redirect('my_clubs')
 
+def _leave_club(user, club):
+    if not club.is_of_role(user, Membership.OWNER):
+        membership = Membership.objects.get(user=user, club=club)
+        membership.delete()
+        if user.current_club_id == club.id:
+            clubs = get_user_clubs(user)
+            user.current_club_id = clubs[0]['id'] if clubs else None
+            user.save()
+
 """view to get list of clubs a user is in"""
 @login_required
 def my_clubs(request):
     user = request.user
-    memberships = user.membership_set.all()
+    memberships = memberships_of_user(user)
     clubs_user_in = []
     for membership in memberships:
         role = "Applicant"
@@ -121,7 +150,7 @@ def my_clubs(request):
         elif membership.role == Membership.MEMBER:
             role = "Member"
         clubs_user_in.append([membership.club, role])
-    clubs_user_not_in = Club.objects.exclude(membership__user=user)
+    clubs_user_not_in = Club.objects.exclude(id__in=[membership.club_id for membership in memberships])
     return render(request, 'my_clubs.html', {'clubs_user_in': clubs_user_in, 'clubs_user_not_in': clubs_user_not_in})
 
 """view to switch between clubs"""
@@ -131,7 +160,7 @@ def select_club(request, club_id):
     try:
         club = Club.objects.get(id=club_id)
         if club.exist(user):
-            user.select_club(club)
+            run_write(user.select_club, club)
     except ObjectDoesNotExist:
         pass
 
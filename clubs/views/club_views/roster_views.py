@@ -0,0 +1,83 @@
+"""Club roster export views."""
+import csv
+import itertools
+import json
+
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
+from django.utils.text import slugify
+
+from clubs.helpers import required_role
+from clubs.models import User, Membership
+
+ROSTER_HEADER = ['first_name', 'last_name', 'email', 'role']
+ROSTER_CHUNK_SIZE = 2000
+
+
+class Echo:
+    """File-like object that hands back whatever is written to it, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+"""method to stream the roster of the current club as CSV or JSON Lines"""
+@required_role(Membership.OFFICER)
+def export_roster(request):
+    export_format = request.GET.get('format', 'csv')
+    if export_format not in ('csv', 'jsonl'):
+        return HttpResponseBadRequest("Unsupported roster format.")
+
+    club = request.user.current_club
+    memberships = Membership.objects.filter(club=club)
+    valid_roles = {str(role): role for role, _ in Membership.ROLE_CHOICES}
+    roles = [valid_roles[role] for role in request.GET.getlist('role') if role in valid_roles]
+    if roles:
+        memberships = memberships.filter(role__in=roles)
+    rows = _roster_rows(memberships)
+
+    if export_format == 'csv':
+        content, content_type = _csv_lines(rows), 'text/csv'
+    else:
+        content, content_type = _json_lines(rows), 'application/x-ndjson'
+    response = StreamingHttpResponse(content, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{slugify(club.name)}-roster.{export_format}"'
+    return response
+
+
+def _roster_rows(memberships):
+    """Yield the first name, last name, email and role of each membership, ordered by user id.
+
+    The users are read a chunk of memberships at a time rather than joined, as with
+    sharding the memberships are on the shard of the club and the users on the primary.
+    """
+    memberships = memberships.order_by('user_id').values_list('user_id', 'role').iterator(
+        chunk_size=ROSTER_CHUNK_SIZE
+    )
+    while True:
+        chunk = list(itertools.islice(memberships, ROSTER_CHUNK_SIZE))
+        if not chunk:
+            return
+        users = {
+            user_id: (first_name, last_name, email)
+            for user_id, first_name, last_name, email in User.objects.filter(
+                id__in=[user_id for user_id, _ in chunk]
+            ).values_list('id', 'first_name', 'last_name', 'email')
+        }
+        for user_id, role in chunk:
+            if user_id in users:
+                yield (*users[user_id], role)
+
+
+def _csv_lines(rows):
+    role_names = dict(Membership.ROLE_CHOICES)
+    writer = csv.writer(Echo())
+    yield writer.writerow(ROSTER_HEADER)
+    for first_name, last_name, email, role in rows:
+        yield writer.writerow([first_name, last_name, email, role_names[role]])
+
+
+def _json_lines(rows):
+    role_names = dict(Membership.ROLE_CHOICES)
+    for first_name, last_name, email, role in rows:
+        values = [first_name, last_name, email, role_names[role]]
+        yield json.dumps(dict(zip(ROSTER_HEADER, values))) + '\n'
@@ -1,6 +1,9 @@
+from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
 from django.shortcuts import redirect
 
+from clubs.pagination import KeysetPaginator
+
 
 class LoginProhibitedMixin:
     """Mixin that redirects when a user is logged in"""
@@ -26,3 +29,26 @@ class LoginProhibitedMixin:
     def handle_already_logged_in(self, *args, **kwargs):
         url = self.get_redirect_when_logged_in_url()
         return redirect(url)
+
+
+class KeysetPaginationMixin:
+    """Mixin that pages a ListView by cursor instead of by page number."""
+
+    keyset_ordering = ('id',)
+    keyset_count_cache_timeout = None
+
+    def paginate_queryset(self, queryset, page_size):
+        """Return the page that follows ?after= or precedes ?before= in the keyset ordering."""
+        paginator = KeysetPaginator(queryset, page_size, self.keyset_ordering, self.keyset_count_cache_timeout)
+        page = paginator.page(
+            after=self.request.GET.get('after'),
+            before=self.request.GET.get('before'),
+        )
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+class UserKeysetPaginationMixin(KeysetPaginationMixin):
+    """Mixin that pages a list of users by name, with a briefly cached total count."""
+
+    keyset_ordering = ('last_name', 'first_name', 'id')
+    keyset_count_cache_timeout = settings.PAGINATION_COUNT_CACHE_TIMEOUT
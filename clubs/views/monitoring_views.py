@@ -0,0 +1,40 @@
+import hmac
+
+from django.contrib import admin
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.exceptions import PermissionDenied
+from django.http import Http404, HttpResponse
+from django.shortcuts import render
+from django.views.decorators.http import require_safe
+
+from clubs import metrics as metrics_store
+from clubs.profiling import profile_report
+
+
+"""method for staff to see the SQL profile of each url, recorded by SQLProfilingMiddleware"""
+@staff_member_required
+def sql_profile(request):
+    context = {
+        **admin.site.each_context(request),
+        'title': 'SQL profile',
+        'report': profile_report(),
+    }
+    return render(request, 'admin/sql_profile.html', context)
+
+
+"""method to expose the metrics of every worker process in the Prometheus text format, to staff or scrapers with the token"""
+@require_safe
+def metrics(request):
+    if not settings.METRICS:
+        raise Http404
+    if not _has_metrics_token(request) and not (request.user.is_active and request.user.is_staff):
+        raise PermissionDenied
+    return HttpResponse(metrics_store.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+def _has_metrics_token(request):
+    """Return whether the request carries settings.METRICS_TOKEN as a bearer token."""
+    if not settings.METRICS_TOKEN:
+        return False
+    return hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {settings.METRICS_TOKEN}')
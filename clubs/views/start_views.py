@@ -4,20 +4,21 @@ from django.views.generic import ListView
 
 from clubs.forms import CreateClubForm
 from clubs.models import Club
+from .mixins import KeysetPaginationMixin
 
 
-class StartView(LoginRequiredMixin, ListView):
+class StartView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     """Class-based generic view for displaying a view."""
 
     model = Club
     template_name = "start.html"
     context_object_name = "clubs"
     paginate_by = settings.CLUBS_PER_PAGE
+    read_from_replica = True
 
     def get_queryset(self):
         """Return all existing clubs."""
-        clubs = list(Club.objects.all())
-        return clubs
+        return Club.objects.all()
 
     def get_context_data(self, **kwargs):
         """Return context data, including new club form."""
@@ -11,6 +11,7 @@ from django.views.generic.detail import DetailView
 
 from clubs.helpers import prohibited_role
 from clubs.models import User, Membership
+from clubs.views.mixins import UserKeysetPaginationMixin
 
 
 class ShowUserView(DetailView):
@@ -20,6 +21,7 @@ class ShowUserView(DetailView):
     template_name = 'show_user.html'
     context_object_name = 'user'
     pk_url_kwarg = 'user_id'
+    read_from_replica = True
 
     @method_decorator(login_required)
     @method_decorator(prohibited_role(Membership.APPLICANT))
@@ -32,14 +34,13 @@ class ShowUserView(DetailView):
         context = super().get_context_data(*args, **kwargs)
         context['user'] = self.request.user
         context['user_to_view'] = self.get_object()
-        context['is_staff'] = self.request.user.current_club_not_none and self.request.user.current_club_role in {
-            Membership.OFFICER, Membership.OWNER}
+        context['is_staff'] = self.request.membership.role in {Membership.OFFICER, Membership.OWNER}
         return context
 
     def get(self, request, *args, **kwargs):
         """handle get request, and redirect to user_list if user_id invalid"""
         try:
-            if self.request.user.current_club_role == Membership.MEMBER:
+            if self.request.membership.role == Membership.MEMBER:
                 if self.request.user.current_club.membership_set.get(user=self.get_object()).role in {
                         Membership.OFFICER, Membership.OWNER}:
                     return redirect('user_list')
@@ -48,13 +49,14 @@ class ShowUserView(DetailView):
             return redirect('user_list')
 
 
-class UserListView(LoginRequiredMixin, ListView):
+class UserListView(LoginRequiredMixin, UserKeysetPaginationMixin, ListView):
     """View that shows a list of all users"""
 
     model = User
     template_name = "user_list.html"
     context_object_name = "users"
     paginate_by = settings.USERS_PER_PAGE
+    read_from_replica = True
 
     @method_decorator(prohibited_role(Membership.APPLICANT))
     def dispatch(self, *args, **kwargs):
@@ -63,6 +65,8 @@ class UserListView(LoginRequiredMixin, ListView):
     def get_queryset(self):
         user = self.request.user
         club = user.current_club
-        if user.current_club_role == Membership.MEMBER:
-            return club.associates.filter(membership__role=Membership.MEMBER)
-        return club.associates.exclude(membership__role=Membership.APPLICANT)
+        if self.request.membership.role == Membership.MEMBER:
+            users = club.associates_in(Membership.MEMBER)
+        else:
+            users = club.associates_in(Membership.MEMBER, Membership.OFFICER, Membership.OWNER)
+        return users.only(*User.LIST_FIELDS)
@@ -0,0 +1,127 @@
+"""Optional write queue that coalesces small writes of concurrent requests into shared transactions.
+
+SQLite lets one connection write at a time, so with WRITE_QUEUE enabled the writes of a
+process go through one worker thread. It commits up to WRITE_QUEUE_BATCH_SIZE writes at
+once, each in its own savepoint, while the requests that submitted them wait for the result.
+With sharding, the transaction and the savepoints span the primary and every shard, as a
+write may touch any of them.
+Writes of different requests only share a transaction when the process handles several
+requests at a time, as threaded gunicorn workers (--worker-class gthread) do.
+"""
+
+import contextvars
+import os
+import queue
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections, transaction
+
+from clubs.sqlite import is_locked_error, retry_on_locked
+
+
+class WriteTimeout(Exception):
+    """A queued write did not complete within settings.WRITE_QUEUE_TIMEOUT seconds."""
+
+
+class WriteQueue:
+    """A worker thread committing queued writes in batches."""
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._work, name='write-queue', daemon=True)
+        self._thread.start()
+
+    def submit(self, function, *args, **kwargs):
+        """Queue a write, to be run in the context of the caller, and return a future of its result."""
+        future = Future()
+        self._queue.put((future, contextvars.copy_context().run, (function, *args), kwargs))
+        return future
+
+    def in_worker(self):
+        return threading.current_thread() is self._thread
+
+    def _work(self):
+        while True:
+            batch = [self._queue.get()]
+            try:
+                while len(batch) < settings.WRITE_QUEUE_BATCH_SIZE:
+                    batch.append(self._queue.get(timeout=settings.WRITE_QUEUE_MAX_WAIT))
+            except queue.Empty:
+                pass
+            batch = [item for item in batch if item[0].set_running_or_notify_cancel()]
+            try:
+                outcomes = self._commit(batch)
+            except Exception as error:
+                outcomes = [(False, error)] * len(batch)
+                if isinstance(error, DatabaseError):
+                    connections.close_all()
+            for (future, *_), (succeeded, outcome) in zip(batch, outcomes):
+                if succeeded:
+                    future.set_result(outcome)
+                else:
+                    future.set_exception(outcome)
+
+    @retry_on_locked
+    def _commit(self, batch):
+        """Run every write of a batch in one transaction, each in a savepoint rolled back alone if it fails.
+
+        Every write runs once, so writes need not be idempotent. Only a locked database
+        rolls the whole batch back, for retry_on_locked to run it again.
+        """
+        outcomes = []
+        with _atomic_everywhere():
+            for _, function, args, kwargs in batch:
+                try:
+                    with _atomic_everywhere():
+                        outcomes.append((True, function(*args, **kwargs)))
+                except Exception as error:
+                    if is_locked_error(error):
+                        raise
+                    outcomes.append((False, error))
+        return outcomes
+
+
+@contextmanager
+def _atomic_everywhere():
+    """Run the block atomically on the primary and on every shard."""
+    with ExitStack() as stack:
+        for alias in [DEFAULT_DB_ALIAS, *settings.DATABASE_SHARDS]:
+            stack.enter_context(transaction.atomic(using=alias))
+        yield
+
+
+_write_queues = {}
+_write_queues_lock = threading.Lock()
+
+
+def get_write_queue():
+    """Return the write queue of this process, starting a new one after a fork."""
+    with _write_queues_lock:
+        write_queue = _write_queues.get(os.getpid())
+        if write_queue is None:
+            write_queue = _write_queues[os.getpid()] = WriteQueue()
+        return write_queue
+
+
+def run_write(function, *args, **kwargs):
+    """Run a write through the write queue when it is enabled and wait for its result.
+
+    Writes are run directly when the queue is disabled, from within a transaction (which
+    they must be part of) or from the worker itself. Raises WriteTimeout when the write
+    is not done within settings.WRITE_QUEUE_TIMEOUT seconds; it is then dropped if it
+    had not started yet, and may otherwise still be committed.
+    """
+    if not settings.WRITE_QUEUE or any(connection.in_atomic_block for connection in connections.all()):
+        return function(*args, **kwargs)
+    write_queue = get_write_queue()
+    if write_queue.in_worker():
+        return function(*args, **kwargs)
+    future = write_queue.submit(function, *args, **kwargs)
+    try:
+        return future.result(timeout=settings.WRITE_QUEUE_TIMEOUT)
+    except FutureTimeoutError:
+        future.cancel()
+        raise WriteTimeout(f'Write not done within {settings.WRITE_QUEUE_TIMEOUT} seconds') from None
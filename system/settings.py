@@ -9,6 +9,7 @@ https://docs.djangoproject.com/en/3.2/ref/settings/
 
 import os
 import os.path
+import tempfile
 from pathlib import Path
 
 from django.contrib.messages import constants as message_constants
@@ -42,11 +43,16 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'clubs.middleware.MetricsMiddleware',
+    'clubs.middleware.SQLProfilingMiddleware',
+    'clubs.middleware.ReplicaRoutingMiddleware',
+    'clubs.middleware.WriteQueueMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'clubs.middleware.CurrentMembershipMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -82,6 +88,80 @@ DATABASES = {
     }
 }
 
+# Read replicas, used by views marked with read_from_replica. CLUBS_SQLITE_REPLICAS=N adds N
+# local stand-ins: SQLite files that `manage.py sync_replicas` copies the primary onto.
+# After writing, a user reads from the primary for REPLICA_STICKINESS seconds, which
+# should be longer than the time between two syncs.
+DATABASE_REPLICAS = [f'replica_{number}' for number in range(1, int(os.environ.get('CLUBS_SQLITE_REPLICAS', 0)) + 1)]
+for alias in DATABASE_REPLICAS:
+    DATABASES[alias] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / f'db_{alias}.sqlite3',
+        'TEST': {'MIRROR': 'default'},
+    }
+REPLICA_STICKINESS = 10
+
+# Shards holding club-scoped rows (memberships), spread by club; users and clubs stay on the
+# primary. CLUBS_SQLITE_SHARDS=N adds N local SQLite shards. A club lives on the shard at
+# index club id % N unless `manage.py move_club` moved it.
+DATABASE_SHARDS = [f'shard_{number}' for number in range(1, int(os.environ.get('CLUBS_SQLITE_SHARDS', 0)) + 1)]
+for alias in DATABASE_SHARDS:
+    DATABASES[alias] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / f'db_{alias}.sqlite3',
+    }
+
+DATABASE_ROUTERS = ['clubs.shards.ClubShardRouter', 'clubs.replicas.PrimaryReplicaRouter']
+
+# Applied to every new SQLite connection. WAL lets readers and one writer work at the same
+# time, and busy_timeout makes a writer wait for the lock instead of failing at once.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'busy_timeout': 5000,
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'temp_store': 'memory',
+}
+
+# Write transactions that still find the database locked are retried this many times,
+# waiting SQLITE_RETRY_BASE_DELAY seconds and twice as long each time, up to the max delay.
+SQLITE_WRITE_RETRIES = 5
+SQLITE_RETRY_BASE_DELAY = 0.05
+SQLITE_RETRY_MAX_DELAY = 1.0
+
+# Send the small writes of requests through one worker thread per process, which commits
+# up to WRITE_QUEUE_BATCH_SIZE of them per transaction, waiting at most WRITE_QUEUE_MAX_WAIT
+# seconds for a batch to fill. Requests wait up to WRITE_QUEUE_TIMEOUT seconds for their write,
+# then get a 503. Only enable it with threaded workers (gunicorn --worker-class gthread
+# --threads N): the sync workers of the Procfile handle one request at a time, so their
+# writes never share a batch and each would only wait WRITE_QUEUE_MAX_WAIT for nothing.
+WRITE_QUEUE = os.environ.get('CLUBS_WRITE_QUEUE') == '1'
+WRITE_QUEUE_BATCH_SIZE = 64
+WRITE_QUEUE_MAX_WAIT = 0.002
+WRITE_QUEUE_TIMEOUT = 30
+
+# Shared by the worker processes of a host through a SQLite file. Cached values are made
+# stale by bumping the versions of the users and clubs they depend on (see clubs.cache).
+# The file holds pickles, so it must not be writable by other users of the host.
+CACHES = {
+    'default': {
+        'BACKEND': 'clubs.cache_backends.SQLiteCache',
+        'LOCATION': os.environ.get('CLUBS_CACHE_PATH', str(BASE_DIR / 'cache.sqlite3')),
+        'OPTIONS': {
+            'MAX_ENTRIES': 100000,
+        },
+    }
+}
+
+# A request computing a value cached with single_flight keeps others from computing it for
+# up to CACHE_LOCK_TIMEOUT seconds; they look for the value every CACHE_LOCK_POLL_INTERVAL seconds.
+CACHE_LOCK_TIMEOUT = 10
+CACHE_LOCK_POLL_INTERVAL = 0.05
+
+# Tests use a cache of their own, in a temporary directory.
+TEST_RUNNER = 'clubs.tests.runner.TestRunner'
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -144,6 +224,28 @@ MESSAGE_TAGS = {
 # Page length
 USERS_PER_PAGE = 10
 CLUBS_PER_PAGE = 10
+# Seconds for which the total count of a paginated user list is cached
+PAGINATION_COUNT_CACHE_TIMEOUT = 60
+
+# Record per-request SQL profiles, shown to staff at /admin/sql_profile/
+SQL_PROFILING = False
+# Number of requests kept per URL name
+SQL_PROFILING_BUFFER_SIZE = 500
+
+# Expose Prometheus metrics at /metrics, shared by worker processes through files in METRICS_DIR.
+# Empty METRICS_DIR when deploying, as files of exited workers are still counted.
+METRICS = False
+METRICS_DIR = Path(tempfile.gettempdir()) / 'clubs_metrics'
+# Besides staff, /metrics only answers requests with an "Authorization: Bearer <METRICS_TOKEN>" header.
+METRICS_TOKEN = os.environ.get('CLUBS_METRICS_TOKEN', '')
+
+# Serve avatars from the local avatar endpoint instead of linking to gravatar.com
+LOCAL_AVATARS = False
+AVATAR_CACHE_DIR = BASE_DIR / 'avatar_cache'
+# Past this many cached avatars, the cull_avatars command deletes the least recently written third
+AVATAR_CACHE_MAX_FILES = 100000
+# Dotted path to a callable (email_hash, size) -> PNG bytes or None, tried before generating an identicon
+AVATAR_UPSTREAM_FETCHER = None
 
 # activate the website
 # if '/app' in os.environ['HOME']:
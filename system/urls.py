@@ -19,6 +19,7 @@ from django.urls import path
 from clubs import views
 
 urlpatterns = [
+    path('admin/sql_profile/', views.sql_profile, name='sql_profile'),
     path('admin/', admin.site.urls),
     path('log_in/', views.LogInView.as_view(), name='log_in'),
     path('sign_up/', views.SignUpView.as_view(), name='sign_up'),
@@ -31,8 +32,11 @@ urlpatterns = [
     path('profile/', views.ProfileUpdateView.as_view(), name='profile'),
     path('applicants_list/', views.ApplicantListView.as_view(), name='applicants_list'),
     path('approve_applicant/<int:user_id>', views.approve_applicant, name='approve_applicant'),
+    path('approve_applicants/', views.approve_applicants, name='approve_applicants'),
+    path('export_roster/', views.export_roster, name='export_roster'),
     path('members_list/', views.MemberListView.as_view(), name='members_list'),
     path('promote_member/<int:user_id>', views.promote_member, name='promote_member'),
+    path('change_roles/', views.change_roles, name='change_roles'),
     path('officers_list/', views.OfficerListView.as_view(), name='officers_list'),
     path('demote_officer/<int:user_id>', views.demote_officer, name='demote_officer'),
     path('transfer_ownership/<int:user_id>', views.transfer_ownership, name='transfer_ownership'),
@@ -43,4 +47,6 @@ urlpatterns = [
     path('apply/<int:club_id>', views.apply_for_club, name='apply'),
     path('leave_club/<int:club_id>', views.leave_club, name='leave_club'),
     path('create_club/', views.CreateClubView.as_view(), name='create_club'),
+    path('metrics', views.metrics, name='metrics'),
+    path('avatar/<str:email_hash>/<int:size>.png', views.avatar, name='avatar'),
 ]